@@ -9,29 +9,61 @@ Formato esperado (acf_clean.json / acf.json neste repo):
   ...
 ]
 
+Alternativamente, le os assets BIB1 gerados por tools/gen_bible_assets.py
+(BIBLE.IDX + BIBLE.BIN) via mmap, sem carregar o texto inteiro na memoria.
+
 Uso:
   python3 dos_biblia_acf.py
   python3 dos_biblia_acf.py --json acf_clean.json
+  python3 dos_biblia_acf.py --store saturn_app/cd
   python3 dos_biblia_acf.py --selftest
+  python3 dos_biblia_acf.py --grep 'Senhor\s+dos\s+Ex.rcitos'
+  python3 dos_biblia_acf.py --selftest --profile trace.json --profile-capture cprofile
+  printf 'jo 3:16\nsenhor dos exercitos\n' | python3 dos_biblia_acf.py --batch -
+  python3 dos_biblia_acf.py --serve 8080
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
+import contextlib
+import cProfile
 import curses
+import hashlib
+import heapq
 import json
+import math
+import mmap
+import multiprocessing
 import os
+import pstats
+import queue
+import re
+import struct
+import sys
 import textwrap
+import threading
+import time
+import tracemalloc
+import unicodedata
+import urllib.parse
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Sequence as _SequenceABC
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, List, Optional, Tuple
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 
 @dataclass(frozen=True)
 class Book:
     name: str
     abbrev: str
-    chapters: List[List[str]]  # chapters[chap_idx][verse_idx] -> verse text
+    chapters: Sequence[Sequence[str]]  # chapters[chap_idx][verse_idx] -> verse text
 
 
 def _load_json(path: Path) -> Any:
@@ -39,8 +71,16 @@ def _load_json(path: Path) -> Any:
         return json.load(f)
 
 
-def load_bible(path: Path) -> List[Book]:
-    data = _load_json(path)
+def load_bible(path: Path, use_cache: bool = False) -> List[Book]:
+    # Padrao: listas normalizadas direto do JSON, sem tocar no disco. Com
+    # use_cache=True os livros sao os do Corpus (capitulos como visoes
+    # preguicosas) e o cache em disco e lido/gravado.
+    if use_cache:
+        return load_corpus(path).books
+    return _normalize_books(_load_json(path))
+
+
+def _normalize_books(data: Any) -> List[Book]:
     if not isinstance(data, list):
         raise ValueError("JSON invalido: esperado uma lista de livros.")
 
@@ -66,6 +106,487 @@ def load_bible(path: Path) -> List[Book]:
     return books
 
 
+class VerseMap:
+    """Ids globais de verso (ordem canonica) via somas prefixas.
+
+    book_first_chapter[b] .. book_first_chapter[b+1] sao os capitulos
+    globais do livro b; chapter_first_verse[c] .. chapter_first_verse[c+1]
+    sao os versos globais (gid) do capitulo c.
+    """
+
+    __slots__ = ("book_first_chapter", "chapter_first_verse")
+
+    def __init__(self, book_first_chapter: array, chapter_first_verse: array) -> None:
+        self.book_first_chapter = book_first_chapter
+        self.chapter_first_verse = chapter_first_verse
+
+    @classmethod
+    def from_books(cls, books: Sequence[Book]) -> "VerseMap":
+        bfc = array("I", [0])
+        cfv = array("I", [0])
+        for book in books:
+            for chap in book.chapters:
+                cfv.append(cfv[-1] + len(chap))
+            bfc.append(len(cfv) - 1)
+        return cls(bfc, cfv)
+
+    @property
+    def verse_count(self) -> int:
+        return self.chapter_first_verse[-1]
+
+    def chapter_span(self, chap_gid: int) -> Tuple[int, int]:
+        first = self.chapter_first_verse[chap_gid]
+        return first, self.chapter_first_verse[chap_gid + 1] - first
+
+    def book_range(self, b: int) -> range:
+        cfv, bfc = self.chapter_first_verse, self.book_first_chapter
+        return range(cfv[bfc[b]], cfv[bfc[b + 1]])
+
+    def gid(self, b: int, c: int, v: int) -> int:
+        return self.chapter_first_verse[self.book_first_chapter[b] + c] + v
+
+    def locate(self, gid: int) -> Tuple[int, int, int]:
+        chap = bisect_right(self.chapter_first_verse, gid) - 1
+        book = bisect_right(self.book_first_chapter, chap) - 1
+        return book, chap - self.book_first_chapter[book], gid - self.chapter_first_verse[chap]
+
+
+class Corpus:
+    """Corpus compacto: todo o texto num unico str + tabelas array('I').
+
+    Mesmo desenho do BIB1: verse_offsets[g] .. verse_offsets[g+1] delimita
+    o verso g em `text`. Em vez de ~31k objetos str soltos, ficam um buffer
+    contiguo e alguns arrays. `books` expoe a interface de Book (capitulos
+    como sequencias preguicosas), entao a TUI nao precisa mudar.
+    """
+
+    def __init__(self, names: List[str], abbrevs: List[str], text: str, verse_offsets: array, vmap: VerseMap) -> None:
+        self.names = names
+        self.abbrevs = abbrevs
+        self.text = text
+        self.verse_offsets = verse_offsets
+        self.map = vmap
+        self._folded: Optional[FoldedText] = None
+        self.books: List[Book] = [
+            Book(
+                name=names[b],
+                abbrev=abbrevs[b],
+                chapters=_BookChaptersView(
+                    self, vmap.book_first_chapter[b], vmap.book_first_chapter[b + 1] - vmap.book_first_chapter[b]
+                ),
+            )
+            for b in range(len(names))
+        ]
+
+    @classmethod
+    def from_books(cls, books: Sequence[Book]) -> "Corpus":
+        parts: List[str] = []
+        offsets = array("I", [0])
+        pos = 0
+        for book in books:
+            for chap in book.chapters:
+                for verse in chap:
+                    parts.append(verse)
+                    pos += len(verse)
+                    offsets.append(pos)
+        return cls(
+            [b.name for b in books],
+            [b.abbrev for b in books],
+            "".join(parts),
+            offsets,
+            VerseMap.from_books(books),
+        )
+
+    @property
+    def verse_count(self) -> int:
+        return len(self.verse_offsets) - 1
+
+    def verse_text(self, gid: int) -> str:
+        return self.text[self.verse_offsets[gid] : self.verse_offsets[gid + 1]]
+
+    def chapter_span(self, chap_gid: int) -> Tuple[int, int]:
+        return self.map.chapter_span(chap_gid)
+
+    def locate(self, gid: int) -> Tuple[int, int, int]:
+        return self.map.locate(gid)
+
+    def folded(self) -> "FoldedText":
+        if self._folded is None:
+            self._folded = FoldedText(self.verse_text(g) for g in range(self.verse_count))
+        return self._folded
+
+    def search(self, query: str) -> array:
+        # Busca por substring como _search_all, mas sem acentos e via o
+        # blob normalizado; devolve os gids num array.
+        return self.folded().search(query)
+
+
+class FoldedText:
+    """Copia unica do texto inteiro ja normalizada com fold(), para busca por substring.
+
+    Os versos ficam separados por NUL num so str; starts[g] e o inicio do
+    verso g. Cada busca e uma sequencia de str.find sobre o blob, e cada
+    ocorrencia vira um gid por bisect -- sem casefold por verso a cada busca.
+    """
+
+    def __init__(self, verses: Iterable[str]) -> None:
+        blob = fold("\0".join(verses) + "\0")
+        starts = array("I", [0])
+        p = blob.find("\0")
+        while p != -1:
+            starts.append(p + 1)
+            p = blob.find("\0", p + 1)
+        self.blob = blob
+        self.starts = starts
+
+    @classmethod
+    def from_books(cls, books: Sequence[Book]) -> "FoldedText":
+        return cls(verse for book in books for chap in book.chapters for verse in chap)
+
+    @property
+    def verse_count(self) -> int:
+        return len(self.starts) - 1
+
+    def iter_search(self, query: str, batch: int = 256) -> Iterator[array]:
+        q = fold(query)
+        if not q or "\0" in q:
+            return
+        blob, starts, find = self.blob, self.starts, self.blob.find
+        out = array("I")
+        p = find(q)
+        while p != -1:
+            g = bisect_right(starts, p) - 1
+            out.append(g)
+            if len(out) >= batch:
+                yield out
+                out = array("I")
+            # Pula para o proximo verso: cada verso entra uma vez so.
+            p = find(q, starts[g + 1])
+        if out:
+            yield out
+
+    def search(self, query: str) -> array:
+        out = array("I")
+        for part in self.iter_search(query):
+            out.extend(part)
+        return out
+
+
+def load_corpus(path: Path, use_cache: bool = True, prof: Optional["Profiler"] = None) -> Corpus:
+    """Corpus do JSON, passando pelo cache binario em disco (corpus_cache_path).
+
+    Com cache valido nao ha json.load nem normalizacao: o arquivo ja traz o
+    texto e as tabelas do Corpus. Senao valida/normaliza o JSON, compacta e
+    grava o cache para a proxima vez.
+    """
+    prof = prof or Profiler()
+    cache_path = corpus_cache_path(path) if use_cache else None
+    st = path.stat()
+    if cache_path is not None:
+        with prof.stage("cache_load", path=str(cache_path)):
+            corpus, stale_mtime = _read_corpus_cache(cache_path, path, st)
+        if corpus is not None:
+            if stale_mtime:
+                # Mesmo conteudo, mtime novo (ex.: checkout): regrava a chave.
+                _write_corpus_cache(corpus, cache_path, path, st)
+            return corpus
+
+    # As listas intermediarias sao liberadas ao sair daqui.
+    with prof.stage("load", path=str(path)):
+        data = _load_json(path)
+    with prof.stage("normalize"):
+        books = _normalize_books(data)
+    del data
+    with prof.stage("corpus"):
+        corpus = Corpus.from_books(books)
+    del books
+    if cache_path is not None:
+        with prof.stage("cache_write", path=str(cache_path)):
+            _write_corpus_cache(corpus, cache_path, path, st)
+    return corpus
+
+
+# ---------------------------------------------------------------------------
+# Cache do corpus em disco
+#
+# Um arquivo por JSON (chave: caminho absoluto), em $BIBLIA_CACHE_DIR ou
+# ~/.cache/biblia-saturn. Guarda o Corpus pronto, little-endian:
+#   header _CACHE_HEADER (tamanho, mtime_ns e sha256 do JSON de origem)
+#   nomes e abreviacoes (UTF-8, separados por NUL)
+#   u32 book_first_chapter[livros+1], chapter_first_verse[capitulos+1],
+#   verse_offsets[versos+1]
+#   texto (Latin-1 se todo caractere couber, senao UTF-8; Latin-1 decodifica
+#   como uma copia simples)
+# Tamanho e mtime iguais => valido sem ler o JSON; so o mtime diferente =>
+# compara o sha256 do JSON antes de descartar.
+# ---------------------------------------------------------------------------
+
+CACHE_MAGIC = b"BIBC"
+CACHE_VERSION = 1
+# magic, versao, livros, codificacao do texto, tamanho, mtime_ns, sha256,
+# capitulos, versos, bytes de nomes, bytes de texto
+_CACHE_HEADER = struct.Struct("<4sHHHQq32sIIII")
+_CACHE_TEXT_ENCODINGS = ("utf-8", "latin-1")
+
+
+def corpus_cache_path(json_path: Path) -> Path:
+    base = os.environ.get("BIBLIA_CACHE_DIR")
+    if not base:
+        xdg = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        base = os.path.join(xdg, "biblia-saturn")
+    key = hashlib.sha1(str(json_path.resolve()).encode("utf-8")).hexdigest()[:16]
+    return Path(base) / f"{json_path.stem}-{key}.bibc"
+
+
+def _file_sha256(path: Path) -> bytes:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+def _u32_bytes(a: array) -> bytes:
+    if sys.byteorder == "big":
+        a = array("I", a)
+        a.byteswap()
+    return a.tobytes()
+
+
+def _u32_array(buf: bytes, pos: int, count: int) -> array:
+    a = array("I")
+    a.frombytes(buf[pos : pos + 4 * count])
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+
+def _read_corpus_cache(cache_path: Path, json_path: Path, st: os.stat_result) -> Tuple[Optional[Corpus], bool]:
+    """(corpus, so_mtime_mudou); (None, False) se nao houver cache valido."""
+    try:
+        buf = cache_path.read_bytes()
+    except OSError:
+        return None, False
+    # Arquivo truncado ou corrompido (UnicodeDecodeError e ValueError) conta
+    # como cache ausente: o JSON e relido e o cache, regravado.
+    try:
+        magic, version, nbooks, enc, size, mtime_ns, digest, nchap, nverse, nnames, ntext = _CACHE_HEADER.unpack_from(buf)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION or size != st.st_size or enc >= len(_CACHE_TEXT_ENCODINGS):
+            return None, False
+        stale_mtime = mtime_ns != st.st_mtime_ns
+        if stale_mtime and digest != _file_sha256(json_path):
+            return None, False
+        pos = _CACHE_HEADER.size
+        end = pos + nnames + 4 * ((nbooks + 1) + (nchap + 1) + (nverse + 1)) + ntext
+        if len(buf) != end:
+            return None, False
+        labels = buf[pos : pos + nnames].decode("utf-8").split("\0")
+        pos += nnames
+        bfc = _u32_array(buf, pos, nbooks + 1)
+        pos += 4 * (nbooks + 1)
+        cfv = _u32_array(buf, pos, nchap + 1)
+        pos += 4 * (nchap + 1)
+        offsets = _u32_array(buf, pos, nverse + 1)
+        pos += 4 * (nverse + 1)
+        text = str(memoryview(buf)[pos:], _CACHE_TEXT_ENCODINGS[enc])
+    except (struct.error, IndexError, ValueError):
+        return None, False
+    if len(labels) != 2 * nbooks or bfc[-1] != nchap or cfv[-1] != nverse or offsets[-1] != len(text):
+        return None, False
+    return Corpus(labels[:nbooks], labels[nbooks:], text, offsets, VerseMap(bfc, cfv)), stale_mtime
+
+
+def _write_corpus_cache(corpus: Corpus, cache_path: Path, json_path: Path, st: os.stat_result) -> None:
+    # Melhor esforco: sem permissao de escrita o leitor so fica sem cache.
+    tmp = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        labels = "\0".join(corpus.names + corpus.abbrevs).encode("utf-8")
+        enc = 1 if not corpus.text or max(corpus.text) <= "\xff" else 0
+        text = corpus.text.encode(_CACHE_TEXT_ENCODINGS[enc])
+        header = _CACHE_HEADER.pack(
+            CACHE_MAGIC,
+            CACHE_VERSION,
+            len(corpus.names),
+            enc,
+            st.st_size,
+            st.st_mtime_ns,
+            _file_sha256(json_path),
+            len(corpus.map.chapter_first_verse) - 1,
+            corpus.verse_count,
+            len(labels),
+            len(text),
+        )
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("wb") as f:
+            f.write(header)
+            f.write(labels)
+            f.write(_u32_bytes(corpus.map.book_first_chapter))
+            f.write(_u32_bytes(corpus.map.chapter_first_verse))
+            f.write(_u32_bytes(corpus.verse_offsets))
+            f.write(text)
+        os.replace(tmp, cache_path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            tmp.unlink()
+
+
+# ---------------------------------------------------------------------------
+# Backend BIB1 (BIBLE.IDX + BIBLE.BIN) via mmap
+#
+# O formato e o mesmo gerado por tools/gen_bible_assets.py e lido pelo
+# Saturn. O indice e pequeno (tabelas de livro/capitulo); os offsets dos
+# versos e o texto ficam no mmap e cada verso so e decodificado quando
+# acessado, entao o custo de abertura nao depende do tamanho do corpus.
+# ---------------------------------------------------------------------------
+
+BIB1_MAGIC = b"BIB1"
+BIB1_VERSION = 1
+BIB1_VERSION_SPANS = 2  # layout por setor: capitulos com offset/tamanho em bytes
+BIB1_HEADER = struct.Struct("<4sHHIII")
+BIB1_ENTRY = struct.Struct("<IHH")
+BIB1_SPAN_ENTRY = struct.Struct("<IHHII")
+
+# O BIB1 nao guarda nomes; usamos a ordem canonica do acf_clean.json.
+ACF_BOOKS: Tuple[Tuple[str, str], ...] = (
+    ("gn", "Gênesis"), ("ex", "Êxodo"), ("lv", "Levítico"), ("nm", "Números"),
+    ("dt", "Deuteronômio"), ("js", "Josué"), ("jz", "Juízes"), ("rt", "Rute"),
+    ("1sm", "1 Samuel"), ("2sm", "2 Samuel"), ("1rs", "1 Reis"), ("2rs", "2 Reis"),
+    ("1cr", "1 Crônicas"), ("2cr", "2 Crônicas"), ("ed", "Esdras"), ("ne", "Neemias"),
+    ("et", "Ester"), ("jó", "Jó"), ("sl", "Salmos"), ("pv", "Provérbios"),
+    ("ec", "Eclesiastes"), ("ct", "Cânticos"), ("is", "Isaías"), ("jr", "Jeremias"),
+    ("lm", "Lamentações de Jeremias"), ("ez", "Ezequiel"), ("dn", "Daniel"), ("os", "Oséias"),
+    ("jl", "Joel"), ("am", "Amós"), ("ob", "Obadias"), ("jn", "Jonas"),
+    ("mq", "Miquéias"), ("na", "Naum"), ("hc", "Habacuque"), ("sf", "Sofonias"),
+    ("ag", "Ageu"), ("zc", "Zacarias"), ("ml", "Malaquias"), ("mt", "Mateus"),
+    ("mc", "Marcos"), ("lc", "Lucas"), ("jo", "João"), ("atos", "Atos"),
+    ("rm", "Romanos"), ("1co", "1 Coríntios"), ("2co", "2 Coríntios"), ("gl", "Gálatas"),
+    ("ef", "Efésios"), ("fp", "Filipenses"), ("cl", "Colossenses"), ("1ts", "1 Tessalonicenses"),
+    ("2ts", "2 Tessalonicenses"), ("1tm", "1 Timóteo"), ("2tm", "2 Timóteo"), ("tt", "Tito"),
+    ("fm", "Filemom"), ("hb", "Hebreus"), ("tg", "Tiago"), ("1pe", "1 Pedro"),
+    ("2pe", "2 Pedro"), ("1jo", "1 João"), ("2jo", "2 João"), ("3jo", "3 João"),
+    ("jd", "Judas"), ("ap", "Apocalipse"),
+)
+
+
+class _ChapterView(_SequenceABC):
+    # Sequencia preguicosa de versos: so decodifica o texto ao acessar.
+    __slots__ = ("_src", "_first", "_count")
+
+    def __init__(self, src: Any, first: int, count: int) -> None:
+        self._src = src
+        self._first = first
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._src.verse_text(self._first + i)
+
+
+class _BookChaptersView(_SequenceABC):
+    # Capitulos de um livro; `src` fornece chapter_span() e verse_text().
+    __slots__ = ("_src", "_first", "_count")
+
+    def __init__(self, src: Any, first: int, count: int) -> None:
+        self._src = src
+        self._first = first
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        first, count = self._src.chapter_span(self._first + i)
+        return _ChapterView(self._src, first, count)
+
+
+class BibleStore:
+    def __init__(self, cd_dir: Path, idx_name: str = "BIBLE.IDX", bin_name: str = "BIBLE.BIN") -> None:
+        self.idx_path = cd_dir / idx_name
+        self.bin_path = cd_dir / bin_name
+        self._idx_file = self.idx_path.open("rb")
+        self._bin_file = self.bin_path.open("rb")
+        self._idx_mm = mmap.mmap(self._idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._bin_mm = mmap.mmap(self._bin_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._idx_mm) < BIB1_HEADER.size:
+            raise ValueError(f"{self.idx_path}: indice truncado.")
+        magic, version, book_count, chapter_count, verse_count, text_size = BIB1_HEADER.unpack_from(self._idx_mm, 0)
+        if magic != BIB1_MAGIC:
+            raise ValueError(f"{self.idx_path}: magic invalido ({magic!r}).")
+        if version not in (BIB1_VERSION, BIB1_VERSION_SPANS):
+            raise ValueError(f"{self.idx_path}: versao {version} nao suportada.")
+        chapter_entry = BIB1_ENTRY if version == BIB1_VERSION else BIB1_SPAN_ENTRY
+        books_off = BIB1_HEADER.size
+        chapters_off = books_off + book_count * BIB1_ENTRY.size
+        verses_off = chapters_off + chapter_count * chapter_entry.size
+        expected = verses_off + verse_count * 4
+        if len(self._idx_mm) != expected:
+            raise ValueError(f"{self.idx_path}: tamanho {len(self._idx_mm)} != {expected}.")
+        if len(self._bin_mm) != text_size:
+            raise ValueError(f"{self.bin_path}: tamanho {len(self._bin_mm)} != {text_size}.")
+
+        self.version = version
+        self.verse_count = verse_count
+        self.text_size = text_size
+        self.book_entries = [
+            (first, count) for first, count, _ in BIB1_ENTRY.iter_unpack(self._idx_mm[books_off:chapters_off])
+        ]
+        self.chapter_entries = [
+            (e[0], e[1]) for e in chapter_entry.iter_unpack(self._idx_mm[chapters_off:verses_off])
+        ]
+
+        offsets = memoryview(self._idx_mm)[verses_off:expected]
+        if sys.byteorder == "little":
+            self._offsets: Sequence[int] = offsets.cast("I")
+        else:
+            swapped = array("I", offsets.tobytes())
+            swapped.byteswap()
+            self._offsets = swapped
+        self._text = memoryview(self._bin_mm)
+
+        names = ACF_BOOKS if len(self.book_entries) == len(ACF_BOOKS) else ()
+        self.books: List[Book] = []
+        for i, (first, count) in enumerate(self.book_entries):
+            abbrev, name = names[i] if names else (str(i + 1), f"Livro {i + 1}")
+            self.books.append(Book(name=name, abbrev=abbrev, chapters=_BookChaptersView(self, first, count)))
+
+    def chapter_span(self, chap_gid: int) -> Tuple[int, int]:
+        return self.chapter_entries[chap_gid]
+
+    def verse_text(self, gid: int) -> str:
+        start = self._offsets[gid]
+        if self.version == BIB1_VERSION_SPANS:
+            # Pode haver preenchimento (NULs) entre capitulos: acha o NUL do verso.
+            return str(self._text[start : self._bin_mm.find(b"\0", start)], "latin-1")
+        end = self._offsets[gid + 1] if gid + 1 < self.verse_count else self.text_size
+        # Cada verso termina com NUL.
+        return str(self._text[start : end - 1], "latin-1")
+
+    def close(self) -> None:
+        self.books = []
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._text.release()
+        self._idx_mm.close()
+        self._bin_mm.close()
+        self._idx_file.close()
+        self._bin_file.close()
+
+
 def discover_default_json() -> Optional[Path]:
     here = Path(__file__).resolve().parent
     candidates = [
@@ -87,6 +608,15 @@ def casefold(s: str) -> str:
     return s.casefold()
 
 
+_COMBINING_RE = re.compile(r"[\u0300-\u036f]+")
+
+
+def fold(s: str) -> str:
+    # casefold + remove acentos: "Coração" -> "coracao". Para o portugues
+    # do corpus (Latin-1) cada caractere vira exatamente um.
+    return _COMBINING_RE.sub("", unicodedata.normalize("NFD", s.casefold()))
+
+
 def _clamp(v: int, lo: int, hi: int) -> int:
     if v < lo:
         return lo
@@ -208,6 +738,147 @@ def build_chapter_lines(book: Book, chap_idx: int, width: int) -> Tuple[List[str
     return lines, verse_to_line
 
 
+class RowPainter:
+    """Desenho diferencial da tela: so reescreve linhas cujo (texto, atributo) mudou.
+
+    A cada quadro a TUI declara as linhas com row(); flush() compara com o
+    que ja esta na tela, escreve so as diferentes e limpa as que sumiram.
+    Evita o erase()+redesenho completo a cada tecla (pisca em SSH lento).
+    """
+
+    def __init__(self, win: "curses._CursesWindow") -> None:
+        self.win = win
+        self._shown: Dict[int, Tuple[str, int]] = {}
+        self._frame: Dict[int, Tuple[str, int]] = {}
+
+    def row(self, y: int, text: str, attr: int) -> None:
+        self._frame[y] = (text, attr)
+
+    def flush(self) -> None:
+        h, w = self.win.getmaxyx()
+        for y, cell in self._frame.items():
+            if self._shown.get(y) != cell and 0 <= y < h:
+                _safe_addstr(self.win, y, 0, _truncate(cell[0].ljust(w), w), cell[1])
+        for y in self._shown.keys() - self._frame.keys():
+            if 0 <= y < h:
+                try:
+                    self.win.move(y, 0)
+                    self.win.clrtoeol()
+                except curses.error:
+                    pass
+        self._shown, self._frame = self._frame, {}
+
+    def forget(self, y: int) -> None:
+        # Alguem escreveu nessa linha por fora (ex.: prompt); redesenha no proximo flush.
+        self._shown.pop(y, None)
+
+    def invalidate(self) -> None:
+        self.win.erase()
+        self._shown = {}
+
+
+class ChapterPad:
+    """Capitulo inteiro num curses pad; rolar e so um pnoutrefresh com outro offset.
+
+    O pad so e refeito quando muda o layout (outra lista de linhas), a
+    largura ou a altura da area de leitura.
+    """
+
+    def __init__(self) -> None:
+        self.pad: Optional["curses._CursesWindow"] = None
+        self._lines: Optional[List[str]] = None
+        self._size = (0, 0)
+
+    def touch(self) -> None:
+        if self.pad is not None:
+            self.pad.touchwin()
+
+    def show(self, lines: List[str], width: int, view_h: int, top: int, y0: int, attr: int) -> None:
+        if self.pad is None or self._lines is not lines or self._size != (width, view_h):
+            pad = curses.newpad(max(len(lines), view_h), max(1, width))
+            pad.bkgd(" ", attr)
+            for i, line in enumerate(lines):
+                _safe_addstr(pad, i, 0, _truncate(line.ljust(width), width), attr)
+            self.pad = pad
+            self._lines = lines
+            self._size = (width, view_h)
+        try:
+            self.pad.noutrefresh(top, 0, y0, 0, y0 + view_h - 1, width - 1)
+        except curses.error:
+            pass
+
+
+ChapterLayout = Tuple[List[str], List[int]]
+
+
+class ChapterLayoutCache:
+    """LRU de capitulos ja quebrados em linhas, chave (livro, capitulo, largura).
+
+    Uma thread de fundo pre-quebra o capitulo anterior e o proximo enquanto o
+    usuario le, entao Left/Right, retorno do F1 e saltos da busca viram so
+    uma consulta ao dicionario. As listas devolvidas sao compartilhadas:
+    quem chama nao deve altera-las.
+    """
+
+    def __init__(self, books: Sequence[Book], max_entries: int = 32) -> None:
+        self.books = books
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Tuple[int, int, int], ChapterLayout]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Tuple[int, int, int]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def _lookup(self, key: Tuple[int, int, int]) -> Optional[ChapterLayout]:
+        with self._lock:
+            layout = self._entries.get(key)
+            if layout is not None:
+                self._entries.move_to_end(key)
+            return layout
+
+    def _store(self, key: Tuple[int, int, int], layout: ChapterLayout) -> None:
+        with self._lock:
+            self._entries[key] = layout
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, b: int, c: int, width: int) -> ChapterLayout:
+        key = (b, c, width)
+        layout = self._lookup(key)
+        if layout is None:
+            layout = build_chapter_lines(self.books[b], c, width)
+            self._store(key, layout)
+        return layout
+
+    def prefetch_neighbours(self, b: int, c: int, width: int) -> None:
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="chapter-prefetch", daemon=True)
+            self._worker.start()
+        for nc in (c + 1, c - 1):
+            if 0 <= nc < len(self.books[b].chapters):
+                self._queue.put((b, nc, width))
+
+    def _run(self) -> None:
+        while True:
+            key = self._queue.get()
+            if key is None:
+                return
+            if self._lookup(key) is None:
+                b, c, width = key
+                self._store(key, build_chapter_lines(self.books[b], c, width))
+
+    def close(self) -> None:
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join(timeout=1.0)
+            self._worker = None
+
+
+def _top_verse(verse_to_line: Sequence[int], scroll_line: int) -> int:
+    # Maior verso cujo inicio <= scroll_line (verse_to_line e crescente).
+    return max(0, bisect_right(verse_to_line, scroll_line) - 1)
+
+
 def _format_ref(books: List[Book], b: int, c: int, v: Optional[int] = None) -> str:
     book = books[b]
     if v is None:
@@ -215,6 +886,55 @@ def _format_ref(books: List[Book], b: int, c: int, v: Optional[int] = None) -> s
     return f"{book.name} {c+1}:{v+1}"
 
 
+_REF_RE = re.compile(r"^\s*(.+?)\s*(\d+)(?:\s*[:.]\s*(\d+)(?:\s*-\s*(\d+))?)?\s*$")
+
+
+def book_lookup(books: Sequence[Book]) -> Dict[str, int]:
+    """Chaves (abbrev/nome, sem espacos) -> indice do livro.
+
+    Grafia exata (so casefold) tem prioridade sobre a versao sem acentos:
+    "jo" e Joao e "jó" e Jo, mas "genesis" ainda acha Gênesis.
+    """
+    exact: Dict[str, int] = {}
+    loose: Dict[str, int] = {}
+    for bi, book in enumerate(books):
+        for key in (book.abbrev, book.name):
+            k = casefold(key).replace(" ", "")
+            exact.setdefault(k, bi)
+            loose.setdefault(fold(k), bi)
+    return {**loose, **exact}
+
+
+def parse_ref(books: Sequence[Book], lookup: Dict[str, int], text: str) -> Optional[Tuple[int, int, int, int]]:
+    """"Jo 3:16", "1 Samuel 3", "sl 119:1-8" -> (livro, capitulo, v_ini, v_fim).
+
+    Indices base 0, v_fim exclusivo. Devolve None se o texto nao comeca com um
+    livro conhecido (e entao e tratado como busca); ValueError se o livro
+    existe mas capitulo/verso estao fora do intervalo.
+    """
+    m = _REF_RE.match(text)
+    if not m:
+        return None
+    key = casefold(m.group(1)).replace(" ", "")
+    bi = lookup.get(key)
+    if bi is None:
+        bi = lookup.get(fold(key))
+    if bi is None:
+        return None
+    book = books[bi]
+    c = int(m.group(2)) - 1
+    if not 0 <= c < len(book.chapters):
+        raise ValueError(f"{book.name} tem {len(book.chapters)} capitulos")
+    n = len(book.chapters[c])
+    if m.group(3) is None:
+        return bi, c, 0, n
+    v0 = int(m.group(3)) - 1
+    v1 = int(m.group(4)) if m.group(4) else v0 + 1
+    if not 0 <= v0 < v1 <= n:
+        raise ValueError(f"{book.name} {c+1} tem {n} versos")
+    return bi, c, v0, v1
+
+
 def _draw_help(stdscr: "curses._CursesWindow", attr_title: int, attr_body: int) -> None:
     stdscr.erase()
     h, w = stdscr.getmaxyx()
@@ -235,6 +955,15 @@ def _draw_help(stdscr: "curses._CursesWindow", attr_title: int, attr_body: int)
         "  /                  : buscar (global)",
         "",
         "Busca:",
+        "  a b / a AND b      : todos os termos",
+        "  a OR b / NOT a / -a: alternativa / exclusao",
+        '  "no principio"     : frase exata',
+        "  princ*             : prefixo",
+        "  livro:gn,ex        : limitar a livros",
+        "  re:<regex>         : expressao regular",
+        "  ?amor fe esperanca : ranking BM25 (melhores primeiro)",
+        "  ~coracao           : trecho de texto (substring)",
+        "  (maiusculas e acentos sao ignorados)",
         "  Enter              : abrir resultado",
         "  ESC/b              : fechar resultados",
         "",
@@ -269,7 +998,697 @@ def _search_all(books: List[Book], query: str) -> List[SearchHit]:
     return hits
 
 
-def run_tui(stdscr: "curses._CursesWindow", books: List[Book], json_path: Path) -> int:
+# ---------------------------------------------------------------------------
+# Indice invertido posicional
+#
+# Cada verso recebe um id global (ordem canonica: livro, capitulo, verso).
+# Tokens sao normalizados com fold() (sem maiusculas nem acentos).
+# As postings de cada token ficam num array('Q') ordenado com o valor
+# empacotado (gid << POS_BITS) | posicao, entao "posicao seguinte no mesmo
+# verso" e simplesmente p + 1 -- o que deixa a busca por frase barata.
+#
+# Sintaxe de consulta:
+#   palavra palavra      -> AND implicito
+#   "no principio"       -> frase exata
+#   a OR b, a AND b      -> operadores booleanos (maiusculos)
+#   NOT a, -a            -> exclusao
+#   princ*               -> prefixo
+#   livro:gn,ex          -> restringe aos livros (abbrev ou nome)
+#   ( ... )              -> agrupamento
+# ---------------------------------------------------------------------------
+
+POS_BITS = 16
+POS_MASK = (1 << POS_BITS) - 1
+
+_TOKEN_RE = re.compile(r"\w+")
+_QUERY_LEX_RE = re.compile(r'\(|\)|"[^"]*"?|[^\s()"]+')
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(fold(text))
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+# Arvore da consulta: tuplas ("or", a, b), ("and", a, b), ("not", x),
+# ("phrase", [tokens]), ("prefix", token) e ("book", spec). search() e rank()
+# usam o mesmo parser; search() avalia a arvore por faixa de gids.
+QueryNode = Tuple[Any, ...]
+
+
+def parse_query(query: str) -> Optional[QueryNode]:
+    """Arvore da consulta (None se vazia); QuerySyntaxError se malformada."""
+    toks = _QUERY_LEX_RE.findall(query)
+    if not toks:
+        return None
+    pos = 0
+
+    def peek() -> Optional[str]:
+        return toks[pos] if pos < len(toks) else None
+
+    def take() -> str:
+        nonlocal pos
+        t = toks[pos]
+        pos += 1
+        return t
+
+    # Descida recursiva: OR < AND < NOT.
+    def parse_or() -> QueryNode:
+        acc = parse_and()
+        while peek() == "OR":
+            take()
+            acc = ("or", acc, parse_and())
+        return acc
+
+    def parse_and() -> QueryNode:
+        acc = parse_not()
+        while peek() is not None and peek() not in ("OR", ")"):
+            if peek() == "AND":
+                take()
+            acc = ("and", acc, parse_not())
+        return acc
+
+    def parse_not() -> QueryNode:
+        t = peek()
+        if t == "NOT":
+            take()
+            return ("not", parse_not())
+        if t is not None and len(t) > 1 and t.startswith("-") and t != "-":
+            toks[pos] = t[1:]
+            return ("not", parse_not())
+        return parse_atom()
+
+    def parse_atom() -> QueryNode:
+        t = peek()
+        if t is None:
+            raise QuerySyntaxError("consulta incompleta")
+        take()
+        if t == "(":
+            inner = parse_or()
+            if peek() != ")":
+                raise QuerySyntaxError("falta ')'")
+            take()
+            return inner
+        if t == ")":
+            raise QuerySyntaxError("')' inesperado")
+        if t.startswith('"'):
+            return ("phrase", tokenize(t.strip('"')))
+        if ":" in t:
+            key, _, spec = t.partition(":")
+            if casefold(key) == "livro":
+                return ("book", spec)
+        if t.endswith("*") and len(t) > 1:
+            words = tokenize(t[:-1])
+            if len(words) == 1:
+                return ("prefix", words[0])
+        return ("phrase", tokenize(t))
+
+    tree = parse_or()
+    if pos != len(toks):
+        raise QuerySyntaxError(f"token inesperado: {toks[pos]!r}")
+    return tree
+
+
+class SearchIndex:
+    """Indice invertido; construido de uma vez ou em fatias (build=False).
+
+    Com build=False, build_step() indexa BUILD_SLICE versos por chamada (e
+    pode ser retomado depois de uma busca cancelada); search()/rank()
+    completam o que faltar antes de responder.
+    """
+
+    BUILD_SLICE = 2048
+
+    def __init__(self, books: List[Book], build: bool = True) -> None:
+        self.books = books
+        self.map = VerseMap.from_books(books)
+        self.postings: Dict[str, array] = {}
+        self.doc_len = array("H")  # numero de tokens de cada verso (BM25)
+        # term -> (gids, tf por gid), derivado das postings uma unica vez.
+        self.term_freqs: Dict[str, Tuple[array, array]] = {}
+        self._doc_cache: "OrderedDict[str, FrozenSet[int]]" = OrderedDict()
+        # O servidor consulta o mesmo indice de varias threads: get ->
+        # move_to_end -> popitem do LRU precisam ser atomicos.
+        self._cache_lock = threading.Lock()
+        self.verse_count = self.map.verse_count
+        self.vocab: List[str] = []
+        self.avg_doc_len = 0.0
+        self._built = 0  # versos ja indexados (gids 0.._built-1)
+        self._ready = False
+        self._build_lock = threading.Lock()
+        if build:
+            self.build()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def build_step(self) -> bool:
+        """Indexa a proxima fatia de versos; True quando o indice esta pronto."""
+        with self._build_lock:
+            if self._ready:
+                return True
+            postings = self.postings
+            end = min(self._built + self.BUILD_SLICE, self.verse_count)
+            for gid in range(self._built, end):
+                b, c, v = self.map.locate(gid)
+                base = gid << POS_BITS
+                toks = tokenize(self.books[b].chapters[c][v])
+                self.doc_len.append(min(len(toks), 0xFFFF))
+                for pos, tok in enumerate(toks):
+                    if pos > POS_MASK:
+                        break
+                    lst = postings.get(tok)
+                    if lst is None:
+                        lst = postings[tok] = array("Q")
+                    lst.append(base | pos)
+            self._built = end
+            if end == self.verse_count:
+                self._finish()
+            return self._ready
+
+    def build(self) -> None:
+        while not self.build_step():
+            pass
+
+    def _finish(self) -> None:
+        gid = self.verse_count
+        self.vocab = sorted(self.postings)
+        self.avg_doc_len = (sum(self.doc_len) / gid) if gid else 0.0
+
+        for tok, lst in self.postings.items():
+            docs = array("I")
+            tfs = array("H")
+            prev = -1
+            for p in lst:
+                g = p >> POS_BITS
+                if g == prev:
+                    tfs[-1] += 1
+                else:
+                    docs.append(g)
+                    tfs.append(1)
+                    prev = g
+            self.term_freqs[tok] = (docs, tfs)
+        self._ready = True
+
+    def locate(self, gid: int) -> Tuple[int, int, int]:
+        return self.map.locate(gid)
+
+    # -- primitivas (restritas aos gids lo..hi-1) ---------------------------
+
+    def _docs(self, tok: str, lo: int = 0, hi: Optional[int] = None) -> FrozenSet[int]:
+        if hi is not None and (lo, hi) != (0, self.verse_count):
+            tf = self.term_freqs.get(tok)
+            if tf is None:
+                return frozenset()
+            docs = tf[0]
+            i = bisect_left(docs, lo)
+            return frozenset(docs[i : bisect_left(docs, hi, i)])
+        with self._cache_lock:
+            cached = self._doc_cache.get(tok)
+            if cached is not None:
+                self._doc_cache.move_to_end(tok)
+                return cached
+        tf = self.term_freqs.get(tok)
+        docs = frozenset(tf[0]) if tf else frozenset()
+        with self._cache_lock:
+            self._doc_cache[tok] = docs
+            if len(self._doc_cache) > 256:
+                self._doc_cache.popitem(last=False)
+        return docs
+
+    def _prefix_docs(self, prefix: str, lo: int = 0, hi: Optional[int] = None) -> Set[int]:
+        out: Set[int] = set()
+        i = bisect_left(self.vocab, prefix)
+        while i < len(self.vocab) and self.vocab[i].startswith(prefix):
+            out |= self._docs(self.vocab[i], lo, hi)
+            i += 1
+        return out
+
+    def _phrase_docs(self, toks: List[str], lo: int = 0, hi: Optional[int] = None) -> Set[int]:
+        if not toks:
+            return set()
+        if len(toks) == 1:
+            return set(self._docs(toks[0], lo, hi))
+        lists = [self.postings.get(t) for t in toks]
+        if any(lst is None for lst in lists):
+            return set()
+        docsets = sorted((self._docs(t, lo, hi) for t in toks), key=len)
+        candidates = set(docsets[0])
+        for ds in docsets[1:]:
+            candidates &= ds
+        if not candidates:
+            return set()
+        # Ancora no termo mais raro e confere os vizinhos por bisect:
+        # a frase comeca em p - a e o k-esimo termo deve estar em start + k.
+        a = min(range(len(toks)), key=lambda k: len(lists[k]))
+        others = [(k, lists[k]) for k in range(len(toks)) if k != a]
+        anchor = lists[a]
+        first = bisect_left(anchor, min(candidates) << POS_BITS)
+        last = bisect_left(anchor, (max(candidates) + 1) << POS_BITS, first)
+        out: Set[int] = set()
+        for i in range(first, last):
+            p = anchor[i]
+            g = p >> POS_BITS
+            if g not in candidates or g in out or (p & POS_MASK) < a:
+                continue
+            start = p - a
+            for k, lst in others:
+                want = start + k
+                j = bisect_left(lst, want)
+                if j == len(lst) or lst[j] != want:
+                    break
+            else:
+                out.add(g)
+        return out
+
+    def _filter_docs(self, spec: str, lo: int = 0, hi: Optional[int] = None) -> Set[int]:
+        hi = self.verse_count if hi is None else hi
+        out: Set[int] = set()
+        for part in spec.split(","):
+            # fold() como nos tokens: "livro:genesis" acha "Gênesis".
+            key = fold(part.strip())
+            if not key:
+                continue
+            for bi, book in enumerate(self.books):
+                if key == fold(book.abbrev) or key == fold(book.name):
+                    r = self.map.book_range(bi)
+                    out.update(range(max(r.start, lo), min(r.stop, hi)))
+        return out
+
+    def evaluate(self, tree: QueryNode, lo: int = 0, hi: Optional[int] = None) -> Set[int]:
+        """gids de lo..hi-1 que satisfazem a arvore (parse_query)."""
+        hi = self.verse_count if hi is None else hi
+        kind = tree[0]
+        if kind == "or":
+            return self.evaluate(tree[1], lo, hi) | self.evaluate(tree[2], lo, hi)
+        if kind == "and":
+            acc = self.evaluate(tree[1], lo, hi)
+            return acc & self.evaluate(tree[2], lo, hi) if acc else acc
+        if kind == "not":
+            return set(range(lo, hi)) - self.evaluate(tree[1], lo, hi)
+        if kind == "phrase":
+            return self._phrase_docs(tree[1], lo, hi)
+        if kind == "prefix":
+            return self._prefix_docs(tree[1], lo, hi)
+        return self._filter_docs(tree[1], lo, hi)
+
+    # -- ranking BM25 ------------------------------------------------------
+
+    def rank(self, query: str, k: int = 200, k1: float = 1.2, b: float = 0.75) -> array:
+        """Top-k versos por BM25, do melhor para o pior.
+
+        A consulta passa pelo mesmo parser de search(), mas so as palavras
+        positivas pontuam (OR implicito entre elas); o que esta sob NOT/-
+        sai dos candidatos e `livro:` filtra. So as postings dos termos da
+        consulta sao percorridas, e um heap escolhe os k melhores sem
+        ordenar tudo.
+        """
+        tree = parse_query(query)
+        if tree is None:
+            return array("I")
+        self.build()
+        terms: List[str] = []
+        allowed: Optional[Set[int]] = None
+        excluded: Set[int] = set()
+
+        def collect(node: QueryNode, negated: bool) -> None:
+            nonlocal allowed
+            kind = node[0]
+            if kind == "not":
+                collect(node[1], not negated)
+            elif kind in ("and", "or"):
+                collect(node[1], negated)
+                collect(node[2], negated)
+            elif negated:
+                excluded.update(self.evaluate(node))
+            elif kind == "book":
+                docs = self._filter_docs(node[1])
+                allowed = docs if allowed is None else allowed & docs
+            elif kind == "prefix":
+                terms.append(node[1])
+            else:
+                terms.extend(node[1])
+
+        collect(tree, False)
+
+        n = self.verse_count
+        dl, avgdl = self.doc_len, self.avg_doc_len or 1.0
+        scores: Dict[int, float] = {}
+        for term in dict.fromkeys(terms):
+            tf = self.term_freqs.get(term)
+            if tf is None:
+                continue
+            docs, freqs = tf
+            idf = math.log(1.0 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for g, f in zip(docs, freqs):
+                if (allowed is not None and g not in allowed) or g in excluded:
+                    continue
+                norm = k1 * (1.0 - b + b * dl[g] / avgdl)
+                scores[g] = scores.get(g, 0.0) + idf * f * (k1 + 1.0) / (f + norm)
+
+        # Empate: ordem canonica (gid menor primeiro).
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return array("I", (g for g, _ in best))
+
+    def search(self, query: str) -> array:
+        tree = parse_query(query)
+        if tree is None:
+            return array("I")
+        self.build()
+        return array("I", sorted(self.evaluate(tree)))
+
+
+# ---------------------------------------------------------------------------
+# Busca por expressao regular em processos (shards de tamanho parecido)
+#
+# Cada processo do pool recebe o texto do Corpus uma vez (initializer) e
+# compila cada padrao uma vez (lru_cache); as tarefas sao so intervalos de
+# gids com mais ou menos o mesmo numero de bytes de texto (Salmos nao vira
+# um shard gigante), e os resultados voltam em ordem canonica. O pool usa
+# forkserver/spawn: ele e criado pela thread da busca, com outras threads
+# rodando, e fork() nesse estado pode herdar locks travados.
+# ---------------------------------------------------------------------------
+
+_GREP_TEXT = ""
+_GREP_OFFSETS = array("I")
+
+
+def _grep_worker_init(text: str, offsets: array) -> None:
+    global _GREP_TEXT, _GREP_OFFSETS
+    _GREP_TEXT = text
+    _GREP_OFFSETS = offsets
+
+
+@lru_cache(maxsize=32)
+def _compile_grep(pattern: str, flags: int) -> "re.Pattern[str]":
+    return re.compile(pattern, flags)
+
+
+def _grep_shard(pattern: str, flags: int, start: int, end: int) -> array:
+    search = _compile_grep(pattern, flags).search
+    text, offs = _GREP_TEXT, _GREP_OFFSETS
+    return array("I", (g for g in range(start, end) if search(text[offs[g] : offs[g + 1]])))
+
+
+def _byte_shards(offsets: array, count: int) -> List[Tuple[int, int]]:
+    """Ate `count` intervalos de gids com ~o mesmo numero de bytes de texto."""
+    verses = len(offsets) - 1
+    total = offsets[-1] if verses > 0 else 0
+    bounds = [0]
+    for k in range(1, count):
+        g = bisect_left(offsets, total * k // count, 0, verses)
+        if g > bounds[-1]:
+            bounds.append(g)
+    if verses > bounds[-1]:
+        bounds.append(verses)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class RegexSearcher:
+    SHARDS_PER_JOB = 4
+
+    def __init__(self, corpus: Corpus, jobs: Optional[int] = None) -> None:
+        self.corpus = corpus
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        # Varios shards por processo: o primeiro lote sai cedo e o pool se
+        # equilibra mesmo com regex de custo desigual entre trechos.
+        self.shards = _byte_shards(corpus.verse_offsets, self.jobs * self.SHARDS_PER_JOB)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def iter_search(self, pattern: str, flags: int = re.IGNORECASE) -> Iterator[array]:
+        # Valida no processo principal: re.error sobe antes de usar o pool.
+        re.compile(pattern, flags)
+        if self.jobs == 1:
+            _grep_worker_init(self.corpus.text, self.corpus.verse_offsets)
+            for start, end in self.shards:
+                yield _grep_shard(pattern, flags, start, end)
+            return
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.jobs,
+                mp_context=_pool_context(),
+                initializer=_grep_worker_init,
+                initargs=(self.corpus.text, self.corpus.verse_offsets),
+            )
+        futures = [self._pool.submit(_grep_shard, pattern, flags, start, end) for start, end in self.shards]
+        try:
+            for fut in futures:
+                yield fut.result()
+        finally:
+            for fut in futures:
+                fut.cancel()
+
+    def search(self, pattern: str, flags: int = re.IGNORECASE) -> array:
+        out = array("I")
+        for batch in self.iter_search(pattern, flags):
+            out.extend(batch)
+        return out
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+def iter_regex_search(get_searcher: Callable[[], RegexSearcher], pattern: str) -> Iterator[array]:
+    try:
+        yield from get_searcher().iter_search(pattern)
+    except re.error as e:
+        raise QuerySyntaxError(f"regex invalida: {e}") from e
+
+
+def _iter_build(index: SearchIndex, prof: Optional[Profiler]) -> Iterator[array]:
+    # Termina o indice em fatias; cada lote vazio e um ponto em que o
+    # SearchJob confere o cancelamento (a construcao continua na proxima busca).
+    while not index.ready:
+        if prof is None:
+            index.build_step()
+        else:
+            with prof.stage("index_build"):
+                index.build_step()
+        yield array("I")
+
+
+def iter_index_search(
+    get_index: Callable[[], SearchIndex], query: str, shard: int = 4096, prof: Optional[Profiler] = None
+) -> Iterator[array]:
+    # Produtor da busca: valida a consulta, completa o indice (so na 1a vez)
+    # e avalia a consulta por faixa de `shard` gids, entregando cada faixa
+    # assim que fica pronta -- a 1a pagina aparece antes do fim da busca.
+    tree = parse_query(query)
+    index = get_index()
+    yield from _iter_build(index, prof)
+    if tree is None:
+        return
+    for lo in range(0, index.verse_count, shard):
+        yield array("I", sorted(index.evaluate(tree, lo, min(lo + shard, index.verse_count))))
+
+
+def iter_substring_search(get_folded: Callable[[], FoldedText], query: str) -> Iterator[array]:
+    yield from get_folded().iter_search(query)
+
+
+def iter_ranked_search(
+    get_index: Callable[[], SearchIndex], query: str, k: int = 500, prof: Optional[Profiler] = None
+) -> Iterator[array]:
+    parse_query(query)
+    index = get_index()
+    yield from _iter_build(index, prof)
+    yield index.rank(query, k)
+
+
+class SearchJob:
+    """Consome um produtor de lotes de gids numa thread de fundo.
+
+    `hits` cresce enquanto a busca roda; a TUI le len()/fatias direto dele
+    (cada operacao do array e atomica sob o GIL). cancel() interrompe o
+    consumo entre um lote e outro.
+    """
+
+    def __init__(self, producer: Iterator[array]) -> None:
+        self.hits = array("I")
+        self.error: Optional[str] = None
+        self.cancelled = False
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(producer,), name="search", daemon=True)
+        self._thread.start()
+
+    def _run(self, producer: Iterator[array]) -> None:
+        try:
+            for batch in producer:
+                if self._cancel.is_set():
+                    self.cancelled = True
+                    break
+                self.hits.extend(batch)
+        except QuerySyntaxError as e:
+            self.error = str(e)
+        finally:
+            # Fecha o gerador ja (e nao so no GC): libera futures pendentes e
+            # deixa o Profiler registrar a duracao da busca cancelada.
+            close = getattr(producer, "close", None)
+            if close is not None:
+                close()
+            self._done.set()
+
+    @property
+    def running(self) -> bool:
+        return not self._done.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+
+class Profiler:
+    """Tempos por etapa (--profile), gravados como trace JSON.
+
+    O arquivo segue o formato "Trace Event" (abre em chrome://tracing ou
+    ui.perfetto.dev): cada etapa vira um evento "X" com inicio/duracao em
+    microssegundos desde a partida do programa, e marcos (ex.: primeiro
+    frame) viram eventos "i". Com capture="cprofile" o trace ganha as
+    funcoes mais caras (e um .prof ao lado, para pstats/snakeviz); com
+    capture="tracemalloc", a memoria atual/pico em cada etapa e as linhas
+    que mais alocaram.
+
+    Desligado (path=None), stage()/mark() nao registram nada.
+    """
+
+    TOP = 30
+
+    def __init__(self, path: Optional[Path] = None, capture: Sequence[str] = ()) -> None:
+        self.path = path
+        self.enabled = path is not None
+        self.capture = frozenset(capture) if self.enabled else frozenset()
+        self.events: List[Dict[str, Any]] = []
+        self._t0 = time.perf_counter()
+        self._pid = os.getpid()
+        self._cprof: Optional[cProfile.Profile] = None
+        if "tracemalloc" in self.capture and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if "cprofile" in self.capture:
+            # cProfile so enxerga a thread que o ligou (a principal); buscas
+            # e pre-quebra de capitulos rodam em threads e aparecem so nos tempos.
+            self._cprof = cProfile.Profile()
+            self._cprof.enable()
+
+    def _us(self, t: float) -> float:
+        return round((t - self._t0) * 1e6, 1)
+
+    def _record(self, name: str, start: float, end: float, args: Dict[str, Any]) -> None:
+        if "tracemalloc" in self.capture:
+            cur, peak = tracemalloc.get_traced_memory()
+            args = dict(args, mem_bytes=cur, mem_peak_bytes=peak)
+        # list.append e atomico sob o GIL: threads de busca tambem registram.
+        self.events.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": self._us(start),
+                "dur": round((end - start) * 1e6, 1),
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+        )
+
+    @contextlib.contextmanager
+    def stage(self, name: str, **args: Any) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter(), args)
+
+    def mark(self, name: str, **args: Any) -> None:
+        if not self.enabled:
+            return
+        self.events.append(
+            {"name": name, "ph": "i", "s": "g", "ts": self._us(time.perf_counter()), "pid": self._pid,
+             "tid": threading.get_ident(), "args": args}
+        )
+
+    def timed_iter(self, name: str, producer: Iterator[array], **args: Any) -> Iterator[array]:
+        # Envolve um produtor de lotes: mede da 1a chamada ate esgotar/fechar.
+        if not self.enabled:
+            yield from producer
+            return
+        start = time.perf_counter()
+        first: Optional[float] = None
+        hits = 0
+        done = False
+        try:
+            for batch in producer:
+                if first is None and batch:
+                    first = time.perf_counter()
+                hits += len(batch)
+                yield batch
+            done = True
+        finally:
+            extra = {"hits": hits, "complete": done}
+            if first is not None:
+                extra["first_batch_us"] = round((first - start) * 1e6, 1)
+            self._record(name, start, time.perf_counter(), dict(args, **extra))
+
+    def write(self) -> None:
+        if self.path is None:
+            return
+        trace: Dict[str, Any] = {
+            "traceEvents": sorted(self.events, key=lambda e: e["ts"]),
+            "displayTimeUnit": "ms",
+            "otherData": {"argv": sys.argv, "python": sys.version.split()[0], "capture": sorted(self.capture)},
+        }
+        if self._cprof is not None:
+            self._cprof.disable()
+            prof_path = self.path.with_suffix(".prof")
+            self._cprof.dump_stats(str(prof_path))
+            stats = pstats.Stats(self._cprof)
+            rows = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[: self.TOP]
+            trace["cprofile"] = {
+                "stats_file": str(prof_path),
+                "top_cumulative": [
+                    {"func": f"{fn}:{line}({func})", "ncalls": nc, "tottime_s": tt, "cumtime_s": ct}
+                    for (fn, line, func), (_cc, nc, tt, ct, _callers) in rows
+                ],
+            }
+        if "tracemalloc" in self.capture and tracemalloc.is_tracing():
+            snap = tracemalloc.take_snapshot()
+            cur, peak = tracemalloc.get_traced_memory()
+            trace["tracemalloc"] = {
+                "current_bytes": cur,
+                "peak_bytes": peak,
+                "top_lines": [
+                    {"where": f"{st.traceback[0].filename}:{st.traceback[0].lineno}", "bytes": st.size, "blocks": st.count}
+                    for st in snap.statistics("lineno")[: self.TOP]
+                ],
+            }
+        self.path.write_text(json.dumps(trace, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def run_tui(
+    stdscr: "curses._CursesWindow",
+    books: List[Book],
+    json_path: Path,
+    prof: Optional[Profiler] = None,
+    corpus: Optional[Corpus] = None,
+    jobs: Optional[int] = None,
+) -> int:
+    # `corpus` e o ja carregado por _run (talvez do cache .bibc); sem ele
+    # (--store) o texto corrido so e montado se regex/~ forem usados.
+    prof = prof or Profiler()
     try:
         curses.curs_set(0)
     except curses.error:
@@ -311,33 +1730,101 @@ def run_tui(stdscr: "curses._CursesWindow", books: List[Book], json_path: Path)
     chapter_lines: List[str] = []
     verse_to_line: List[int] = []
 
-    search_hits: List[SearchHit] = []
+    search_hits = array("I")  # gids globais dos versos encontrados (cresce durante a busca)
     search_sel = 0
     search_top = 0
     last_query: Optional[str] = None
+    search_job: Optional[SearchJob] = None
+    index: Optional[SearchIndex] = None
+    index_lock = threading.Lock()
+    regex: Optional[RegexSearcher] = None
+    folded: Optional[FoldedText] = None
+    vmap = VerseMap.from_books(books)
+
+    def get_index() -> SearchIndex:
+        # Chamado pela thread da busca; o indice e criado vazio e os
+        # produtores o completam em fatias (ESC interrompe entre elas).
+        nonlocal index
+        with index_lock:
+            if index is None:
+                index = SearchIndex(books, build=False)
+            return index
+
+    def get_regex() -> RegexSearcher:
+        nonlocal regex
+        with index_lock:
+            if regex is None:
+                with prof.stage("regex_setup"):
+                    regex = RegexSearcher(corpus or Corpus.from_books(books), jobs)
+            return regex
+
+    def get_folded() -> FoldedText:
+        nonlocal folded
+        with index_lock:
+            if folded is None:
+                with prof.stage("fold_build"):
+                    folded = corpus.folded() if corpus is not None else FoldedText.from_books(books)
+            return folded
+
+    def run_search(q: str) -> None:
+        nonlocal search_job, search_hits, search_sel, search_top, last_query
+        if search_job is not None:
+            search_job.cancel()
+        last_query = q
+        producer: Iterator[array]
+        if q.startswith("re:"):
+            producer = iter_regex_search(get_regex, q[3:])
+        elif q.startswith("?"):
+            producer = iter_ranked_search(get_index, q[1:], prof=prof)
+        elif q.startswith("~"):
+            producer = iter_substring_search(get_folded, q[1:])
+        else:
+            producer = iter_index_search(get_index, q, prof=prof)
+        search_job = SearchJob(prof.timed_iter("search", producer, query=q))
+        search_hits = search_job.hits
+        search_sel = 0
+        search_top = 0
+
+    layouts = ChapterLayoutCache(books)
 
     def rebuild_reader() -> None:
         nonlocal chapter_lines, verse_to_line, scroll_line
         h, w = stdscr.getmaxyx()
         content_w = max(10, w - 2)
-        chapter_lines, verse_to_line = build_chapter_lines(books[cur_book], cur_chap, content_w)
+        with prof.stage("chapter", book=cur_book, chapter=cur_chap, width=content_w):
+            chapter_lines, verse_to_line = layouts.get(cur_book, cur_chap, content_w)
+        layouts.prefetch_neighbours(cur_book, cur_chap, content_w)
         max_scroll = max(0, len(chapter_lines) - max(1, (h - 3)))
         scroll_line = _clamp(scroll_line, 0, max_scroll)
 
     rebuild_reader()
 
+    painter = RowPainter(stdscr)
+    reader_pad = ChapterPad()
+    shown_state = ""
+    shown_size = (0, 0)
+
+    # Menus: a lista de livros e fixa; a de capitulos e montada uma vez por livro.
+    book_items = [f"{i+1:>2} {b.name}" for i, b in enumerate(books)]
+    chapter_items: Dict[int, List[str]] = {}
+    first_frame = True
+
     while True:
-        stdscr.erase()
         h, w = stdscr.getmaxyx()
+        if state != shown_state or (h, w) != shown_size:
+            # Troca de tela/tamanho: limpa tudo uma vez; depois so diferencas.
+            painter.invalidate()
+            reader_pad.touch()
+            shown_state = state
+            shown_size = (h, w)
 
         title = f"Biblia ACF (DOS-like)  |  {json_path.name}  |  F1 Ajuda"
-        _draw_bar(stdscr, 0, title, attr_title)
+        painter.row(0, title, attr_title)
 
         footer = "q sair | Enter selecionar | b voltar | / buscar | setas navegar"
-        _draw_bar(stdscr, h - 1, footer, attr_title)
 
         if state == "books":
-            items = [f"{i+1:>2} {b.name}" for i, b in enumerate(books)]
+            items = book_items
             content_h = max(1, h - 2)
             book_top = _clamp(book_top, 0, max(0, len(items) - content_h))
             book_sel = _clamp(book_sel, 0, max(0, len(items) - 1))
@@ -346,19 +1833,20 @@ def run_tui(stdscr: "curses._CursesWindow", books: List[Book], json_path: Path)
             if book_sel >= book_top + content_h:
                 book_top = book_sel - content_h + 1
 
-            _safe_addstr(stdscr, 1, 0, _truncate("Selecione o livro:", w), attr_body)
+            painter.row(1, "Selecione o livro:", attr_body)
             for row in range(content_h - 1):
                 idx = book_top + row
                 if idx >= len(items):
                     break
-                y = 2 + row
-                s = _truncate(items[idx].ljust(w), w)
                 attr = attr_hi if idx == book_sel else attr_norm
-                _safe_addstr(stdscr, y, 0, s, attr)
+                painter.row(2 + row, items[idx], attr)
+            painter.row(h - 1, footer, attr_title)
 
         elif state == "chapters":
             book = books[cur_book]
-            items = [f"Capitulo {i+1}" for i in range(len(book.chapters))]
+            items = chapter_items.get(cur_book)
+            if items is None:
+                items = chapter_items[cur_book] = [f"Capitulo {i+1}" for i in range(len(book.chapters))]
             content_h = max(1, h - 2)
             chap_top = _clamp(chap_top, 0, max(0, len(items) - content_h))
             chap_sel = _clamp(chap_sel, 0, max(0, len(items) - 1))
@@ -367,63 +1855,34 @@ def run_tui(stdscr: "curses._CursesWindow", books: List[Book], json_path: Path)
             if chap_sel >= chap_top + content_h:
                 chap_top = chap_sel - content_h + 1
 
-            _safe_addstr(
-                stdscr,
-                1,
-                0,
-                _truncate(f"{book.name}  |  Selecione o capitulo:", w),
-                attr_body,
-            )
+            painter.row(1, f"{book.name}  |  Selecione o capitulo:", attr_body)
             for row in range(content_h - 1):
                 idx = chap_top + row
                 if idx >= len(items):
                     break
-                y = 2 + row
-                s = _truncate(items[idx].ljust(w), w)
                 attr = attr_hi if idx == chap_sel else attr_norm
-                _safe_addstr(stdscr, y, 0, s, attr)
+                painter.row(2 + row, items[idx], attr)
+            painter.row(h - 1, footer, attr_title)
 
         elif state == "reader":
             book = books[cur_book]
             chap = cur_chap
             header = f"{book.name}  Capitulo {chap+1}/{len(book.chapters)}"
-            _safe_addstr(stdscr, 1, 0, _truncate(header.ljust(w), w), attr_body)
+            painter.row(1, header, attr_body)
 
-            view_y0 = 2
+            # As linhas do capitulo vivem no pad (ChapterPad), fora do painter.
             view_h = max(1, h - 3)
             max_scroll = max(0, len(chapter_lines) - view_h)
             scroll_line = _clamp(scroll_line, 0, max_scroll)
-            for i in range(view_h):
-                idx = scroll_line + i
-                if idx >= len(chapter_lines):
-                    break
-                s = _truncate(chapter_lines[idx].ljust(w), w)
-                _safe_addstr(stdscr, view_y0 + i, 0, s, attr_norm)
 
             # Barra de status curta com referencia aproximada (verso no topo).
-            top_verse = 0
-            if verse_to_line:
-                # encontra o maior verso cujo inicio <= scroll_line
-                lo, hi = 0, len(verse_to_line) - 1
-                while lo <= hi:
-                    mid = (lo + hi) // 2
-                    if verse_to_line[mid] <= scroll_line:
-                        top_verse = mid
-                        lo = mid + 1
-                    else:
-                        hi = mid - 1
+            top_verse = _top_verse(verse_to_line, scroll_line)
             status = f"{_format_ref(books, cur_book, cur_chap, top_verse)}  |  linha {scroll_line+1}/{max(1, len(chapter_lines))}"
-            _draw_bar(stdscr, h - 1, status.ljust(w), attr_title)
+            painter.row(h - 1, status, attr_title)
 
         elif state == "search":
             query_show = last_query or ""
-            _safe_addstr(
-                stdscr,
-                1,
-                0,
-                _truncate(f"Resultados da busca: '{query_show}'  (Enter abre, ESC/b volta)", w),
-                attr_body,
-            )
+            painter.row(1, f"Resultados da busca: '{query_show}'  (Enter abre, ESC/b volta)", attr_body)
             content_h = max(1, h - 3)
             search_top = _clamp(search_top, 0, max(0, len(search_hits) - content_h))
             search_sel = _clamp(search_sel, 0, max(0, len(search_hits) - 1))
@@ -432,26 +1891,50 @@ def run_tui(stdscr: "curses._CursesWindow", books: List[Book], json_path: Path)
             if search_sel >= search_top + content_h:
                 search_top = search_sel - content_h + 1
 
-            for row in range(content_h):
-                idx = search_top + row
-                if idx >= len(search_hits):
-                    break
-                hit = search_hits[idx]
-                verse_text = books[hit.book_i].chapters[hit.chap_i][hit.verse_i]
-                line = f"{books[hit.book_i].name} {hit.chap_i+1}:{hit.verse_i+1}  {verse_text}"
-                s = _truncate(line.ljust(w), w)
-                attr = attr_hi if idx == search_sel else attr_norm
-                _safe_addstr(stdscr, 2 + row, 0, s, attr)
-
-            _draw_bar(stdscr, h - 1, f"{len(search_hits)} resultado(s)".ljust(w), attr_title)
-
-        stdscr.refresh()
-
+            for row, g in enumerate(search_hits[search_top : search_top + content_h]):
+                bi, ci, vi = vmap.locate(g)
+                verse_text = books[bi].chapters[ci][vi]
+                line = f"{books[bi].name} {ci+1}:{vi+1}  {verse_text}"
+                attr = attr_hi if search_top + row == search_sel else attr_norm
+                painter.row(2 + row, line, attr)
+
+            if search_job is not None and search_job.error:
+                status = f"Consulta invalida: {search_job.error}"
+            elif search_job is not None and search_job.running:
+                if not search_hits and index is None and not (last_query or "").startswith(("re:", "~")):
+                    status = "Indexando...  (ESC cancela)"
+                else:
+                    status = f"{len(search_hits)} resultado(s)...  buscando (ESC cancela)"
+            elif search_job is not None and search_job.cancelled:
+                status = f"{len(search_hits)} resultado(s)  (busca cancelada)"
+            else:
+                status = f"{len(search_hits)} resultado(s)"
+            painter.row(h - 1, status, attr_title)
+
+        painter.flush()
+        stdscr.noutrefresh()
+        if state == "reader":
+            reader_pad.show(chapter_lines, w, max(1, h - 3), scroll_line, 2, attr_norm)
+        curses.doupdate()
+        if first_frame:
+            prof.mark("first_frame")
+            first_frame = False
+
+        # Com busca em andamento, acorda periodicamente para atualizar a tela.
+        searching = search_job is not None and search_job.running
+        stdscr.timeout(80 if searching else -1)
         ch = stdscr.getch()
+        if ch == -1:
+            continue
         if ch in (ord("q"), ord("Q")):
+            if search_job is not None:
+                search_job.cancel()
+            if regex is not None:
+                regex.close()
             return 0
         if ch == curses.KEY_F1:
             _draw_help(stdscr, attr_title, attr_body)
+            shown_state = ""
             rebuild_reader()
             continue
 
@@ -471,11 +1954,9 @@ def run_tui(stdscr: "curses._CursesWindow", books: List[Book], json_path: Path)
                 state = "chapters"
             elif ch in (ord("/"),):
                 q = _prompt_line(stdscr, "Buscar (global): ")
+                painter.forget(h - 1)
                 if q:
-                    last_query = q
-                    search_hits = _search_all(books, q)
-                    search_sel = 0
-                    search_top = 0
+                    run_search(q)
                     state = "search"
 
         elif state == "chapters":
@@ -497,11 +1978,9 @@ def run_tui(stdscr: "curses._CursesWindow", books: List[Book], json_path: Path)
                 state = "reader"
             elif ch in (ord("/"),):
                 q = _prompt_line(stdscr, "Buscar (global): ")
+                painter.forget(h - 1)
                 if q:
-                    last_query = q
-                    search_hits = _search_all(books, q)
-                    search_sel = 0
-                    search_top = 0
+                    run_search(q)
                     state = "search"
 
         elif state == "reader":
@@ -534,6 +2013,7 @@ def run_tui(stdscr: "curses._CursesWindow", books: List[Book], json_path: Path)
                 state = "chapters"
             elif ch in (ord("g"), ord("G")):
                 s = _prompt_line(stdscr, "Ir para verso (numero): ")
+                painter.forget(h - 1)
                 if s:
                     try:
                         v = int(s.strip()) - 1
@@ -543,15 +2023,16 @@ def run_tui(stdscr: "curses._CursesWindow", books: List[Book], json_path: Path)
                         pass
             elif ch in (ord("/"),):
                 q = _prompt_line(stdscr, "Buscar (global): ")
+                painter.forget(h - 1)
                 if q:
-                    last_query = q
-                    search_hits = _search_all(books, q)
-                    search_sel = 0
-                    search_top = 0
+                    run_search(q)
                     state = "search"
 
         elif state == "search":
-            if ch in (ord("b"), ord("B"), 27):
+            if ch == 27 and search_job is not None and search_job.running:
+                # ESC com busca rodando: cancela o resto, mantem o que ja achou.
+                search_job.cancel()
+            elif ch in (ord("b"), ord("B"), 27):
                 # volta para um estado razoavel
                 state = "reader"
                 rebuild_reader()
@@ -565,13 +2046,11 @@ def run_tui(stdscr: "curses._CursesWindow", books: List[Book], json_path: Path)
                 search_sel = min(max(0, len(search_hits) - 1), search_sel + max(1, h - 4))
             elif ch in (10, 13, curses.KEY_ENTER):
                 if 0 <= search_sel < len(search_hits):
-                    hit = search_hits[search_sel]
-                    cur_book = hit.book_i
-                    cur_chap = hit.chap_i
+                    cur_book, cur_chap, hit_verse = vmap.locate(search_hits[search_sel])
                     rebuild_reader()
                     # posiciona no verso
-                    if verse_to_line and 0 <= hit.verse_i < len(verse_to_line):
-                        scroll_line = verse_to_line[hit.verse_i]
+                    if verse_to_line and 0 <= hit_verse < len(verse_to_line):
+                        scroll_line = verse_to_line[hit_verse]
                     state = "reader"
 
         # Resize: reconstrua linhas do capitulo para novo width.
@@ -579,12 +2058,100 @@ def run_tui(stdscr: "curses._CursesWindow", books: List[Book], json_path: Path)
             rebuild_reader()
 
 
+def _selftest_concurrent(index: SearchIndex, threads: int = 8) -> Tuple[int, int, int]:
+    """Repete consultas de varias threads num unico indice (como o --serve).
+
+    Usa termos suficientes para forcar despejos no LRU de _docs e compara
+    com o resultado serial. Devolve (consultas, threads, divergencias).
+    """
+    step = max(1, len(index.vocab) // 600)
+    queries = [w for w in index.vocab[::step]] + ["senhor deus", '"no principio"', "deus -senhor", "jesu*"]
+    expected = {q: index.search(q) for q in queries}
+    work = queries * threads
+
+    def check(q: str) -> bool:
+        try:
+            return index.search(q) == expected[q]
+        except Exception:
+            return False
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        bad = sum(1 for ok in pool.map(check, work) if not ok)
+    return len(work), threads, bad
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     ap = argparse.ArgumentParser(add_help=True)
     ap.add_argument("--json", dest="json_path", default=None, help="Caminho do JSON ACF (acf_clean.json/acf.json).")
+    ap.add_argument(
+        "--store",
+        dest="store_dir",
+        default=None,
+        help="Diretorio com BIBLE.IDX/BIBLE.BIN (formato BIB1, ex.: saturn_app/cd), ou o .IDX; le via mmap em vez do JSON.",
+    )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Le sempre o JSON, sem usar nem gravar o cache binario do corpus (ver BIBLIA_CACHE_DIR).",
+    )
     ap.add_argument("--selftest", action="store_true", help="Carrega o JSON e imprime um resumo (sem curses).")
+    ap.add_argument(
+        "--grep",
+        metavar="REGEX",
+        default=None,
+        help="Busca por expressao regular (sem curses, ignora maiusculas) e imprime os versos.",
+    )
+    ap.add_argument("--jobs", type=int, default=None, help="Processos para --grep/re: (padrao: numero de CPUs).")
+    ap.add_argument(
+        "--batch",
+        metavar="ARQ",
+        default=None,
+        help="Sem curses: le consultas (referencias ou buscas), uma por linha, de ARQ ('-' = stdin) e escreve JSONL.",
+    )
+    ap.add_argument("--limit", type=int, default=0, help="Com --batch: maximo de versos por consulta (0 = todos).")
+    ap.add_argument(
+        "--serve",
+        metavar="[HOST:]PORTA",
+        default=None,
+        help="Sem curses: servidor HTTP/JSON local (/ref, /range, /search, /health); HOST padrao 127.0.0.1.",
+    )
+    ap.add_argument(
+        "--profile",
+        metavar="TRACE.json",
+        default=None,
+        help="Grava tempos por etapa (carga, normalizacao, 1o frame, buscas, capitulos) num trace JSON.",
+    )
+    ap.add_argument(
+        "--profile-capture",
+        action="append",
+        choices=("cprofile", "tracemalloc"),
+        default=[],
+        help="Com --profile: inclui cProfile e/ou tracemalloc no trace (pode repetir).",
+    )
     args = ap.parse_args(argv)
 
+    prof = Profiler(Path(args.profile).expanduser() if args.profile else None, args.profile_capture)
+    try:
+        return _main(args, prof)
+    finally:
+        prof.write()
+
+
+def _main(args: argparse.Namespace, prof: Profiler) -> int:
+    if args.store_dir:
+        store_dir = Path(args.store_dir).expanduser()
+        try:
+            with prof.stage("store_open", path=str(store_dir)):
+                if store_dir.is_file():
+                    # Aceita tambem o .IDX direto (ex.: BIBLEA.IDX do layout por setor).
+                    store = BibleStore(store_dir.parent, store_dir.name, store_dir.with_suffix(".BIN").name)
+                else:
+                    store = BibleStore(store_dir)
+        except (OSError, ValueError) as e:
+            print(f"ERRO: nao consegui abrir o store BIB1 em {store_dir}: {e}")
+            return 2
+        return _run(args, store.books, store.bin_path, prof)
+
     json_path: Optional[Path]
     if args.json_path:
         json_path = Path(args.json_path).expanduser()
@@ -596,19 +2163,526 @@ def main(argv: Optional[List[str]] = None) -> int:
         print("Passe explicitamente: --json /caminho/para/acf_clean.json")
         return 2
 
-    books = load_bible(json_path)
+    corpus = load_corpus(json_path, use_cache=not args.no_cache, prof=prof)
+    return _run(args, corpus.books, json_path, prof, corpus)
+
+
+def _grep(books: List[Book], corpus: Corpus, pattern: str, jobs: Optional[int]) -> int:
+    searcher = RegexSearcher(corpus, jobs)
+    try:
+        hits = 0
+        for batch in searcher.iter_search(pattern):
+            for g in batch:
+                bi, ci, vi = corpus.locate(g)
+                print(f"{_format_ref(books, bi, ci, vi)}  {corpus.verse_text(g)}")
+            hits += len(batch)
+    except re.error as e:
+        print(f"ERRO: regex invalida: {e}")
+        return 2
+    finally:
+        searcher.close()
+    return 0 if hits else 1
+
+
+class QueryEngine:
+    """Resolve referencias e buscas sobre um corpus ja carregado.
+
+    Usado pelos modos sem curses (--batch, --serve). Os backends de busca
+    (indice, texto dobrado, pool de regex) sao montados na 1a consulta que
+    precisa deles; o lock deixa varias threads consultarem ao mesmo tempo.
+    Os ultimos resultados do indice ficam num LRU: lotes e clientes HTTP
+    costumam repetir buscas (arrays de gids, no maximo ~124 KB cada).
+    """
+
+    RESULT_CACHE = 64
+
+    def __init__(
+        self, books: List[Book], corpus: Optional[Corpus] = None, jobs: Optional[int] = None, prof: Optional[Profiler] = None
+    ) -> None:
+        self.books = books
+        self.corpus = corpus
+        self.jobs = jobs
+        self.prof = prof or Profiler()
+        self.map = VerseMap.from_books(books)
+        self.lookup = book_lookup(books)
+        self._lock = threading.Lock()
+        self._index: Optional[SearchIndex] = None
+        self._folded: Optional[FoldedText] = None
+        self._regex: Optional[RegexSearcher] = None
+        self._results: "OrderedDict[str, array]" = OrderedDict()
+
+    @property
+    def index_ready(self) -> bool:
+        """True depois que o indice invertido foi montado (1a busca indexada)."""
+        with self._lock:
+            return self._index is not None
+
+    def get_index(self) -> SearchIndex:
+        with self._lock:
+            if self._index is None:
+                with self.prof.stage("index_build"):
+                    self._index = SearchIndex(self.books)
+            return self._index
+
+    def get_folded(self) -> FoldedText:
+        with self._lock:
+            if self._folded is None:
+                with self.prof.stage("fold_build"):
+                    self._folded = self.corpus.folded() if self.corpus is not None else FoldedText.from_books(self.books)
+            return self._folded
+
+    def get_regex(self) -> RegexSearcher:
+        with self._lock:
+            if self._regex is None:
+                with self.prof.stage("regex_setup"):
+                    self._regex = RegexSearcher(self.corpus or Corpus.from_books(self.books), self.jobs)
+            return self._regex
+
+    def _iter_index(self, query: str) -> Iterator[array]:
+        with self._lock:
+            gids = self._results.get(query)
+            if gids is not None:
+                self._results.move_to_end(query)
+        if gids is not None:
+            for i in range(0, len(gids), 256):
+                yield gids[i : i + 256]
+            return
+        # Entrega cada faixa assim que sai; so a busca completa vai para o LRU.
+        gids = array("I")
+        for batch in iter_index_search(self.get_index, query):
+            gids.extend(batch)
+            yield batch
+        with self._lock:
+            self._results[query] = gids
+            if len(self._results) > self.RESULT_CACHE:
+                self._results.popitem(last=False)
+
+    def ref_gids(self, text: str) -> Optional[array]:
+        """gids de uma referencia ("jo 3:16", "sl 23", "mt 5:3-12"), ou None."""
+        ref = parse_ref(self.books, self.lookup, text)
+        if ref is None:
+            return None
+        bi, c, v0, v1 = ref
+        first = self.map.gid(bi, c, 0)
+        return array("I", range(first + v0, first + v1))
+
+    def query(self, q: str, limit: int = 0) -> Tuple[str, Iterator[array]]:
+        """(tipo, produtor de lotes de gids) para uma linha de consulta.
+
+        ValueError para referencia fora do intervalo; erros de sintaxe da
+        busca (QuerySyntaxError) so aparecem ao consumir o produtor.
+        """
+        gids = self.ref_gids(q)
+        if gids is not None:
+            return "ref", iter((gids,))
+        if q.startswith("re:"):
+            return "regex", iter_regex_search(self.get_regex, q[3:])
+        if q.startswith("?"):
+            return "ranked", iter_ranked_search(self.get_index, q[1:], limit or 500)
+        if q.startswith("~"):
+            return "substring", iter_substring_search(self.get_folded, q[1:])
+        return "index", self._iter_index(q)
+
+    def verse(self, gid: int) -> Dict[str, Any]:
+        bi, ci, vi = self.map.locate(gid)
+        book = self.books[bi]
+        return {
+            "ref": f"{book.name} {ci+1}:{vi+1}",
+            "book": book.abbrev,
+            "chapter": ci + 1,
+            "verse": vi + 1,
+            "text": book.chapters[ci][vi],
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            regex, self._regex = self._regex, None
+        if regex is not None:
+            regex.close()
+
+
+# ---------------------------------------------------------------------------
+# Servidor HTTP/JSON (--serve)
+#
+# Um unico processo carrega o corpus e atende varios clientes locais:
+#   GET /ref?q=jo+3:16           referencia ou trecho de um capitulo (sl 119:1-8)
+#   GET /range?from=jo+3:16&to=jo+4:2
+#                                versos consecutivos, podendo cruzar capitulos
+#   GET /search?q=...&offset=0&limit=50
+#                                busca com a sintaxe da TUI (?, ~, re:)
+#   GET /health                  estado do servidor
+# Respostas sao JSON (UTF-8). HTTP/1.1 com keep-alive; cada conexao e uma
+# task do asyncio e as buscas rodam num pool de threads, entao o loop de
+# eventos nunca fica parado esperando o indice.
+# ---------------------------------------------------------------------------
+
+HTTP_MAX_HEADER = 16 * 1024
+HTTP_MAX_BODY = 64 * 1024  # so GET: o corpo e lido e descartado
+HTTP_IDLE_TIMEOUT = 30.0
+HTTP_MAX_LIMIT = 1000
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class BibleServer:
+    def __init__(self, engine: QueryEngine, workers: Optional[int] = None) -> None:
+        self.engine = engine
+        self.pool = ThreadPoolExecutor(max_workers=workers or min(8, (os.cpu_count() or 1) + 2), thread_name_prefix="query")
+        self.requests = 0
+        self.connections = 0
+        self._started = time.monotonic()
+        self._dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+    # -- endpoints (rodam no pool) -------------------------------------------
+
+    def _page(self, gids: array, offset: int, limit: int) -> Dict[str, Any]:
+        page = gids[offset : offset + limit]
+        return {"total": len(gids), "offset": offset, "limit": limit, "verses": [self.engine.verse(g) for g in page]}
+
+    def do_ref(self, params: Dict[str, str]) -> Dict[str, Any]:
+        q = params.get("q", "").strip()
+        if not q:
+            raise HttpError(400, "parametro 'q' obrigatorio")
+        try:
+            gids = self.engine.ref_gids(q)
+        except ValueError as e:
+            raise HttpError(404, str(e)) from e
+        if gids is None:
+            raise HttpError(404, f"referencia desconhecida: {q}")
+        return dict(self._page(gids, 0, len(gids)), q=q)
+
+    def do_range(self, params: Dict[str, str]) -> Dict[str, Any]:
+        ends = []
+        for key in ("from", "to"):
+            text = params.get(key, "").strip()
+            if not text:
+                raise HttpError(400, f"parametro '{key}' obrigatorio")
+            try:
+                gids = self.engine.ref_gids(text)
+            except ValueError as e:
+                raise HttpError(404, str(e)) from e
+            if gids is None or not gids:
+                raise HttpError(404, f"referencia desconhecida: {text}")
+            ends.append(gids)
+        first, last = ends[0][0], ends[1][-1]
+        if last < first:
+            raise HttpError(400, "'to' vem antes de 'from'")
+        limit = _int_param(params, "limit", HTTP_MAX_LIMIT, 1, HTTP_MAX_LIMIT)
+        gids = array("I", range(first, min(last + 1, first + limit)))
+        out = self._page(gids, 0, len(gids))
+        out["total"] = last - first + 1
+        return out
+
+    def do_search(self, params: Dict[str, str]) -> Dict[str, Any]:
+        q = params.get("q", "").strip()
+        if not q:
+            raise HttpError(400, "parametro 'q' obrigatorio")
+        offset = _int_param(params, "offset", 0, 0, 1 << 31)
+        limit = _int_param(params, "limit", 50, 1, HTTP_MAX_LIMIT)
+        t0 = time.perf_counter()
+        try:
+            kind, producer = self.engine.query(q, offset + limit)
+            gids = array("I")
+            for batch in producer:
+                gids.extend(batch)
+        except ValueError as e:  # inclui QuerySyntaxError
+            raise HttpError(400, str(e)) from e
+        out = self._page(gids, offset, limit)
+        out.update(q=q, kind=kind, ms=round((time.perf_counter() - t0) * 1000.0, 3))
+        return out
+
+    def do_health(self, params: Dict[str, str]) -> Dict[str, Any]:
+        return {
+            "ok": True,
+            "books": len(self.engine.books),
+            "verses": self.engine.map.verse_count,
+            "index_ready": self.engine.index_ready,
+            "requests": self.requests,
+            "connections": self.connections,
+            "uptime_s": round(time.monotonic() - self._started, 1),
+        }
+
+    ROUTES = {"/ref": "do_ref", "/range": "do_range", "/search": "do_search", "/health": "do_health"}
+
+    # -- HTTP ----------------------------------------------------------------
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], keep_alive: bool) -> None:
+        body = (self._dumps(payload) + "\n").encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'OK')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("ascii") + body)
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    raw = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), HTTP_IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 400, {"error": "cabecalho grande demais"}, False)
+                    return
+                lines = raw.decode("latin-1").split("\r\n")
+                parts = lines[0].split()
+                if len(parts) != 3:
+                    await self._respond(writer, 400, {"error": "linha de requisicao invalida"}, False)
+                    return
+                method, target, version = parts
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                conn = headers.get("connection", "").lower()
+                keep_alive = conn != "close" if version == "HTTP/1.1" else conn == "keep-alive"
+                # So digitos ASCII (int() aceitaria "+1", " 1", "1_0", "١"...).
+                length_text = headers.get("content-length", "0") or "0"
+                if not (length_text.isascii() and length_text.isdigit()):
+                    await self._respond(writer, 400, {"error": "content-length invalido"}, False)
+                    return
+                length = int(length_text)
+                if length > HTTP_MAX_BODY:
+                    await self._respond(writer, 400, {"error": "corpo grande demais"}, False)
+                    return
+                if length:
+                    try:
+                        # Corpo ignorado (so GET).
+                        await asyncio.wait_for(reader.readexactly(length), HTTP_IDLE_TIMEOUT)
+                    except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                        return
+
+                self.requests += 1
+                url = urllib.parse.urlsplit(target)
+                params = dict(urllib.parse.parse_qsl(url.query))
+                handler = self.ROUTES.get(url.path.rstrip("/") or "/")
+                try:
+                    if handler is None:
+                        raise HttpError(404, f"caminho desconhecido: {url.path}")
+                    if method != "GET":
+                        raise HttpError(405, "use GET")
+                    payload = await loop.run_in_executor(self.pool, getattr(self, handler), params)
+                    status = 200
+                except HttpError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:  # noqa: BLE001 - o servidor nao pode cair por uma consulta
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            return
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handle, host, port, limit=HTTP_MAX_HEADER)
+        addrs = ", ".join(f"http://{a[0]}:{a[1]}" for a in (sock.getsockname() for sock in server.sockets or []))
+        print(f"Servindo em {addrs}  (Ctrl+C para sair)", file=sys.stderr, flush=True)
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.engine.close()
+
+
+def _int_param(params: Dict[str, str], key: str, default: int, lo: int, hi: int) -> int:
+    raw = params.get(key)
+    if raw is None or raw == "":
+        return default
+    try:
+        return _clamp(int(raw), lo, hi)
+    except ValueError:
+        raise HttpError(400, f"parametro '{key}' deve ser inteiro") from None
+
+
+def _serve(books: List[Book], corpus: Optional[Corpus], addr: str, jobs: Optional[int], prof: Profiler) -> int:
+    host, _, port_s = addr.rpartition(":")
+    try:
+        port = int(port_s)
+    except ValueError:
+        print(f"ERRO: endereco invalido para --serve: {addr} (use PORTA ou HOST:PORTA)")
+        return 2
+    server = BibleServer(QueryEngine(books, corpus, jobs, prof))
+    try:
+        asyncio.run(server.serve(host or "127.0.0.1", port))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"ERRO: nao consegui escutar em {addr}: {e}")
+        return 2
+    finally:
+        server.close()
+    return 0
+
+
+class _BatchInputError(Exception):
+    """Falha ao abrir/ler o arquivo de consultas do --batch."""
+
+
+class _BatchOutputError(Exception):
+    """Falha ao escrever os resultados do --batch (exceto pipe fechado)."""
+
+
+def _iter_batch_queries(path: str) -> Iterator[str]:
+    # So o OSError da entrada vira _BatchInputError; o do consumidor (entre
+    # um yield e outro) nao passa por aqui.
+    try:
+        f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8-sig")
+    except OSError as e:
+        raise _BatchInputError(str(e)) from e
+    try:
+        lines = iter(f)
+        while True:
+            try:
+                line = next(lines)
+            except StopIteration:
+                return
+            except OSError as e:
+                raise _BatchInputError(str(e)) from e
+            yield line.strip()
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _batch(
+    books: List[Book], corpus: Optional[Corpus], source: str, limit: int, jobs: Optional[int], prof: Profiler
+) -> int:
+    """Modo sem curses: uma consulta por linha, resultados em JSONL.
+
+    Cada linha de entrada e uma referencia ("jo 3:16", "sl 23", "mt 5:3-12")
+    ou uma busca com a mesma sintaxe da TUI (indice, ?ranking, ~substring,
+    re:regex). Para cada consulta sai uma linha por verso encontrado e, no
+    fim, uma linha de resumo ({"n", "q", "kind", "hits", "ms", "done"}) ou de
+    erro ({"n", "q", "error"}). A saida e escrita lote a lote, entao a memoria
+    nao cresce com o tamanho do resultado, e cada escrita (erros inclusive)
+    e seguida de flush: um coprocesso pode esperar a resposta de cada linha.
+    Se quem le a saida fechar o pipe, o lote termina em silencio.
+    """
+    engine = QueryEngine(books, corpus, jobs, prof)
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    def write(text: str) -> None:
+        try:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            raise
+        except OSError as e:
+            raise _BatchOutputError(str(e)) from e
+
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    try:
+        queries = _iter_batch_queries(source)
+        for n, q in enumerate(queries, 1):
+            if not q or q.startswith("#"):
+                continue
+            t0 = time.perf_counter()
+            try:
+                kind, producer = engine.query(q, limit)
+            except ValueError as e:
+                write(dumps({"n": n, "q": q, "error": str(e)}) + "\n")
+                continue
+
+            hits = 0
+            timed = prof.timed_iter("query", producer, query=q, kind=kind)
+            try:
+                for batch in timed:
+                    if limit and hits + len(batch) > limit:
+                        batch = batch[: limit - hits]
+                    lines = [dumps({"n": n, **engine.verse(g)}) for g in batch]
+                    if lines:
+                        write("\n".join(lines) + "\n")
+                    hits += len(batch)
+                    if limit and hits >= limit:
+                        break
+            except QuerySyntaxError as e:
+                write(dumps({"n": n, "q": q, "error": str(e)}) + "\n")
+                continue
+            finally:
+                timed.close()
+            ms = round((time.perf_counter() - t0) * 1000.0, 3)
+            write(dumps({"n": n, "q": q, "kind": kind, "hits": hits, "ms": ms, "done": True}) + "\n")
+    except BrokenPipeError:
+        # Leitor foi embora: aponta stdout para /dev/null para o flush da
+        # saida do interpretador nao gerar outro BrokenPipeError.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+        return 0
+    except _BatchInputError as e:
+        print(f"ERRO: nao consegui ler as consultas de {source}: {e}", file=sys.stderr)
+        return 2
+    except _BatchOutputError as e:
+        print(f"ERRO: nao consegui escrever os resultados: {e}", file=sys.stderr)
+        return 2
+    finally:
+        engine.close()
+    return 0
+
+
+def _run(
+    args: argparse.Namespace, books: List[Book], json_path: Path, prof: Profiler, corpus: Optional[Corpus] = None
+) -> int:
+    if args.serve is not None:
+        return _serve(books, corpus, args.serve, args.jobs, prof)
+
+    if args.batch is not None:
+        return _batch(books, corpus, args.batch, args.limit, args.jobs, prof)
+
+    if args.grep is not None:
+        with prof.stage("grep", pattern=args.grep):
+            return _grep(books, corpus or Corpus.from_books(books), args.grep, args.jobs)
+
     if args.selftest:
-        total_verses = sum(len(ch) for b in books for ch in b.chapters)
+        with prof.stage("selftest_scan"):
+            total_verses = sum(len(ch) for b in books for ch in b.chapters)
         print("OK")
-        print("JSON:", json_path)
+        print("Store:" if args.store_dir else "JSON:", json_path)
         print("Livros:", len(books))
         print("Versos:", total_verses)
         print("Primeiro livro:", books[0].name, f"({len(books[0].chapters)} capitulos)")
         print("Ultimo livro:", books[-1].name, f"({len(books[-1].chapters)} capitulos)")
+        with prof.stage("selftest_concurrent"):
+            queries, threads, bad = _selftest_concurrent(SearchIndex(books))
+        print("Busca concorrente:", f"{queries} consultas, {threads} threads,", "OK" if not bad else f"{bad} divergencias")
+        if bad:
+            return 1
+        if prof.enabled:
+            # Amostra das etapas da TUI, sem curses: 1o capitulo (80 colunas),
+            # indice e uma busca de cada tipo.
+            with prof.stage("chapter", book=0, chapter=0, width=78):
+                build_chapter_lines(books[0], 0, 78)
+            with prof.stage("index_build"):
+                index = SearchIndex(books)
+            with prof.stage("fold_build"):
+                folded = FoldedText.from_books(books)
+            for q, producer in (
+                ("senhor", iter_index_search(lambda: index, "senhor")),
+                ("?senhor deus", iter_ranked_search(lambda: index, "senhor deus")),
+                ("~senhor", iter_substring_search(lambda: folded, "senhor")),
+            ):
+                for _ in prof.timed_iter("search", producer, query=q):
+                    pass
         return 0
 
     # curses.wrapper garante reset do terminal em excecoes.
-    return curses.wrapper(lambda stdscr: run_tui(stdscr, books, json_path))
+    return curses.wrapper(lambda stdscr: run_tui(stdscr, books, json_path, prof, corpus, args.jobs))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hot paths of dos_biblia_acf.py (the DOS-like reader).
+
+Operations:
+  load_bible      - json.load + normalization of the whole corpus (no cache)
+  load_cached     - load_corpus through the on-disk corpus cache (warm)
+  search_all      - brute-force casefold substring scan (_search_all; the
+                    reader no longer uses it, kept as the baseline)
+  index_build     - SearchIndex construction (what the first search pays)
+  index_search    - SearchIndex.search on a built index (default TUI search)
+  index_rank      - SearchIndex.rank on a built index ("?" queries)
+  folded_search   - FoldedText.search on a built fold ("~" queries)
+  chapter_lines   - build_chapter_lines on the 10 longest chapters (textwrap)
+  wrap_verse      - _wrap_verse on the longest verse, 10 widths per scale step
+  top_verse       - binary search of the verse shown at each scroll line
+
+Each operation runs against the real acf_clean.json (scale 1) and synthetic
+corpora 10x and 100x larger: load_bible/search_all repeat the book list N
+times (so do the index/fold operations), the chapter operations repeat the
+verses of each sampled chapter N times (so chapters get N times longer).
+For every (operation, scale) we record:
+  wall_s.min / wall_s.median  - perf_counter over --repeat runs
+  peak_bytes                  - tracemalloc peak during one extra run
+  alloc_blocks / alloc_bytes  - blocks/bytes still allocated by that run
+
+Results are JSON (stdout or --out) so they can be diffed or stored:
+
+  python3 tools/bench_reader.py --out bench.json
+  python3 tools/bench_reader.py --baseline bench.json --max-regression 0.2
+
+With --baseline, the exit code is 1 if any wall_s.min got slower than the
+baseline by more than --max-regression (fraction). The default scales are
+1,10; --scales 1,10,100 needs a few GB of RAM for load_bible and the index.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dos_biblia_acf as reader  # noqa: E402
+
+
+SEARCH_QUERIES = ("Senhor", "e", "no princípio", "Melquisedeque")
+# SearchIndex syntax: implicit AND, phrase, prefix, NOT.
+INDEX_QUERIES = ("Senhor", "e", '"no princípio"', "Melquisedeque", "amor*", "luz NOT trevas")
+WRAP_WIDTH = 78
+
+
+def scaled_books(books: List[reader.Book], scale: int) -> List[reader.Book]:
+    # Repeat the book list; verse strings are shared, so this is cheap in RAM.
+    out: List[reader.Book] = []
+    for i in range(scale):
+        for b in books:
+            name = b.name if i == 0 else f"{b.name} #{i + 1}"
+            out.append(reader.Book(name=name, abbrev=f"{b.abbrev}{i}" if i else b.abbrev, chapters=b.chapters))
+    return out
+
+
+def write_scaled_json(books: List[reader.Book], path: Path) -> None:
+    data = [
+        {"abbrev": b.abbrev, "name": b.name, "chapters": [list(ch) for ch in b.chapters]}
+        for b in books
+    ]
+    path.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+
+
+def longest_chapters(books: List[reader.Book], count: int) -> List[List[str]]:
+    chapters = [list(ch) for b in books for ch in b.chapters]
+    chapters.sort(key=lambda ch: sum(len(v) for v in ch), reverse=True)
+    return chapters[:count]
+
+
+def make_ops(
+    base_books: List[reader.Book], scale: int, json_path: Path, wanted: List[str]
+) -> Dict[str, Callable[[], Any]]:
+    # Corpus-wide ops see the book list repeated `scale` times; chapter ops
+    # see the longest chapters with their verses repeated `scale` times
+    # (Salmos 119 x100 = 17600 verses), which is what stresses wrapping.
+    books = scaled_books(base_books, scale)
+    sample = [reader.Book(name="bench", abbrev="bench", chapters=[ch * scale for ch in longest_chapters(base_books, 10)])]
+    longest = max((v for b in base_books for ch in b.chapters for v in ch), key=len)
+    layouts = [reader.build_chapter_lines(sample[0], c, WRAP_WIDTH)[1] for c in range(len(sample[0].chapters))]
+    reader.load_corpus(json_path)  # writes the cache, so load_cached measures hits
+    # Built outside the timed runs, and only when an op needs them.
+    index = reader.SearchIndex(books) if not wanted or {"index_search", "index_rank"} & set(wanted) else None
+    folded = reader.FoldedText.from_books(books) if not wanted or "folded_search" in wanted else None
+
+    def op_load() -> Any:
+        return reader.load_bible(json_path, use_cache=False)
+
+    def op_load_cached() -> Any:
+        return reader.load_corpus(json_path)
+
+    def op_search() -> Any:
+        return [reader._search_all(books, q) for q in SEARCH_QUERIES]
+
+    def op_index_build() -> Any:
+        return reader.SearchIndex(books)
+
+    def op_index_search() -> Any:
+        return [index.search(q) for q in INDEX_QUERIES]
+
+    def op_index_rank() -> Any:
+        return [index.rank(q) for q in INDEX_QUERIES]
+
+    def op_folded_search() -> Any:
+        return [folded.search(q) for q in SEARCH_QUERIES]
+
+    def op_chapter_lines() -> Any:
+        return [reader.build_chapter_lines(sample[0], c, WRAP_WIDTH) for c in range(len(sample[0].chapters))]
+
+    def op_wrap() -> Any:
+        return [reader._wrap_verse(176, longest, w) for w in range(20, 20 + 10 * scale)]
+
+    def op_top_verse() -> Any:
+        total = 0
+        for v2l in layouts:
+            last = v2l[-1] + 1 if v2l else 1
+            for line in range(last):
+                total += reader._top_verse(v2l, line)
+        return total
+
+    return {
+        "load_bible": op_load,
+        "load_cached": op_load_cached,
+        "search_all": op_search,
+        "index_build": op_index_build,
+        "index_search": op_index_search,
+        "index_rank": op_index_rank,
+        "folded_search": op_folded_search,
+        "chapter_lines": op_chapter_lines,
+        "wrap_verse": op_wrap,
+        "top_verse": op_top_verse,
+    }
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    walls: List[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        walls.append(time.perf_counter() - t0)
+        del result
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = fn()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    diff = after.compare_to(before, "filename")
+    return {
+        "wall_s": {"min": min(walls), "median": statistics.median(walls), "runs": len(walls)},
+        "peak_bytes": peak,
+        "alloc_blocks": sum(max(0, d.count_diff) for d in diff),
+        "alloc_bytes": sum(max(0, d.size_diff) for d in diff),
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], max_regression: float) -> int:
+    base = {(r["op"], r["scale"]): r for r in baseline.get("results", [])}
+    worst = 0
+    print(f"{'op':<14} {'scale':>5} {'base ms':>10} {'now ms':>10} {'ratio':>7}", file=sys.stderr)
+    for r in results:
+        b = base.get((r["op"], r["scale"]))
+        now = r["wall_s"]["min"] * 1000.0
+        if b is None:
+            print(f"{r['op']:<14} {r['scale']:>5} {'-':>10} {now:>10.2f} {'new':>7}", file=sys.stderr)
+            continue
+        then = b["wall_s"]["min"] * 1000.0
+        ratio = now / then if then > 0 else float("inf")
+        flag = ""
+        if ratio > 1.0 + max_regression:
+            flag = "  REGRESSION"
+            worst = 1
+        print(f"{r['op']:<14} {r['scale']:>5} {then:>10.2f} {now:>10.2f} {ratio:>7.2f}{flag}", file=sys.stderr)
+    return worst
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--json", default="acf_clean.json", help="Input JSON (clean UTF-8).")
+    ap.add_argument("--scales", default="1,10", help="Comma-separated corpus multipliers (100 needs GBs of RAM).")
+    ap.add_argument("--ops", default="", help="Comma-separated subset of operations (default: all).")
+    ap.add_argument("--repeat", type=int, default=3, help="Timed runs per operation.")
+    ap.add_argument("--out", default="", help="Write JSON results here (default: stdout).")
+    ap.add_argument("--baseline", default="", help="Compare against a previous --out file.")
+    ap.add_argument("--max-regression", type=float, default=0.20, help="Allowed slowdown vs baseline (fraction).")
+    args = ap.parse_args()
+
+    json_path = Path(args.json)
+    base_books = reader.load_bible(json_path, use_cache=False)
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    wanted = [s.strip() for s in args.ops.split(",") if s.strip()]
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="bench_reader_") as tmp:
+        # Cache files of the scaled corpora stay in the temp dir.
+        os.environ["BIBLIA_CACHE_DIR"] = str(Path(tmp) / "cache")
+        for scale in scales:
+            path = json_path
+            if scale != 1 and (not wanted or "load_bible" in wanted or "load_cached" in wanted):
+                path = Path(tmp) / f"acf_x{scale}.json"
+                write_scaled_json(scaled_books(base_books, scale), path)
+            ops = make_ops(base_books, scale, path, wanted)
+            for name, fn in ops.items():
+                if wanted and name not in wanted:
+                    continue
+                row = {"op": name, "scale": scale}
+                row.update(measure(fn, max(1, args.repeat)))
+                results.append(row)
+                print(f"{name:<14} x{scale:<4} {row['wall_s']['min'] * 1000:10.2f} ms", file=sys.stderr)
+            if path != json_path:
+                path.unlink()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "json": str(json_path),
+            "repeat": args.repeat,
+            "search_queries": list(SEARCH_QUERIES),
+            "index_queries": list(INDEX_QUERIES),
+            "wrap_width": WRAP_WIDTH,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+        print(f"Wrote: {args.out}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        return compare(results, baseline, args.max_regression)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
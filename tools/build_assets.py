@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Build the Saturn CD assets as a dependency graph (replaces the serial
+python3 steps in saturn_app/compile.sh).
+
+Each step is one of the tools/*.py generators with declared inputs (files or
+globs) and outputs. A step is skipped when the hash of its command line and
+input contents matches the previous run and its outputs are still the ones
+it wrote; otherwise it runs. Steps whose dependencies are done run in
+parallel (--jobs, default: CPU count). A per-step timing table is printed at
+the end; --report writes it as JSON.
+
+  python3 tools/build_assets.py                # build what changed
+  python3 tools/build_assets.py --force        # rebuild everything
+  python3 tools/build_assets.py --only bible   # one step (+ its dependencies)
+  python3 tools/build_assets.py --list         # show the graph and cache state
+
+The cache lives in saturn_app/.asset_cache.json (--cache). Paths in STEPS are
+relative to the repository root; the tools run with the root as cwd.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+PY = sys.executable or "python3"
+
+
+@dataclass(frozen=True)
+class Step:
+    name: str
+    argv: tuple[str, ...]
+    inputs: tuple[str, ...]
+    outputs: tuple[str, ...]
+    deps: tuple[str, ...] = field(default_factory=tuple)
+
+
+STEPS: tuple[Step, ...] = (
+    Step(
+        name="images",
+        argv=(PY, "tools/sync_cd_images.py", "--src-dir", "Saturn_Biblia_Images/tga_format", "--out-dir", "saturn_app/cd"),
+        inputs=("tools/sync_cd_images.py", "Saturn_Biblia_Images/tga_format/*.tga"),
+        outputs=("saturn_app/cd/UI/MAIN.TGA", "saturn_app/cd/UI/MENU.TGA", "saturn_app/cd/BOOKS/B*.TGA"),
+    ),
+    Step(
+        name="ui_cards",
+        argv=(PY, "tools/gen_ui_cards.py", "--out-dir", "saturn_app/cd/UI"),
+        inputs=("tools/gen_ui_cards.py",),
+        outputs=("saturn_app/cd/UI/CARD.TGA", "saturn_app/cd/UI/CARDSEL.TGA"),
+    ),
+    Step(
+        name="stats",
+        # --refresh: the report is keyed by the JSON alone, but it also depends
+        # on the reader's normalization/tokenization (dos_biblia_acf.py).
+        argv=(PY, "tools/corpus_stats.py", "--json", "acf_clean.json", "--refresh"),
+        inputs=("tools/corpus_stats.py", "dos_biblia_acf.py", "acf_clean.json"),
+        outputs=("acf_clean.stats.json",),
+    ),
+    Step(
+        name="font",
+        argv=(
+            PY,
+            "tools/gen_font_tga_template.py",
+            "--out-tga",
+            "saturn_app/cd/FONT.TGA",
+            "--out-header",
+            "saturn_app/font_mapping.h",
+            "--preview-png",
+            "saturn_app/FONT_PREVIEW.png",
+            "--shadow",
+            "drop",
+            "--stats",
+            "acf_clean.stats.json",
+        ),
+        inputs=(
+            "tools/gen_font_tga_template.py",
+            "/usr/share/fonts/X11/misc/5x8-ISO8859-1.pcf.gz",
+            "acf_clean.stats.json",
+        ),
+        outputs=("saturn_app/cd/FONT.TGA", "saturn_app/font_mapping.h", "saturn_app/FONT_PREVIEW.png"),
+        deps=("stats",),
+    ),
+    Step(
+        name="bible",
+        argv=(PY, "tools/gen_bible_assets.py", "--json", "acf_clean.json", "--out-dir", "saturn_app/cd"),
+        inputs=("tools/gen_bible_assets.py", "dos_biblia_acf.py", "acf_clean.json"),
+        outputs=("saturn_app/cd/BIBLE.BIN", "saturn_app/cd/BIBLE.IDX"),
+    ),
+)
+
+
+def expand(patterns: tuple[str, ...]) -> list[Path]:
+    out: set[Path] = set()
+    for pat in patterns:
+        p = Path(pat)
+        full = str(p if p.is_absolute() else ROOT / p)
+        out.update(Path(m) for m in glob.glob(full))
+    return sorted(out)
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def rel(path: Path) -> str:
+    try:
+        return str(path.relative_to(ROOT))
+    except ValueError:
+        return str(path)
+
+
+def step_key(step: Step) -> str:
+    """Hash of the command line and of every input file (path + content)."""
+    h = hashlib.sha256()
+    h.update("\0".join(step.argv[1:]).encode("utf-8"))
+    for path in expand(step.inputs):
+        h.update(b"\0" + rel(path).encode("utf-8") + b"\0" + file_hash(path).encode("ascii"))
+    return h.hexdigest()
+
+
+def outputs_intact(record: dict) -> bool:
+    outs = record.get("outputs") or {}
+    if not outs:
+        return False
+    for name, digest in outs.items():
+        path = Path(name) if Path(name).is_absolute() else ROOT / name
+        if not path.is_file() or file_hash(path) != digest:
+            return False
+    return True
+
+
+def closure(steps: dict[str, Step], names: list[str]) -> list[str]:
+    """`names` plus everything they depend on, in declaration order."""
+    want: set[str] = set()
+    todo = list(names)
+    while todo:
+        n = todo.pop()
+        if n in want:
+            continue
+        if n not in steps:
+            raise SystemExit(f"Unknown step: {n} (known: {', '.join(steps)})")
+        want.add(n)
+        todo.extend(steps[n].deps)
+    return [n for n in steps if n in want]
+
+
+class Builder:
+    def __init__(self, steps: list[Step], cache_path: Path, jobs: int, force: bool, verbose: bool) -> None:
+        self.steps = {s.name: s for s in steps}
+        self.cache_path = cache_path
+        self.jobs = max(1, jobs)
+        self.force = force
+        self.verbose = verbose
+        self.cache: dict = {}
+        if cache_path.is_file():
+            try:
+                self.cache = json.loads(cache_path.read_text(encoding="utf-8"))
+            except ValueError:
+                self.cache = {}
+        self.results: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _run_step(self, step: Step) -> dict:
+        t0 = time.perf_counter()
+        key = step_key(step)
+        record = self.cache.get(step.name, {})
+        if not self.force and record.get("key") == key and outputs_intact(record):
+            return {"status": "cached", "seconds": time.perf_counter() - t0, "key": key}
+
+        proc = subprocess.run(step.argv, cwd=ROOT, capture_output=True, text=True)
+        seconds = time.perf_counter() - t0
+        result = {"status": "ok" if proc.returncode == 0 else "failed", "seconds": seconds, "key": key}
+        log = (proc.stdout + proc.stderr).strip()
+        if proc.returncode != 0 or self.verbose:
+            result["log"] = log
+        if proc.returncode == 0:
+            outs = expand(step.outputs)
+            missing = [o for o in step.outputs if not expand((o,))]
+            if missing:
+                result["status"] = "failed"
+                result["log"] = (log + "\n" if log else "") + f"declared outputs not produced: {', '.join(missing)}"
+            else:
+                with self._lock:
+                    self.cache[step.name] = {"key": key, "outputs": {rel(p): file_hash(p) for p in outs}}
+        return result
+
+    def build(self, names: list[str]) -> int:
+        pending = {n: set(self.steps[n].deps) & set(names) for n in names}
+        running: dict[Future, str] = {}
+        t_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                for n in [n for n, deps in pending.items() if not deps]:
+                    del pending[n]
+                    running[pool.submit(self._run_step, self.steps[n])] = n
+                if not running:
+                    break  # the rest waits on failed steps
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    n = running.pop(fut)
+                    try:
+                        res = fut.result()
+                    except Exception as e:  # noqa: BLE001 - report and keep building the rest
+                        res = {"status": "failed", "seconds": 0.0, "log": f"{type(e).__name__}: {e}"}
+                    self.results[n] = res
+                    print(f"[{res['status']:>7}] {n:<10} {res['seconds']:8.2f} s", flush=True)
+                    if res.get("log"):
+                        print("    " + res["log"].replace("\n", "\n    "), flush=True)
+                    for m, deps in pending.items():
+                        if res["status"] in ("ok", "cached"):
+                            deps.discard(n)
+            for n in pending:
+                self.results[n] = {"status": "skipped", "seconds": 0.0, "log": "dependency failed"}
+        self.wall = time.perf_counter() - t_start
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.cache, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+        return 1 if any(r["status"] in ("failed", "skipped") for r in self.results.values()) else 0
+
+    def summary(self) -> None:
+        total = sum(r["seconds"] for r in self.results.values())
+        print(f"{'step':<10} {'status':>8} {'seconds':>9}")
+        for n, r in self.results.items():
+            print(f"{n:<10} {r['status']:>8} {r['seconds']:9.2f}")
+        print(f"{'wall':<10} {'':>8} {self.wall:9.2f}   (sum of steps {total:.2f}, jobs {self.jobs})")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Steps run in parallel.")
+    ap.add_argument("--force", action="store_true", help="Ignore the cache and run every selected step.")
+    ap.add_argument("--only", action="append", default=[], help="Build only this step and its dependencies (repeatable).")
+    ap.add_argument("--cache", default="saturn_app/.asset_cache.json", help="Cache file (relative to the repo root).")
+    ap.add_argument("--list", action="store_true", help="Print the steps, their inputs/outputs and cache state.")
+    ap.add_argument("--report", default="", help="Write per-step results/timings as JSON.")
+    ap.add_argument("-v", "--verbose", action="store_true", help="Show the output of every step, not only failures.")
+    args = ap.parse_args()
+
+    steps = {s.name: s for s in STEPS}
+    names = closure(steps, args.only) if args.only else list(steps)
+    cache_path = Path(args.cache) if Path(args.cache).is_absolute() else ROOT / args.cache
+    builder = Builder([steps[n] for n in names], cache_path, args.jobs, args.force, args.verbose)
+
+    if args.list:
+        for n in names:
+            s = steps[n]
+            record = builder.cache.get(n, {})
+            fresh = record.get("key") == step_key(s) and outputs_intact(record)
+            print(f"{n}  ({'up to date' if fresh else 'stale'})  deps: {', '.join(s.deps) or '-'}")
+            print(f"    in:  {', '.join(s.inputs)}")
+            print(f"    out: {', '.join(s.outputs)}")
+        return 0
+
+    rc = builder.build(names)
+    builder.summary()
+    if args.report:
+        report = {"wall_s": builder.wall, "jobs": builder.jobs, "steps": builder.results}
+        Path(args.report).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return rc
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
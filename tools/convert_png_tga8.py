@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Convert the 320x240 PNG artwork to 8-bit paletted TGAs for the Saturn.
+
+The backgrounds on the CD are 24-bit TGAs (230 KB each at 320x240). An 8-bit
+colour-mapped TGA of the same image is ~77 KB + a 768-byte palette, i.e.
+about a third of the CD reads and of the VRAM needed to hold it. The files
+are written in the same TGA flavour as FONT.TGA (type 1, 256-entry 24-bit
+colour map), which Jo Engine reads with jo_tga_8bits_loader().
+
+Inputs/outputs (defaults):
+  Saturn_Biblia_Images/saturn_ready/*.png -> Saturn_Biblia_Images/tga8_format/*.tga
+
+Output names keep the source stem, so tools/sync_cd_images.py can copy them
+into the CD tree with --src-dir Saturn_Biblia_Images/tga8_format once the
+console loads backgrounds as 8-bit.
+
+Palettes:
+  --palette image  each image gets its own palette (best quality)
+  --palette book   the A and B artwork of a book share one palette, so the
+                   console can switch between them without reloading CRAM
+
+At most --colors (default 255) entries are used: Jo Engine shifts palette
+indices by one when uploading, keeping colour 0 free.
+
+Work is spread over a process pool (--jobs). A cache next to the outputs
+(.tga8_cache.json) stores, per output, a hash of the source PNG(s) and the
+options; unchanged images are skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+
+CACHE_NAME = ".tga8_cache.json"
+# Bump when the conversion itself changes, to invalidate old cache entries.
+CONVERTER_VERSION = 1
+
+_BOOK_RE = re.compile(r"^(\d\d)_.*_([ab])_\d+x\d+$")
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def group_sources(srcs: list[Path], palette: str) -> list[list[Path]]:
+    """Jobs: one image each, or the A/B pair of a book with --palette book."""
+    if palette == "image":
+        return [[p] for p in srcs]
+    books: dict[str, list[Path]] = {}
+    groups: list[list[Path]] = []
+    for p in srcs:
+        m = _BOOK_RE.match(p.stem)
+        if m:
+            books.setdefault(m.group(1), []).append(p)
+        else:
+            groups.append([p])
+    groups.extend(sorted(ps) for _, ps in sorted(books.items()))
+    return groups
+
+
+def group_key(group: list[Path], opts: dict) -> str:
+    h = hashlib.sha256(json.dumps(dict(opts, v=CONVERTER_VERSION), sort_keys=True).encode("ascii"))
+    for p in group:
+        h.update(p.name.encode("utf-8") + b"\0" + file_hash(p).encode("ascii"))
+    return h.hexdigest()
+
+
+def quantize(images: list[Image.Image], colors: int, dither: bool) -> list[Image.Image]:
+    mode = Image.Dither.FLOYDSTEINBERG if dither else Image.Dither.NONE
+    if len(images) == 1:
+        return [images[0].quantize(colors=colors, method=Image.Quantize.MEDIANCUT, dither=mode)]
+    # Shared palette: quantize all images stacked vertically, then map each
+    # image onto that palette.
+    w = max(im.width for im in images)
+    sheet = Image.new("RGB", (w, sum(im.height for im in images)))
+    y = 0
+    for im in images:
+        sheet.paste(im, (0, y))
+        y += im.height
+    pal = sheet.quantize(colors=colors, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+    return [im.quantize(palette=pal, dither=mode) for im in images]
+
+
+def convert_group(group: list[str], out_dir: str, colors: int, dither: bool) -> list[tuple[str, int, int, str]]:
+    """Worker: returns (output name, source bytes as 24-bit TGA, output bytes, output hash)."""
+    images = [Image.open(p).convert("RGB") for p in group]
+    out: list[tuple[str, int, int, str]] = []
+    for src, im, q in zip(group, images, quantize(images, colors, dither)):
+        dst = Path(out_dir) / (Path(src).stem + ".tga")
+        tmp = dst.with_suffix(".tmp")
+        q.save(tmp, format="TGA")
+        os.replace(tmp, dst)
+        out.append((dst.name, 18 + im.width * im.height * 3, dst.stat().st_size, file_hash(dst)))
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--src-dir", default="Saturn_Biblia_Images/saturn_ready", help="Directory with the source PNGs.")
+    ap.add_argument("--out-dir", default="Saturn_Biblia_Images/tga8_format", help="Where to write the 8-bit TGAs.")
+    ap.add_argument("--palette", choices=("image", "book"), default="image", help="Palette per image or per book (A+B).")
+    ap.add_argument("--colors", type=int, default=255, help="Palette entries to use (<= 256).")
+    ap.add_argument("--no-dither", action="store_true", help="Disable Floyd-Steinberg dithering.")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+    ap.add_argument("--force", action="store_true", help="Ignore the cache.")
+    args = ap.parse_args()
+
+    src_dir = Path(args.src_dir)
+    out_dir = Path(args.out_dir)
+    if not src_dir.is_dir():
+        raise SystemExit(f"Missing src dir: {src_dir}")
+    if not 2 <= args.colors <= 256:
+        raise SystemExit("--colors must be in 2..256")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    opts = {"palette": args.palette, "colors": args.colors, "dither": not args.no_dither}
+    cache_path = out_dir / CACHE_NAME
+    cache: dict = {}
+    if cache_path.is_file() and not args.force:
+        try:
+            cache = json.loads(cache_path.read_text(encoding="utf-8"))
+        except ValueError:
+            cache = {}
+
+    srcs = sorted(src_dir.glob("*.png"))
+    todo: list[tuple[list[Path], str]] = []
+    skipped = 0
+    for group in group_sources(srcs, args.palette):
+        key = group_key(group, opts)
+        fresh = True
+        for p in group:
+            entry = cache.get(p.stem + ".tga")
+            dst = out_dir / (p.stem + ".tga")
+            if not entry or entry.get("key") != key or not dst.is_file() or file_hash(dst) != entry.get("hash"):
+                fresh = False
+                break
+        if fresh:
+            skipped += len(group)
+        else:
+            todo.append((group, key))
+
+    in_bytes = out_bytes = 0
+    converted = failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = [
+            (pool.submit(convert_group, [str(p) for p in group], str(out_dir), args.colors, not args.no_dither), group, key)
+            for group, key in todo
+        ]
+        for fut, group, key in futures:
+            try:
+                results = fut.result()
+            except Exception as e:  # noqa: BLE001 - report the image and keep going
+                print(f"ERROR: {', '.join(p.name for p in group)}: {e}", file=sys.stderr)
+                failed += 1
+                continue
+            for name, raw_size, size, digest in results:
+                cache[name] = {"key": key, "hash": digest}
+                converted += 1
+                in_bytes += raw_size
+                out_bytes += size
+
+    cache_path.write_text(json.dumps(cache, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+
+    print(f"Converted: {converted}  cached: {skipped}  failed groups: {failed}  -> {out_dir}")
+    if converted:
+        print(f"Size: {in_bytes} bytes as 24-bit TGA -> {out_bytes} bytes ({100.0 * out_bytes / in_bytes:.1f}%)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+One-pass statistics report for the Bible JSON (acf_clean.json by default).
+
+The corpus is loaded through the reader's on-disk cache
+(dos_biblia_acf.load_corpus), so a re-analysis skips JSON decoding too, and
+every verse is visited once to collect:
+  - charset: every character with its count and Latin-1 byte (or null)
+  - latin1_extra: the non-ASCII Latin-1 bytes the text needs (font mapping)
+  - verse_bytes: Latin-1 length incl. the NUL terminator (as in BIBLE.BIN),
+    max + reference, mean and a histogram in VERSE_BUCKET-byte buckets
+  - chapter_bytes: largest chapter in BIBLE.BIN bytes + reference
+  - words: total/unique (casefolded \\w+) and the most frequent ones
+  - control / non_latin1: every finding with its verse reference
+
+The report is JSON, written next to the input as <stem>.stats.json and keyed
+by the input's sha256. Tools call load_stats(), which reuses the report while
+the corpus is unchanged and re-analyzes it otherwise:
+
+  python3 tools/corpus_stats.py --json acf_clean.json
+  python3 tools/corpus_stats.py --summary       # print the main figures
+
+tools/sanitize_acf_json.py --stats-out writes the same report for its output
+while it streams the books, so the corpus is not read again afterwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dos_biblia_acf as reader  # noqa: E402
+
+
+STATS_VERSION = 1
+VERSE_BUCKET = 32
+TOP_WORDS = 200
+MAX_FINDINGS = 1000
+
+_WS = re.compile(r"[ \t\n\r]*")
+_WORD = re.compile(r"\w+")
+_CONTROL = re.compile(r"[\x00-\x1f\x7f-\x9f]")
+
+
+def iter_array(text: str) -> Iterator[Any]:
+    """Decode the items of a top-level JSON array one at a time."""
+    dec = json.JSONDecoder()
+    pos = _WS.match(text, 0).end()
+    if text[pos : pos + 1] != "[":
+        raise ValueError("expected a top-level JSON array of books")
+    pos = _WS.match(text, pos + 1).end()
+    if text[pos : pos + 1] == "]":
+        return
+    while True:
+        item, pos = dec.raw_decode(text, pos)
+        yield item
+        pos = _WS.match(text, pos).end()
+        ch = text[pos : pos + 1]
+        if ch == "]":
+            return
+        if ch != ",":
+            raise ValueError(f"invalid JSON at offset {pos}")
+        pos = _WS.match(text, pos + 1).end()
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def default_stats_path(json_path: Path) -> Path:
+    return json_path.with_name(json_path.stem + ".stats.json")
+
+
+class CorpusStats:
+    """Accumulates the report; feed it books with add_book()."""
+
+    def __init__(self, top_words: int = TOP_WORDS) -> None:
+        self.top_words = top_words
+        self.chars: Counter = Counter()
+        self.words: Counter = Counter()
+        self.hist: Counter = Counter()
+        self.books = self.chapters = self.verses = 0
+        self.verse_bytes_total = 0
+        self.max_verse = (0, "")
+        self.max_chapter = (0, "")
+        self.control: List[Dict[str, Any]] = []
+        self.non_latin1: List[Dict[str, Any]] = []
+
+    def _finding(self, bucket: List[Dict[str, Any]], ref: str, index: int, ch: str) -> None:
+        if len(bucket) < MAX_FINDINGS:
+            bucket.append({"ref": ref, "index": index, "cp": f"U+{ord(ch):04X}"})
+
+    def add_book(self, name: Any, chapters: Sequence[Sequence[Any]]) -> None:
+        if isinstance(name, str):
+            self.chars.update(name)
+        label = name if isinstance(name, str) and name else f"#{self.books}"
+        self.books += 1
+        for c, chapter in enumerate(chapters):
+            self.chapters += 1
+            chapter_bytes = 0
+            for v, verse in enumerate(chapter):
+                if not isinstance(verse, str):
+                    continue
+                self.verses += 1
+                self.chars.update(verse)
+                self.words.update(w.casefold() for w in _WORD.findall(verse))
+                raw = verse.encode("latin-1", errors="replace")
+                size = len(raw) + 1
+                chapter_bytes += size
+                self.verse_bytes_total += size
+                self.hist[size // VERSE_BUCKET * VERSE_BUCKET] += 1
+                if size > self.max_verse[0]:
+                    self.max_verse = (size, f"{label} {c + 1}:{v + 1}")
+                if _CONTROL.search(verse):
+                    for m in _CONTROL.finditer(verse):
+                        self._finding(self.control, f"{label} {c + 1}:{v + 1}", m.start(), m.group(0))
+                if verse and max(verse) > "\xff":
+                    for i, ch in enumerate(verse):
+                        if ord(ch) > 0xFF:
+                            self._finding(self.non_latin1, f"{label} {c + 1}:{v + 1}", i, ch)
+            if chapter_bytes > self.max_chapter[0]:
+                self.max_chapter = (chapter_bytes, f"{label} {c + 1}")
+
+    def report(self, source: Optional[Path] = None) -> Dict[str, Any]:
+        charset = []
+        for ch in sorted(self.chars, key=ord):
+            cp = ord(ch)
+            charset.append({"char": ch, "cp": f"U+{cp:04X}", "latin1": cp if cp <= 0xFF else None, "count": self.chars[ch]})
+        out: Dict[str, Any] = {"version": STATS_VERSION}
+        if source is not None:
+            out["source"] = {"path": str(source), "size": source.stat().st_size, "sha256": file_sha256(source)}
+        out.update(
+            {
+                "books": self.books,
+                "chapters": self.chapters,
+                "verses": self.verses,
+                "charset": charset,
+                "latin1_extra": sorted(ord(ch) for ch in self.chars if 0x7F < ord(ch) <= 0xFF and not 0x80 <= ord(ch) <= 0x9F),
+                "verse_bytes": {
+                    "max": self.max_verse[0],
+                    "max_ref": self.max_verse[1],
+                    "mean": round(self.verse_bytes_total / max(1, self.verses), 2),
+                    "total": self.verse_bytes_total,
+                    "bucket": VERSE_BUCKET,
+                    "histogram": {str(k): self.hist[k] for k in sorted(self.hist)},
+                },
+                "chapter_bytes": {"max": self.max_chapter[0], "max_ref": self.max_chapter[1]},
+                "words": {
+                    "total": sum(self.words.values()),
+                    "unique": len(self.words),
+                    "top": self.words.most_common(self.top_words),
+                },
+                "control": self.control,
+                "non_latin1": self.non_latin1,
+            }
+        )
+        return out
+
+
+def analyze(json_path: Path, top_words: int = TOP_WORDS, use_cache: bool = True) -> Dict[str, Any]:
+    """The report, computed in memory; use_cache=False leaves no corpus cache behind."""
+    stats = CorpusStats(top_words)
+    for book in reader.load_corpus(json_path, use_cache=use_cache).books:
+        stats.add_book(book.name, book.chapters)
+    return stats.report(json_path)
+
+
+def write_stats(report: Dict[str, Any], path: Path) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(report, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+    tmp.replace(path)
+
+
+def load_stats(json_path: Path, stats_path: Optional[Path] = None, refresh: bool = False) -> Dict[str, Any]:
+    """The report for `json_path`, re-analyzing only if the JSON changed."""
+    stats_path = stats_path or default_stats_path(json_path)
+    if not refresh and stats_path.is_file():
+        try:
+            report = json.loads(stats_path.read_text(encoding="utf-8"))
+        except ValueError:
+            report = {}
+        source = report.get("source") or {}
+        if (
+            report.get("version") == STATS_VERSION
+            and source.get("size") == json_path.stat().st_size
+            and source.get("sha256") == file_sha256(json_path)
+        ):
+            return report
+    report = analyze(json_path)
+    write_stats(report, stats_path)
+    return report
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--json", default="acf_clean.json", help="Input JSON (UTF-8, list of books).")
+    ap.add_argument("--out", default="", help="Report path (default: <json stem>.stats.json next to the input).")
+    ap.add_argument("--refresh", action="store_true", help="Re-analyze even if the report is up to date.")
+    ap.add_argument("--summary", action="store_true", help="Print the main figures.")
+    args = ap.parse_args()
+
+    json_path = Path(args.json)
+    out = Path(args.out) if args.out else default_stats_path(json_path)
+    report = load_stats(json_path, out, args.refresh)
+    print(f"Stats: {out}")
+    if args.summary:
+        vb = report["verse_bytes"]
+        print(f"Books: {report['books']}  Chapters: {report['chapters']}  Verses: {report['verses']}")
+        print(f"Unique chars: {len(report['charset'])}  Latin-1 extra bytes: {len(report['latin1_extra'])}")
+        print(f"Verse bytes (incl NUL): max {vb['max']} ({vb['max_ref']})  mean {vb['mean']}")
+        print(f"Largest chapter: {report['chapter_bytes']['max']} bytes ({report['chapter_bytes']['max_ref']})")
+        print(f"Words: {report['words']['total']} total, {report['words']['unique']} unique")
+        print(f"Control chars: {len(report['control'])}  non-Latin-1 chars: {len(report['non_latin1'])}")
+    return 1 if report["control"] or report["non_latin1"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,18 +4,21 @@ Extrai o conjunto de caracteres usado no JSON da Biblia e imprime:
 - lista de caracteres unicos
 - lista de caracteres nao-ASCII (com codepoint e byte Latin-1 quando aplicavel)
 
+As contagens vem de tools/corpus_stats.py (analyze), calculadas em memoria:
+esta ferramenta so le, nao grava relatorio nem cache do corpus.
+
 Uso:
   python3 tools/extract_charset_from_json.py acf_clean.json
 """
 
 from __future__ import annotations
 
-import json
 import sys
 import unicodedata
-from collections import Counter
 from pathlib import Path
 
+from corpus_stats import analyze
+
 
 def _label(ch: str) -> str:
     if ch == " ":
@@ -36,15 +39,14 @@ def main() -> int:
         return 2
 
     path = Path(sys.argv[1])
-    data = json.loads(path.read_text(encoding="utf-8-sig"))
-
-    chars = Counter()
-    for book in data:
-        chars.update(book.get("name", ""))
-        for chap in book.get("chapters", []):
-            for verse in chap:
-                chars.update(verse)
-
+    try:
+        report = analyze(path, use_cache=False)
+    except OSError as e:
+        raise SystemExit(f"ERRO: nao consegui ler {path}: {e}") from e
+    except ValueError as e:
+        raise SystemExit(f"ERRO: {path}: {e}") from e
+
+    chars = {e["char"]: e["count"] for e in report["charset"]}
     all_chars = sorted(chars.keys(), key=ord)
     nonascii = [c for c in all_chars if ord(c) > 127]
     ctrl = [c for c in all_chars if ord(c) < 32 or (0x7F <= ord(c) <= 0x9F)]
@@ -2,7 +2,7 @@
 """
 Generate Sega Saturn-friendly Bible assets from acf_clean.json.
 
-Outputs (default):
+Outputs (default, --format bib1):
   saturn_app/cd/BIBLE.BIN  - verse text blob (Latin-1), each verse NUL-terminated
   saturn_app/cd/BIBLE.IDX  - compact index for random access (little-endian)
 
@@ -26,105 +26,313 @@ Index format (little-endian):
 
   verse_offsets[verse_count_total]:
     u32  text_offset_bytes
+
+Sector layout (--layout sector, opt-in; default outputs BIBLEA.BIN/BIBLEA.IDX):
+  Chapters are placed so that each one touches the minimum number of
+  2048-byte CD sectors, ceil(size / 2048): a chapter that fits in what is
+  left of the current sector is packed there, otherwise the blob is padded
+  with NUL bytes up to the next sector boundary. The index is BIB1 version 2:
+  the header and tables above, except that chapter entries grow to
+
+  chapter[chapter_count_total]:
+    u32  first_verse_index
+    u16  verse_count
+    u16  reserved (0)
+    u32  byte_offset  (in BIBLE.BIN; the first verse starts here)
+    u32  byte_length  (all verses of the chapter, NULs included, no padding)
+
+  so the console can load a whole chapter with one seek and one bulk read.
+  verse_offsets stay absolute; text_size_bytes counts the padding.
+  With --format bib2 the layout aligns the compressed blocks the same way
+  (the block table already has offset and size; the index format is unchanged).
+
+Compressed outputs (--format bib2, opt-in; main.c only reads BIB1):
+  saturn_app/cd/BIBLE2.BIN - one byte-pair-encoded block per chapter
+  saturn_app/cd/BIBLE2.IDX - index below
+
+  Each chapter block is the chapter's verses (Latin-1, each NUL-terminated)
+  compressed with a byte-pair dictionary shared by the whole corpus: byte
+  values that never occur in the text are codes standing for a pair of
+  bytes, and a pair may contain other codes. NUL is never part of a pair, so
+  verse terminators survive compression as literal zero bytes.
+
+  BIB2 index (little-endian):
+    char[4]  magic = "BIB2"
+    u16      version = 2
+    u16      book_count
+    u32      chapter_count_total
+    u32      verse_count_total
+    u32      text_size_bytes (size of BIBLE2.BIN)
+    u32      raw_size_bytes (decoded size of all blocks)
+    u32      max_block_raw_bytes (largest decoded chapter, for the buffer)
+    u16      max_depth (longest code nesting; decoder stack size)
+    u16      code_count (number of pair codes in use)
+
+    pairs[256]:
+      u8 left, u8 right   (0, 0 = byte is a literal)
+
+    book[book_count]:       same as BIB1
+    chapter[chapter_count]: same as BIB1
+
+    block[chapter_count_total]:
+      u32  offset in BIBLE2.BIN
+      u32  compressed_size
+      u32  raw_size
+
+  Decoding a block needs only the pair table and a small stack:
+
+    for each byte b in block:
+      push b
+      while stack not empty:
+        x = pop
+        if pairs[x].left == 0: emit x
+        else: push pairs[x].right; push pairs[x].left
+
+  --verify decodes every block with decode_block() (the reference decoder)
+  and compares it with the JSON.
+
+Pre-wrapped lines (--lines, opt-in, in addition to the text blob):
+  saturn_app/cd/BIBLE.LIN    - every chapter already wrapped for the reader
+  saturn_app/cd/BIBLELIN.IDX - line index below
+
+  Lines are wrapped exactly like read_lines_add_wrapped_verse() in main.c
+  ("N " prefix, continuation lines indented by the prefix width, break at the
+  last space that fits) for --cols columns (READ_MAX_COLS = 40, the NBG2
+  text width). Each line is a fixed record of cols+1 bytes, NUL-padded, i.e.
+  the layout of g_read_lines[][READ_MAX_COLS + 1]: a chapter is read straight
+  into that buffer with one bulk read of line_count * record_size bytes.
+
+  LIN index (little-endian):
+    char[4]  magic = "LIN1"
+    u16      version = 1
+    u16      cols
+    u16      record_size (cols + 1)
+    u16      book_count
+    u32      chapter_count_total
+    u32      verse_count_total
+    u32      line_count_total
+
+    book[book_count]:       same as BIB1
+
+    chapter[chapter_count_total]:
+      u32  first_line   (record index in BIBLE.LIN)
+      u16  line_count
+      u16  verse_count
+      u32  first_verse  (index into verse_line[])
+
+    verse_line[verse_count_total]:
+      u16  first line of the verse, relative to the chapter (O(1) "go to verse")
+
+Word search index (--search, opt-in, in addition to the text blob):
+  saturn_app/cd/SEARCH.IDX - accent-folded word -> verse list
+
+  Words are the reader's search tokens (dos_biblia_acf.tokenize): runs of
+  \\w after fold(), i.e. lower case without accents ("Coração" -> "coracao"),
+  stored as Latin-1 bytes and sorted bytewise (strcmp order). A verse is
+  identified by its global verse id, the index into BIB1 verse_offsets.
+
+  SEARCH.IDX (little-endian):
+    char[4]  magic = "SRC1"
+    u16      version = 1
+    u16      key_width (longest word; size of the directory keys)
+    u32      term_count
+    u32      verse_count_total
+    u32      block_count
+    u32      dict_offset (multiple of 2048)
+    u32      postings_offset (= dict_offset + block_count * 2048)
+    u32      postings_size
+    u32      max_postings_bytes (largest list, for the read buffer)
+
+    directory[block_count]:
+      u32  first_term  (index of the block's first word)
+      u32  postings_base (relative to postings_offset)
+      char key[key_width]  (the block's first word, NUL-padded)
+
+    block[block_count]: one 2048-byte sector each, at dict_offset + k * 2048
+      u16  entry_count
+      entry[entry_count]:
+        u8      shared (bytes in common with the previous word of the block;
+                        0 for the first one)
+        u8      suffix_len
+        char    suffix[suffix_len]
+        varint  verse_count
+        varint  gap  (list offset - end of the previous list; the first
+                      entry counts from postings_base)
+        varint  size (bytes of the list)
+
+    postings: per word, the verse ids in increasing order as varint deltas
+    (the first id as is). A list is placed like a sector-layout chapter: it
+    only starts a new sector when that saves one.
+
+  varint = LEB128: 7 bits per byte, low bits first, 0x80 = more bytes.
+
+  A lookup keeps the header and directory in RAM (a few KB), binary-searches
+  the directory for the last key <= word, reads that one dictionary sector,
+  walks its entries, then reads the list: ceil(size / 2048) sectors for all
+  but the most common words. SearchIndexReader is the reference reader;
+  --verify checks every word, every two-letter prefix and the sample
+  queries (--query) against a brute-force scan of the JSON.
 """
 
 from __future__ import annotations
 
 import argparse
 import json
+import re
 import struct
+import sys
+from bisect import bisect_right
+from collections import Counter
 from pathlib import Path
+from typing import Iterator
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-MAGIC = b"BIB1"
-VERSION = 1
-
-
-def main() -> int:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--json", default="acf_clean.json", help="Input JSON (clean UTF-8).")
-    ap.add_argument("--out-dir", default="saturn_app/cd", help="Output directory (CD root).")
-    ap.add_argument("--out-bin", default="BIBLE.BIN", help="Output text blob filename.")
-    ap.add_argument("--out-idx", default="BIBLE.IDX", help="Output index filename.")
-    args = ap.parse_args()
-
-    in_json = Path(args.json)
-    out_dir = Path(args.out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
-    out_bin = out_dir / args.out_bin
-    out_idx = out_dir / args.out_idx
+import dos_biblia_acf as reader  # noqa: E402
 
-    data = json.loads(in_json.read_text(encoding="utf-8-sig"))
-    if not isinstance(data, list):
-        raise SystemExit("Expected top-level JSON list of books")
 
-    book_entries: list[tuple[int, int]] = []
-    chapter_entries: list[tuple[int, int]] = []
+MAGIC = b"BIB1"
+VERSION = 1
+VERSION_SPANS = 2  # BIB1 with per-chapter byte offset/length (sector layout)
+
+BIB2_MAGIC = b"BIB2"
+BIB2_VERSION = 2
+BIB2_HEADER = struct.Struct("<4sHHIIIIIHH")
+BIB2_BLOCK = struct.Struct("<III")
+
+SECTOR = 2048
+
+LIN_MAGIC = b"LIN1"
+LIN_VERSION = 1
+LIN_HEADER = struct.Struct("<4sHHHHIII")
+LIN_CHAPTER = struct.Struct("<IHHI")
+READ_MAX_COLS = 40  # saturn_app/main.c
+READ_MAX_LINES = 1024  # saturn_app/main.c: lines kept per chapter
+
+SEARCH_MAGIC = b"SRC1"
+SEARCH_VERSION = 1
+SEARCH_HEADER = struct.Struct("<4sHHIIIIIII")
+SEARCH_QUERIES = ("deus", "senhor deus", "coração", "no principio", "jesus cristo", "amor*", "fe esperanca", "salv*")
+
+# Training splits verses into words with their leading space; pairs are only
+# counted inside a word, which keeps training fast (tens of thousands of
+# unique words instead of 3.8 MB of text) and loses very little.
+_WORD_RE = re.compile(rb" ?[^ ]+| +")
+
+
+def read_corpus(in_json: Path) -> list[list[list[bytes]]]:
+    """books[b][c][v] -> verse as Latin-1 bytes (without the NUL).
+
+    Loads through the reader's on-disk corpus cache (dos_biblia_acf.load_corpus),
+    so repeated builds skip JSON decoding. Latin-1 is one byte per character,
+    so the Corpus offsets index the encoded text directly.
+    """
+    try:
+        corpus = reader.load_corpus(in_json)
+    except ValueError as e:
+        raise SystemExit(f"Invalid Bible JSON: {e}") from e
+
+    # Normalize whitespace/newlines just in case.
+    text = corpus.text.replace("\r", " ").replace("\n", " ")
+    try:
+        raw = text.encode("latin-1", errors="strict")
+    except UnicodeEncodeError as e:
+        b, c, v = corpus.locate(bisect_right(corpus.verse_offsets, e.start) - 1)
+        raise SystemExit(f"Non Latin-1 char in book #{b} chapter #{c} verse #{v}: {e}") from e
+
+    offsets = corpus.verse_offsets
+    bfc = corpus.map.book_first_chapter
+    books: list[list[list[bytes]]] = []
+    for b in range(len(corpus.books)):
+        out_chapters: list[list[bytes]] = []
+        for c in range(bfc[b], bfc[b + 1]):
+            first, count = corpus.chapter_span(c)
+            out_chapters.append([raw[offsets[g] : offsets[g + 1]] for g in range(first, first + count)])
+        books.append(out_chapters)
+    return books
+
+
+def write_tables_books_only(fidx, books: list[list[list[bytes]]]) -> None:
+    first_chapter = 0
+    for chapters in books:
+        fidx.write(struct.pack("<IHH", first_chapter, len(chapters), 0))
+        first_chapter += len(chapters)
+
+
+def write_tables(fidx, books: list[list[list[bytes]]], spans: list[tuple[int, int]] | None = None) -> None:
+    """Book and chapter tables (shared by BIB1 and BIB2).
+
+    With `spans`, chapter entries carry (byte_offset, byte_length) too.
+    """
+    write_tables_books_only(fidx, books)
+
+    first_verse = 0
+    c = 0
+    for chapters in books:
+        for chapter in chapters:
+            if spans is None:
+                fidx.write(struct.pack("<IHH", first_verse, len(chapter), 0))
+            else:
+                fidx.write(struct.pack("<IHHII", first_verse, len(chapter), 0, *spans[c]))
+            first_verse += len(chapter)
+            c += 1
+
+
+def sectors_touched(offset: int, size: int) -> int:
+    if size <= 0:
+        return 0
+    return (offset + size - 1) // SECTOR - offset // SECTOR + 1
+
+
+def place(pos: int, size: int, layout: str) -> int:
+    """Offset for the next chapter/block of `size` bytes at blob position `pos`."""
+    if layout == "packed" or size <= 0:
+        return pos
+    if sectors_touched(pos, size) <= -(-size // SECTOR):
+        return pos  # fits without touching an extra sector: pack it
+    return -(-pos // SECTOR) * SECTOR
+
+
+def pad_to(fbin, offset: int) -> None:
+    gap = offset - fbin.tell()
+    if gap:
+        fbin.write(b"\0" * gap)
+
+
+def write_bib1(
+    books: list[list[list[bytes]]], out_bin: Path, out_idx: Path, layout: str = "packed"
+) -> list[tuple[int, int]]:
+    """Write BIB1; returns (offset, size) of each chapter in BIBLE.BIN."""
     verse_offsets: list[int] = []
-
+    chapter_spans: list[tuple[int, int]] = []
     max_verse_len = 0
-    total_bytes = 0
 
     with out_bin.open("wb") as fbin:
-        for b, book in enumerate(data):
-            chapters = book.get("chapters")
-            if not isinstance(chapters, list):
-                raise SystemExit(f"Book #{b} has no 'chapters' list")
-
-            first_chapter_index = len(chapter_entries)
-            chapter_count = len(chapters)
-
-            for c, chapter in enumerate(chapters):
-                if not isinstance(chapter, list):
-                    raise SystemExit(f"Book #{b} chapter #{c} is not a list")
-
-                first_verse_index = len(verse_offsets)
-                verse_count = len(chapter)
-
-                for v, verse in enumerate(chapter):
-                    if not isinstance(verse, str):
-                        raise SystemExit(f"Book #{b} chapter #{c} verse #{v} is not a string")
-
-                    # Normalize whitespace/newlines just in case.
-                    verse = verse.replace("\r", " ").replace("\n", " ")
-                    try:
-                        raw = verse.encode("latin-1", errors="strict")
-                    except UnicodeEncodeError as e:
-                        raise SystemExit(
-                            f"Non Latin-1 char in book #{b} chapter #{c} verse #{v}: {e}"
-                        ) from e
-
+        for chapters in books:
+            for chapter in chapters:
+                size = sum(len(raw) + 1 for raw in chapter)
+                pad_to(fbin, place(fbin.tell(), size, layout))
+                start = fbin.tell()
+                for raw in chapter:
                     verse_offsets.append(fbin.tell())
                     fbin.write(raw)
                     fbin.write(b"\0")
-
                     max_verse_len = max(max_verse_len, len(raw) + 1)
-
-                chapter_entries.append((first_verse_index, verse_count))
-
-            book_entries.append((first_chapter_index, chapter_count))
-
+                chapter_spans.append((start, fbin.tell() - start))
         total_bytes = fbin.tell()
 
     # Write index
     with out_idx.open("wb") as fidx:
         fidx.write(MAGIC)
-        fidx.write(struct.pack("<H", VERSION))
-        fidx.write(struct.pack("<H", len(book_entries)))
-        fidx.write(struct.pack("<I", len(chapter_entries)))
+        fidx.write(struct.pack("<H", VERSION if layout == "packed" else VERSION_SPANS))
+        fidx.write(struct.pack("<H", len(books)))
+        fidx.write(struct.pack("<I", len(chapter_spans)))
         fidx.write(struct.pack("<I", len(verse_offsets)))
         fidx.write(struct.pack("<I", total_bytes))
-
-        for first_chapter_index, chapter_count in book_entries:
-            fidx.write(struct.pack("<IHH", first_chapter_index, chapter_count, 0))
-
-        for first_verse_index, verse_count in chapter_entries:
-            fidx.write(struct.pack("<IHH", first_verse_index, verse_count, 0))
-
+        write_tables(fidx, books, None if layout == "packed" else chapter_spans)
         for off in verse_offsets:
             fidx.write(struct.pack("<I", off))
 
-    idx_size = out_idx.stat().st_size
     bin_size = out_bin.stat().st_size
 
     # Basic sanity: last offset should be within file and offsets are increasing.
@@ -135,13 +343,647 @@ def main() -> int:
             if verse_offsets[i] < verse_offsets[i - 1]:
                 raise SystemExit("Offsets not monotonically increasing (bug)")
 
+    print(f"Max verse bytes (incl NUL): {max_verse_len}")
+    return chapter_spans
+
+
+# ---------------------------------------------------------------------------
+# BIB2: byte-pair encoding
+# ---------------------------------------------------------------------------
+
+
+def train_pairs(verses: list[bytes], max_codes: int = 255) -> list[tuple[int, bytes]]:
+    """Learn (code, pair) merges, most profitable first.
+
+    Codes are byte values absent from the text (never 0). Each merge replaces
+    the most frequent adjacent pair with a fresh code, so later pairs can be
+    made of earlier codes. Pair counts are updated incrementally: only the
+    words that contain the merged pair are recounted.
+    """
+    used = set()
+    freq: Counter = Counter()
+    for raw in verses:
+        used.update(raw)
+        freq.update(_WORD_RE.findall(raw))
+    free = [b for b in range(1, 256) if b not in used][:max_codes]
+
+    words = list(freq)
+    counts = list(freq.values())
+    pair_counts: Counter = Counter()
+    where: dict[bytes, set[int]] = {}
+    for i, w in enumerate(words):
+        for j in range(len(w) - 1):
+            p = w[j : j + 2]
+            pair_counts[p] += counts[i]
+            where.setdefault(p, set()).add(i)
+
+    merges: list[tuple[int, bytes]] = []
+    for code in free:
+        if not pair_counts:
+            break
+        # Ties broken by the pair bytes so the output is reproducible.
+        best, n = max(pair_counts.items(), key=lambda kv: (kv[1], kv[0]))
+        if n < 4:
+            break
+        merges.append((code, best))
+        new = bytes([code])
+        for i in where.pop(best, ()):
+            w = words[i]
+            if best not in w:
+                continue  # stale entry: an earlier merge already consumed the pair
+            n = counts[i]
+            for j in range(len(w) - 1):
+                pair_counts[w[j : j + 2]] -= n
+            w = words[i] = w.replace(best, new)
+            for j in range(len(w) - 1):
+                p = w[j : j + 2]
+                pair_counts[p] += n
+                if code in p:  # pairs without the new code are already indexed
+                    where.setdefault(p, set()).add(i)
+        pair_counts = +pair_counts  # drop pairs whose count reached zero
+    return merges
+
+
+def encode_block(raw: bytes, merges: list[tuple[int, bytes]]) -> bytes:
+    # bytes.replace is left-to-right and non-overlapping, i.e. exactly one
+    # BPE merge step; applying the merges in training order encodes the block.
+    for code, pair in merges:
+        if pair in raw:
+            raw = raw.replace(pair, bytes([code]))
+    return raw
+
+
+def pair_table(merges: list[tuple[int, bytes]]) -> list[tuple[int, int]]:
+    table = [(0, 0)] * 256
+    for code, pair in merges:
+        table[code] = (pair[0], pair[1])
+    return table
+
+
+def decode_block(block: bytes, table: list[tuple[int, int]]) -> bytes:
+    """Reference decoder: the same stack loop the console would run."""
+    out = bytearray()
+    stack: list[int] = []
+    for b in block:
+        stack.append(b)
+        while stack:
+            x = stack.pop()
+            left, right = table[x]
+            if left == 0:
+                out.append(x)
+            else:
+                stack.append(right)
+                stack.append(left)
+    return bytes(out)
+
+
+def code_depth(table: list[tuple[int, int]]) -> int:
+    depth = [0] * 256
+
+    def d(x: int) -> int:
+        if table[x][0] == 0:
+            return 1
+        if not depth[x]:
+            depth[x] = 1 + max(d(table[x][0]), d(table[x][1]))
+        return depth[x]
+
+    return max(d(x) for x in range(256))
+
+
+def write_bib2(
+    books: list[list[list[bytes]]], out_bin: Path, out_idx: Path, max_codes: int, layout: str = "packed"
+) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+    """Write BIB2; returns (pair table, (offset, size) of each block)."""
+    verses = [raw for chapters in books for chapter in chapters for raw in chapter]
+    merges = train_pairs(verses, max_codes)
+    table = pair_table(merges)
+
+    blocks: list[tuple[int, int, int]] = []
+    raw_total = 0
+    max_raw = 0
+    with out_bin.open("wb") as fbin:
+        for chapters in books:
+            for chapter in chapters:
+                raw = b"".join(v + b"\0" for v in chapter)
+                enc = encode_block(raw, merges)
+                pad_to(fbin, place(fbin.tell(), len(enc), layout))
+                blocks.append((fbin.tell(), len(enc), len(raw)))
+                fbin.write(enc)
+                raw_total += len(raw)
+                max_raw = max(max_raw, len(raw))
+        total_bytes = fbin.tell()
+
+    with out_idx.open("wb") as fidx:
+        fidx.write(
+            BIB2_HEADER.pack(
+                BIB2_MAGIC,
+                BIB2_VERSION,
+                len(books),
+                len(blocks),
+                len(verses),
+                total_bytes,
+                raw_total,
+                max_raw,
+                code_depth(table),
+                len(merges),
+            )
+        )
+        for left, right in table:
+            fidx.write(bytes((left, right)))
+        write_tables(fidx, books)
+        for block in blocks:
+            fidx.write(BIB2_BLOCK.pack(*block))
+
+    print(f"Pair codes: {len(merges)}  max depth: {code_depth(table)}  largest chapter: {max_raw} bytes")
+    print(f"Text: {raw_total} -> {total_bytes} bytes ({100.0 * total_bytes / max(1, raw_total):.1f}%)")
+    return table, [(off, size) for off, size, _ in blocks]
+
+
+# ---------------------------------------------------------------------------
+# BIBLE.LIN: pre-wrapped lines
+# ---------------------------------------------------------------------------
+
+
+def wrap_verse(verse_num: int, text: bytes, cols: int = READ_MAX_COLS) -> list[bytes]:
+    """Port of read_lines_add_wrapped_verse() (main.c); keep them in sync."""
+    prefix = b"%d " % verse_num
+    indent = min(len(prefix), cols)
+    lines: list[bytes] = []
+    n = len(text)
+    pos = 0
+    first = True
+
+    while pos < n and text[pos] == 0x20:
+        pos += 1
+
+    while pos < n:
+        head = prefix[:cols] if first else b" " * indent
+        # Always consume at least one byte, even if the prefix fills the line.
+        remaining = max(1, cols - len(head))
+        end = pos
+        last_space = -1
+        j = 0
+        while end < n and j < remaining:
+            if text[end] == 0x20:
+                last_space = end
+            j += 1
+            end += 1
+        if end < n and last_space > pos:
+            end = last_space
+
+        lines.append((head + text[pos:end])[:cols])
+
+        pos = end
+        while pos < n and text[pos] == 0x20:
+            pos += 1
+        first = False
+    return lines
+
+
+def write_lines(books: list[list[list[bytes]]], out_lin: Path, out_idx: Path, cols: int) -> None:
+    record = cols + 1
+    chapters_out: list[tuple[int, int, int, int]] = []
+    verse_line: list[int] = []
+    total_lines = 0
+    max_lines = 0
+    over: list[str] = []
+
+    with out_lin.open("wb") as flin:
+        for b, chapters in enumerate(books):
+            for c, chapter in enumerate(chapters):
+                first_line = total_lines
+                first_verse = len(verse_line)
+                lines: list[bytes] = []
+                for v, raw in enumerate(chapter):
+                    verse_line.append(len(lines))
+                    lines.extend(wrap_verse(v + 1, raw, cols))
+                if len(lines) > 0xFFFF:
+                    raise SystemExit(f"Book #{b} chapter #{c}: {len(lines)} lines do not fit u16")
+                if len(lines) > READ_MAX_LINES:
+                    over.append(f"#{b}:{c + 1} ({len(lines)})")
+                flin.write(b"".join(line.ljust(record, b"\0") for line in lines))
+                chapters_out.append((first_line, len(lines), len(chapter), first_verse))
+                total_lines += len(lines)
+                max_lines = max(max_lines, len(lines))
+
+    with out_idx.open("wb") as fidx:
+        fidx.write(
+            LIN_HEADER.pack(LIN_MAGIC, LIN_VERSION, cols, record, len(books), len(chapters_out), len(verse_line), total_lines)
+        )
+        write_tables_books_only(fidx, books)
+        for entry in chapters_out:
+            fidx.write(LIN_CHAPTER.pack(*entry))
+        fidx.write(struct.pack(f"<{len(verse_line)}H", *verse_line))
+
+    print(f"Wrote: {out_lin} ({out_lin.stat().st_size} bytes, {total_lines} lines of {cols} cols)")
+    print(f"Wrote: {out_idx} ({out_idx.stat().st_size} bytes)  longest chapter: {max_lines} lines")
+    if over:
+        print(f"Warning: chapters over READ_MAX_LINES={READ_MAX_LINES}: {', '.join(over)}")
+
+
+# ---------------------------------------------------------------------------
+# SEARCH.IDX: accent-folded word index
+# ---------------------------------------------------------------------------
+
+
+def put_varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def get_varint(buf: bytes, pos: int) -> tuple[int, int]:
+    """(value, position after it)."""
+    n = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def search_terms(books: list[list[list[bytes]]]) -> dict[bytes, list[int]]:
+    """Folded word (Latin-1) -> increasing verse ids."""
+    postings: dict[bytes, list[int]] = {}
+    gid = 0
+    for chapters in books:
+        for chapter in chapters:
+            for raw in chapter:
+                for tok in set(reader.tokenize(raw.decode("latin-1"))):
+                    try:
+                        term = tok.encode("latin-1")
+                    except UnicodeEncodeError as e:
+                        raise SystemExit(f"Verse #{gid}: folded word {tok!r} is not Latin-1") from e
+                    if len(term) > 0xFF:
+                        raise SystemExit(f"Verse #{gid}: word longer than 255 bytes")
+                    postings.setdefault(term, []).append(gid)
+                gid += 1
+    return postings
+
+
+def encode_postings(gids: list[int]) -> bytes:
+    out = bytearray()
+    prev = 0
+    for g in gids:
+        put_varint(out, g - prev)
+        prev = g
+    return bytes(out)
+
+
+def write_search(books: list[list[list[bytes]]], out_idx: Path) -> None:
+    postings = search_terms(books)
+    terms = sorted(postings)
+    verse_count = sum(len(chapter) for chapters in books for chapter in chapters)
+    key_width = max((len(t) for t in terms), default=1)
+
+    # Postings area first (offsets relative to postings_offset, which is
+    # sector-aligned, so sector placement is the same as in the file).
+    lists = bytearray()
+    spans: list[tuple[int, int]] = []
+    for term in terms:
+        enc = encode_postings(postings[term])
+        lists += b"\0" * (place(len(lists), len(enc), "sector") - len(lists))
+        spans.append((len(lists), len(enc)))
+        lists += enc
+
+    # Dictionary blocks: front-coded inside each 2048-byte block.
+    blocks: list[bytearray] = []
+    directory: list[tuple[int, int, bytes]] = []
+    counts: list[int] = []
+    prev_term = b""
+    prev_end = 0
+    for i, term in enumerate(terms):
+        off, size = spans[i]
+        for fresh in (False, True):
+            if fresh or not blocks:
+                blocks.append(bytearray(b"\0\0"))
+                counts.append(0)
+                directory.append((i, prev_end, term))
+                prev_term = b""
+            shared = 0
+            limit = min(len(prev_term), len(term), 0xFF)
+            while shared < limit and prev_term[shared] == term[shared]:
+                shared += 1
+            entry = bytearray((shared, len(term) - shared)) + term[shared:]
+            put_varint(entry, len(postings[term]))
+            put_varint(entry, off - prev_end)
+            put_varint(entry, size)
+            if len(blocks[-1]) + len(entry) <= SECTOR:
+                break
+        blocks[-1] += entry
+        counts[-1] += 1
+        prev_term = term
+        prev_end = off + size
+
+    dir_entry = struct.Struct(f"<II{key_width}s")
+    dict_offset = -(-(SEARCH_HEADER.size + dir_entry.size * len(blocks)) // SECTOR) * SECTOR
+    postings_offset = dict_offset + SECTOR * len(blocks)
+    with out_idx.open("wb") as f:
+        f.write(
+            SEARCH_HEADER.pack(
+                SEARCH_MAGIC,
+                SEARCH_VERSION,
+                key_width,
+                len(terms),
+                verse_count,
+                len(blocks),
+                dict_offset,
+                postings_offset,
+                len(lists),
+                max((size for _, size in spans), default=0),
+            )
+        )
+        for entry in directory:
+            f.write(dir_entry.pack(*entry))
+        pad_to(f, dict_offset)
+        for block, count in zip(blocks, counts):
+            struct.pack_into("<H", block, 0, count)
+            f.write(block.ljust(SECTOR, b"\0"))
+        f.write(lists)
+
+    list_sectors = [sectors_touched(off, size) for off, size in spans]
+    print(f"Wrote: {out_idx} ({out_idx.stat().st_size} bytes)  words: {len(terms)}  dictionary sectors: {len(blocks)}")
+    print(
+        f"Postings: {len(lists)} bytes, sectors per word: avg {sum(list_sectors) / max(1, len(terms)):.2f}"
+        f"  max {max(list_sectors, default=0)} ({terms[list_sectors.index(max(list_sectors))].decode('latin-1') if terms else '-'})"
+    )
+
+
+def query_terms(query: str) -> list[tuple[str, bool]]:
+    """(folded word, is_prefix) for each word of a query; "amor*" is a prefix."""
+    out: list[tuple[str, bool]] = []
+    for part in query.split():
+        toks = reader.tokenize(part)
+        out.extend((tok, part.endswith("*") and i == len(toks) - 1) for i, tok in enumerate(toks))
+    return out
+
+
+class SearchIndexReader:
+    """Reference reader for SEARCH.IDX: the lookup the console would run.
+
+    Works on the file bytes; `sectors` counts the 2048-byte sectors touched
+    since the last reset (header and directory excluded: they stay in RAM).
+    """
+
+    def __init__(self, data: bytes) -> None:
+        (
+            magic,
+            version,
+            key_width,
+            self.term_count,
+            self.verse_count,
+            block_count,
+            self.dict_offset,
+            self.postings_offset,
+            self.postings_size,
+            self.max_postings_bytes,
+        ) = SEARCH_HEADER.unpack_from(data, 0)
+        if magic != SEARCH_MAGIC or version != SEARCH_VERSION:
+            raise ValueError("not a SEARCH.IDX v1 file")
+        if self.postings_offset + self.postings_size != len(data):
+            raise ValueError("SEARCH.IDX size does not match its header")
+        self.data = data
+        dir_entry = struct.Struct(f"<II{key_width}s")
+        self.first_term: list[int] = []
+        self.bases: list[int] = []
+        self.keys: list[bytes] = []
+        for k in range(block_count):
+            first, base, key = dir_entry.unpack_from(data, SEARCH_HEADER.size + dir_entry.size * k)
+            self.first_term.append(first)
+            self.bases.append(base)
+            self.keys.append(key.rstrip(b"\0"))
+        self.sectors = 0
+
+    def _read(self, offset: int, size: int) -> bytes:
+        self.sectors += sectors_touched(offset, size)
+        return self.data[offset : offset + size]
+
+    def block(self, k: int) -> Iterator[tuple[bytes, int, int, int]]:
+        """(word, verse_count, list offset, list size) for each entry of block k."""
+        buf = self._read(self.dict_offset + SECTOR * k, SECTOR)
+        (count,) = struct.unpack_from("<H", buf, 0)
+        pos = 2
+        term = b""
+        end = self.bases[k]
+        for _ in range(count):
+            shared, n = buf[pos], buf[pos + 1]
+            term = term[:shared] + buf[pos + 2 : pos + 2 + n]
+            pos += 2 + n
+            df, pos = get_varint(buf, pos)
+            gap, pos = get_varint(buf, pos)
+            size, pos = get_varint(buf, pos)
+            yield term, df, end + gap, size
+            end += gap + size
+
+    def postings(self, offset: int, size: int, buf: bytes | None = None) -> list[int]:
+        """Decode one list; `buf` is an already read range starting at `offset`."""
+        if buf is None:
+            buf = self._read(self.postings_offset + offset, size)
+        out: list[int] = []
+        g = pos = 0
+        while pos < size:
+            delta, pos = get_varint(buf, pos)
+            g += delta
+            out.append(g)
+        return out
+
+    def lookup(self, term: bytes) -> tuple[int, int, int] | None:
+        """(verse_count, offset, size) of a folded word, or None."""
+        k = bisect_right(self.keys, term) - 1
+        if k < 0:
+            return None
+        for word, df, off, size in self.block(k):
+            if word == term:
+                return df, off, size
+            if word > term:
+                break
+        return None
+
+    def docs(self, term: bytes) -> list[int]:
+        found = self.lookup(term)
+        return self.postings(found[1], found[2]) if found else []
+
+    def prefix_docs(self, prefix: bytes) -> list[int]:
+        """Union over the words starting with `prefix`.
+
+        Those words are adjacent in the dictionary, so their lists are one
+        contiguous range of the postings area: it is read once.
+        """
+        spans: list[tuple[int, int]] = []
+        first = k = max(0, bisect_right(self.keys, prefix) - 1)
+        while k < len(self.keys) and (k == first or self.keys[k].startswith(prefix)):
+            for word, _, off, size in self.block(k):
+                if word.startswith(prefix):
+                    spans.append((off, size))
+                elif word > prefix:
+                    break
+            k += 1
+        if not spans:
+            return []
+        start = spans[0][0]
+        buf = self._read(self.postings_offset + start, spans[-1][0] + spans[-1][1] - start)
+        out: set[int] = set()
+        for off, size in spans:
+            out.update(self.postings(off, size, buf[off - start :]))
+        return sorted(out)
+
+    def search(self, query: str) -> list[int]:
+        """Verses with every word of `query`; "palavra*" matches a prefix."""
+        result: set[int] | None = None
+        for tok, is_prefix in query_terms(query):
+            term = tok.encode("latin-1", errors="replace")
+            docs = set(self.prefix_docs(term) if is_prefix else self.docs(term))
+            result = docs if result is None else result & docs
+        return sorted(result or ())
+
+
+def verify_search(in_json: Path, out_idx: Path, queries: list[str]) -> None:
+    """Check SEARCH.IDX against a brute-force scan of the JSON itself."""
+    data = json.loads(in_json.read_text(encoding="utf-8-sig"))
+    verses = [
+        str(v).replace("\r", " ").replace("\n", " ")
+        for book in data
+        for chapter in book["chapters"]
+        for v in chapter
+    ]
+    words = [set(reader.tokenize(v)) for v in verses]
+    brute: dict[bytes, list[int]] = {}
+    for g, ws in enumerate(words):
+        for w in ws:
+            brute.setdefault(w.encode("latin-1"), []).append(g)
+
+    idx = SearchIndexReader(out_idx.read_bytes())
+    if idx.verse_count != len(verses) or idx.term_count != len(brute):
+        raise SystemExit(f"SEARCH verify: {idx.term_count} words / {idx.verse_count} verses in the index")
+    per_word: list[int] = []
+    for term, gids in brute.items():
+        idx.sectors = 0
+        if idx.docs(term) != gids:
+            raise SystemExit(f"SEARCH verify: word {term!r} does not match the JSON")
+        per_word.append(idx.sectors)
+
+    prefixes = sorted({t[:2] for t in brute})
+    for p in prefixes:
+        expect = sorted({g for t, gids in brute.items() if t.startswith(p) for g in gids})
+        if idx.prefix_docs(p) != expect:
+            raise SystemExit(f"SEARCH verify: prefix {p!r}* does not match the JSON")
+
+    for q in queries:
+        idx.sectors = 0
+        got = idx.search(q)
+        sectors = idx.sectors
+        terms = query_terms(q)
+        expect = [
+            g
+            for g, ws in enumerate(words)
+            if terms and all((any(w.startswith(t) for w in ws) if pre else t in ws) for t, pre in terms)
+        ]
+        if got != expect:
+            raise SystemExit(f"SEARCH verify: query {q!r} does not match the JSON")
+        print(f"  {q!r}: {len(got)} verses, {sectors} sectors")
+    print(
+        f"Verified: {len(brute)} words, {len(prefixes)} prefixes, {len(queries)} queries;"
+        f" sectors per word lookup: avg {sum(per_word) / max(1, len(per_word)):.2f}  max {max(per_word, default=0)}"
+    )
+
+
+def verify_bib2(books: list[list[list[bytes]]], out_bin: Path, out_idx: Path) -> None:
+    """Round-trip: parse BIB2 from disk and decode every chapter."""
+    idx = out_idx.read_bytes()
+    blob = out_bin.read_bytes()
+    magic, version, book_count, chapter_count, verse_count, text_size, *_ = BIB2_HEADER.unpack_from(idx, 0)
+    if magic != BIB2_MAGIC or version != BIB2_VERSION or text_size != len(blob):
+        raise SystemExit("BIB2 verify: bad header")
+    pos = BIB2_HEADER.size
+    table = [(idx[pos + 2 * i], idx[pos + 2 * i + 1]) for i in range(256)]
+    pos += 512 + 8 * book_count + 8 * chapter_count
+
+    c = 0
+    for chapters in books:
+        for chapter in chapters:
+            off, size, raw_size = BIB2_BLOCK.unpack_from(idx, pos + BIB2_BLOCK.size * c)
+            raw = decode_block(blob[off : off + size], table)
+            if len(raw) != raw_size or raw.split(b"\0")[:-1] != chapter:
+                raise SystemExit(f"BIB2 verify: chapter #{c} does not round-trip")
+            c += 1
+    print(f"Verified: {c} chapters, {verse_count} verses round-trip")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--json", default="acf_clean.json", help="Input JSON (clean UTF-8).")
+    ap.add_argument("--out-dir", default="saturn_app/cd", help="Output directory (CD root).")
+    ap.add_argument(
+        "--format",
+        choices=("bib1", "bib2"),
+        default="bib1",
+        help="bib1: raw text + per-verse offsets (what main.c reads); bib2: per-chapter byte-pair-compressed blocks.",
+    )
+    ap.add_argument(
+        "--layout",
+        choices=("packed", "sector"),
+        default="packed",
+        help="sector: place each chapter so it touches the fewest 2048-byte sectors (BIB1 index gains chapter spans).",
+    )
+    ap.add_argument("--out-bin", default=None, help="Output text blob filename (default: BIBLE[2][A].BIN).")
+    ap.add_argument("--out-idx", default=None, help="Output index filename (default: BIBLE[2][A].IDX).")
+    ap.add_argument("--max-codes", type=int, default=255, help="BIB2: maximum number of pair codes.")
+    ap.add_argument(
+        "--verify",
+        action="store_true",
+        help="BIB2: decode every chapter back and compare with the JSON; --search: check the index against the JSON.",
+    )
+    ap.add_argument("--lines", action="store_true", help="Also write pre-wrapped BIBLE.LIN + BIBLELIN.IDX.")
+    ap.add_argument("--cols", type=int, default=READ_MAX_COLS, help="Line width for --lines (main.c READ_MAX_COLS).")
+    ap.add_argument("--search", action="store_true", help="Also write the accent-folded word index SEARCH.IDX.")
+    ap.add_argument(
+        "--query",
+        action="append",
+        default=[],
+        help="--search --verify: sample query to check (repeatable; default: a built-in list).",
+    )
+    args = ap.parse_args()
+
+    in_json = Path(args.json)
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Opt-in formats get their own names so the files main.c reads stay BIB1 v1.
+    stem = ("BIBLE" if args.format == "bib1" else "BIBLE2") + ("A" if args.layout == "sector" else "")
+    out_bin = out_dir / (args.out_bin or f"{stem}.BIN")
+    out_idx = out_dir / (args.out_idx or f"{stem}.IDX")
+
+    books = read_corpus(in_json)
+    if args.lines:
+        widest = len(b"%d " % max(len(chapter) for chapters in books for chapter in chapters))
+        if args.cols <= widest:
+            raise SystemExit(f"--cols {args.cols} leaves no room for text after the {widest}-char verse prefix")
+    if args.format == "bib1":
+        spans = write_bib1(books, out_bin, out_idx, args.layout)
+    else:
+        _, spans = write_bib2(books, out_bin, out_idx, args.max_codes, args.layout)
+        if args.verify:
+            verify_bib2(books, out_bin, out_idx)
+
+    idx_size = out_idx.stat().st_size
+    bin_size = out_bin.stat().st_size
+    verse_count = sum(len(chapter) for chapters in books for chapter in chapters)
+    sectors = [sectors_touched(off, size) for off, size in spans]
+
     print(f"Wrote: {out_bin} ({bin_size} bytes)")
     print(f"Wrote: {out_idx} ({idx_size} bytes)")
-    print(f"Books: {len(book_entries)}  Chapters: {len(chapter_entries)}  Verses: {len(verse_offsets)}")
-    print(f"Max verse bytes (incl NUL): {max_verse_len}")
+    print(f"Books: {len(books)}  Chapters: {len(spans)}  Verses: {verse_count}")
+    print(f"Sectors per chapter read: avg {sum(sectors) / max(1, len(sectors)):.2f}  max {max(sectors, default=0)}")
+    if args.lines:
+        write_lines(books, out_dir / "BIBLE.LIN", out_dir / "BIBLELIN.IDX", args.cols)
+    if args.search:
+        write_search(books, out_dir / "SEARCH.IDX")
+        if args.verify:
+            verify_search(in_json, out_dir / "SEARCH.IDX", args.query or list(SEARCH_QUERIES))
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
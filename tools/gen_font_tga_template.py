@@ -11,14 +11,37 @@ in the source image (see jo_vdp2_set_nbg2_8bits_font documentation).
 Output files (defaults):
 - saturn_app/cd/FONT.TGA
 - saturn_app/font_mapping.h  (ASCII-only mapping string for C)
+
+All glyphs are drawn into one 8-pixel-high row (cell i at x = 8*i) and
+processed as whole-strip masks: dilation and the drop shadow are shifted
+copies of the glyph mask combined with ImageChops, clipped to each cell, and
+the row is rotated once at the end. Extra sizes/styles can be rendered in the
+same run with --variant, e.g.:
+
+  --variant size=7,bold=0 --variant bold=2,bold-mode=4n,shadow=none
+
+Each variant is written to --variant-dir as FONT_<name>.TGA (+ preview PNG).
 """
 
 from __future__ import annotations
 
 import argparse
+import json
+import time
+from dataclasses import dataclass, fields, replace
+from functools import lru_cache
 from pathlib import Path
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+
+CELL = 8
+
+# Paletted image:
+# - index 0 = glyph (white)
+# - index 1 = background (transparent on Saturn)
+# - index 2 = shadow (dark gray)
+PALETTE = [255, 255, 255, 0, 0, 0, 64, 64, 64] + [0, 0, 0] * 253
 
 
 ASCII_PRINTABLE = list(range(0x20, 0x7F))
@@ -93,6 +116,151 @@ def mapping_bytes_to_c_string(mapping: list[int]) -> str:
     return " ".join(parts)
 
 
+@dataclass(frozen=True)
+class Style:
+    font: str
+    size: int = 8
+    xoff: int = 0
+    yoff: int = 0
+    bold: int = 1
+    bold_mode: str = "right"
+    shadow: str = "drop"
+    shadow_dx: int = 1
+    shadow_dy: int = 0
+    name: str = ""
+
+    def tag(self) -> str:
+        if self.name:
+            return self.name
+        tag = f"S{self.size}B{self.bold}"
+        if self.bold and self.bold_mode != "right":
+            tag += self.bold_mode.upper()
+        if self.shadow != "none":
+            tag += f"D{self.shadow_dx}{self.shadow_dy}".replace("-", "M")
+        return tag
+
+
+def parse_variant(spec: str, base: Style) -> Style:
+    """'size=7,bold=2,bold-mode=4n' -> copy of `base` with those fields."""
+    types = {f.name: f.type for f in fields(Style)}
+    changes: dict[str, object] = {}
+    for item in filter(None, (x.strip() for x in spec.split(","))):
+        key, sep, value = item.partition("=")
+        key = key.strip().replace("-", "_")
+        if not sep or key not in types:
+            raise SystemExit(f"Bad --variant item: {item!r} (keys: {', '.join(types)})")
+        if types[key] in (int, "int"):
+            try:
+                changes[key] = int(value)
+            except ValueError:
+                raise SystemExit(f"Bad --variant item: {item!r} ({key} needs an integer)") from None
+        else:
+            changes[key] = value.strip()
+    style = replace(base, **changes)
+    if style.bold_mode not in ("right", "4n"):
+        raise SystemExit(f"Unsupported bold mode: {style.bold_mode}")
+    if style.shadow not in ("none", "drop"):
+        raise SystemExit(f"Unsupported shadow mode: {style.shadow}")
+    return style
+
+
+@lru_cache(maxsize=None)
+def cell_mask(count: int, kind: str, arg: int) -> Image.Image:
+    """255/0 "L" mask over a row of `count` cells.
+
+    kind "dx":     columns that may receive a pixel shifted by `arg` inside its cell
+    kind "parity": columns of the cells whose index % 2 == arg
+    """
+    if kind == "dx":
+        row = bytes(255 if 0 <= x % CELL - arg < CELL else 0 for x in range(CELL * count))
+    else:
+        row = bytes(255 if (x // CELL) % 2 == arg else 0 for x in range(CELL * count))
+    return Image.frombytes("L", (CELL * count, CELL), row * CELL)
+
+
+def shift(mask: Image.Image, dx: int, dy: int) -> Image.Image:
+    """Move every pixel by (dx, dy); pixels leaving their 8x8 cell are dropped."""
+    w, h = mask.size
+    out = Image.new("L", mask.size, 0)
+    src = mask.crop((max(0, -dx), max(0, -dy), w - max(0, dx), h - max(0, dy)))
+    out.paste(src, (max(0, dx), max(0, dy)))
+    if dx:
+        out = ImageChops.darker(out, cell_mask(w // CELL, "dx", dx))
+    return out
+
+
+def render_glyphs(mapping: list[int], font: ImageFont.ImageFont, xoff: int, yoff: int) -> Image.Image:
+    """Glyph mask (255 = ink) of every character, cell i at x = 8*i.
+
+    Even and odd cells are drawn on separate rows and clipped to their cells,
+    so a glyph wider than 8 pixels is cut at its own cell edge, not drawn
+    over its neighbour.
+    """
+    count = len(mapping)
+    out = Image.new("L", (CELL * count, CELL), 0)
+    for parity in (0, 1):
+        layer = Image.new("L", out.size, 0)
+        d = ImageDraw.Draw(layer)
+        d.fontmode = "1"  # same bilevel rendering as drawing on a "P" image
+        for i in range(parity, count, 2):
+            d.text((CELL * i + xoff, yoff), bytes([mapping[i]]).decode("latin1"), font=font, fill=255)
+        out = ImageChops.lighter(out, ImageChops.darker(layer, cell_mask(count, "parity", parity)))
+    return out
+
+
+def dilate(mask: Image.Image, rounds: int, mode: str) -> Image.Image:
+    dirs = ((1, 0),) if mode == "right" else ((1, 0), (-1, 0), (0, 1), (0, -1))
+    for _ in range(max(0, rounds)):
+        grown = mask
+        for dx, dy in dirs:
+            grown = ImageChops.lighter(grown, shift(mask, dx, dy))
+        mask = grown
+    return mask
+
+
+def drop_shadow(mask: Image.Image, dx: int, dy: int) -> Image.Image:
+    """Shadow pixels: the glyph moved by (dx, dy), minus the glyph itself."""
+    return ImageChops.subtract(shift(mask, dx, dy), mask)
+
+
+def build_strip(mapping: list[int], style: Style, glyphs: Image.Image) -> Image.Image:
+    mask = dilate(glyphs, style.bold, style.bold_mode)
+    row = Image.new("P", mask.size, color=1)
+    row.putpalette(PALETTE)
+    if style.shadow == "drop":
+        row.paste(2, mask=drop_shadow(mask, style.shadow_dx, style.shadow_dy))
+    row.paste(0, mask=mask)
+    # Rotating the row 90 degrees clockwise rotates every cell the way Jo
+    # Engine wants and stacks them top to bottom (cell 0 first).
+    return row.transpose(Image.Transpose.ROTATE_270)
+
+
+class GlyphCache:
+    """Rendered glyph masks per (font, size, xoff, yoff), shared by variants."""
+
+    def __init__(self, mapping: list[int]) -> None:
+        self.mapping = mapping
+        self._fonts: dict[tuple[str, int], ImageFont.ImageFont] = {}
+        self._glyphs: dict[tuple[str, int, int, int], Image.Image] = {}
+
+    def get(self, style: Style) -> Image.Image:
+        key = (style.font, style.size, style.xoff, style.yoff)
+        if key not in self._glyphs:
+            fkey = (style.font, style.size)
+            if fkey not in self._fonts:
+                self._fonts[fkey] = ImageFont.truetype(style.font, style.size)
+            self._glyphs[key] = render_glyphs(self.mapping, self._fonts[fkey], style.xoff, style.yoff)
+        return self._glyphs[key]
+
+
+def save_strip(strip: Image.Image, out_tga: Path, out_preview: Path | None) -> None:
+    out_tga.parent.mkdir(parents=True, exist_ok=True)
+    if out_preview is not None:
+        out_preview.parent.mkdir(parents=True, exist_ok=True)
+        strip.save(out_preview, format="PNG")
+    strip.save(out_tga, format="TGA")
+
+
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument(
@@ -115,6 +283,7 @@ def main() -> int:
         default="saturn_app/FONT_PREVIEW.png",
         help="Output preview PNG (rotated glyphs, same layout as TGA).",
     )
+    ap.add_argument("--size", type=int, default=8, help="Font size passed to the font loader.")
     ap.add_argument("--xoff", type=int, default=0, help="X offset inside the 8x8 cell.")
     ap.add_argument("--yoff", type=int, default=0, help="Y offset inside the 8x8 cell.")
     ap.add_argument(
@@ -147,102 +316,67 @@ def main() -> int:
         default=0,
         help="Shadow Y offset (pixels) for --shadow=drop.",
     )
+    ap.add_argument(
+        "--stats",
+        default="",
+        help="Corpus report from tools/corpus_stats.py; fail if the text uses a byte the mapping lacks.",
+    )
+    ap.add_argument(
+        "--variant",
+        action="append",
+        default=[],
+        help="Extra size/style to render, as key=value pairs over the options above "
+        "(size, xoff, yoff, bold, bold-mode, shadow, shadow-dx, shadow-dy, font, name). Repeatable.",
+    )
+    ap.add_argument(
+        "--variant-dir",
+        default="saturn_app/font_variants",
+        help="Output directory for --variant strips (FONT_<name>.TGA + .png).",
+    )
     args = ap.parse_args()
 
     mapping = build_mapping_bytes()
     if mapping[0] != 0x20:
         raise SystemExit("Mapping must start with space (0x20)")
+    if args.stats:
+        report = json.loads(Path(args.stats).read_text(encoding="utf-8"))
+        missing = [b for b in report["latin1_extra"] if b not in mapping]
+        if missing:
+            raise SystemExit(
+                "Corpus uses Latin-1 bytes missing from EXTRA_LATIN1: "
+                + ", ".join(f"0x{b:02X} ({bytes([b]).decode('latin1')})" for b in missing)
+            )
 
     out_tga = Path(args.out_tga)
     out_header = Path(args.out_header)
     out_preview = Path(args.preview_png) if args.preview_png else None
-    out_tga.parent.mkdir(parents=True, exist_ok=True)
     out_header.parent.mkdir(parents=True, exist_ok=True)
-    if out_preview is not None:
-        out_preview.parent.mkdir(parents=True, exist_ok=True)
 
-    font = ImageFont.truetype(args.font, 8)
-
-    # Paletted image:
-    # - index 0 = glyph (white)
-    # - index 1 = background (transparent on Saturn)
-    # - index 2 = shadow (dark gray)
-    palette = [255, 255, 255, 0, 0, 0, 64, 64, 64] + [0, 0, 0] * 253
-
-    strip_h = 8 * len(mapping)
-    strip = Image.new("P", (8, strip_h), color=1)
-    strip.putpalette(palette)
-
-    def dilate(cell_img: Image.Image) -> None:
-        # In our palette: 0 = glyph pixel, 1 = background.
-        pix = cell_img.load()
-        w, h = cell_img.size
-        orig = [[pix[x, y] for x in range(w)] for y in range(h)]
-        out = [row[:] for row in orig]
-        for y in range(h):
-            for x in range(w):
-                if orig[y][x] != 0:
-                    continue
-                if args.bold_mode == "right":
-                    dirs = ((1, 0),)
-                else:
-                    dirs = ((1, 0), (-1, 0), (0, 1), (0, -1))
-                for dx, dy in dirs:
-                    nx = x + dx
-                    ny = y + dy
-                    if 0 <= nx < w and 0 <= ny < h:
-                        out[ny][nx] = 0
-        for y in range(h):
-            for x in range(w):
-                pix[x, y] = out[y][x]
-
-    def apply_drop_shadow(cell_img: Image.Image) -> None:
-        if args.shadow == "none":
-            return
-        if args.shadow != "drop":
-            raise SystemExit(f"Unsupported shadow mode: {args.shadow}")
-
-        pix = cell_img.load()
-        w, h = cell_img.size
-        orig = [[pix[x, y] for x in range(w)] for y in range(h)]
-        out = [row[:] for row in orig]
-
-        dx = args.shadow_dx
-        dy = args.shadow_dy
-
-        for y in range(h):
-            for x in range(w):
-                if orig[y][x] != 0:
-                    continue
-                nx = x + dx
-                ny = y + dy
-                if not (0 <= nx < w and 0 <= ny < h):
-                    continue
-                if orig[ny][nx] == 0:
-                    continue
-                if out[ny][nx] == 1:
-                    out[ny][nx] = 2
-
-        for y in range(h):
-            for x in range(w):
-                pix[x, y] = out[y][x]
-
-    for i, b in enumerate(mapping):
-        ch = bytes([b]).decode("latin1")
-        cell = Image.new("P", (8, 8), color=1)
-        cell.putpalette(palette)
-        d = ImageDraw.Draw(cell)
-        d.text((args.xoff, args.yoff), ch, font=font, fill=0)
-        for _ in range(max(0, args.bold)):
-            dilate(cell)
-        apply_drop_shadow(cell)
-        # Rotate 90 degrees clockwise for Jo Engine.
-        cell = cell.transpose(Image.Transpose.ROTATE_270)
-        strip.paste(cell, (0, i * 8))
+    style = Style(
+        font=args.font,
+        size=args.size,
+        xoff=args.xoff,
+        yoff=args.yoff,
+        bold=args.bold,
+        bold_mode=args.bold_mode,
+        shadow=args.shadow,
+        shadow_dx=args.shadow_dx,
+        shadow_dy=args.shadow_dy,
+    )
+    variants = [parse_variant(spec, style) for spec in args.variant]
+    cache = GlyphCache(mapping)
 
-    if out_preview is not None:
-        strip.save(out_preview, format="PNG")
-    strip.save(out_tga, format="TGA")
+    t0 = time.perf_counter()
+    strip = build_strip(mapping, style, cache.get(style))
+    save_strip(strip, out_tga, out_preview)
+
+    variant_dir = Path(args.variant_dir)
+    written: list[Path] = []
+    for v in variants:
+        name = f"FONT_{v.tag()}"
+        save_strip(build_strip(mapping, v, cache.get(v)), variant_dir / f"{name}.TGA", variant_dir / f"{name}.png")
+        written.append(variant_dir / f"{name}.TGA")
+    elapsed_ms = (time.perf_counter() - t0) * 1000.0
 
     mapping_c = mapping_bytes_to_c_string(mapping)
     header = f"""// Auto-generated by tools/gen_font_tga_template.py
@@ -263,7 +397,9 @@ def main() -> int:
     if out_preview is not None:
         print(f"Wrote: {out_preview}")
     print(f"Wrote: {out_header}")
-    print(f"Glyphs: {len(mapping)}")
+    for path in written:
+        print(f"Wrote: {path}")
+    print(f"Glyphs: {len(mapping)}  strips: {1 + len(variants)}  ({elapsed_ms:.1f} ms)")
     return 0
 
 
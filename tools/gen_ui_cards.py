@@ -5,43 +5,91 @@ We keep these textures tiny and rely on VDP1 scaling/distortion at runtime.
 Files generated (by default):
 - saturn_app/cd/UI/CARD.TGA      (normal card)
 - saturn_app/cd/UI/CARDSEL.TGA   (selected card)
+
+--states normal,selected,disabled,pressed also writes CARDDIS.TGA and
+CARDPRS.TGA; main.c does not load those yet, so they are opt-in.
+
+Colours come from the THEMES table (--theme). Extra sizes (--sizes 128x32,...)
+are written as C<W>X<H><S>.TGA (S = N/S/D/P), keeping 8.3 names for the CD.
+--sheet packs every generated card into one image, with a JSON map of the
+rectangles next to it, for quick side-by-side comparison of a theme.
 """
 
 from __future__ import annotations
 
 import argparse
+import json
+from dataclasses import dataclass
 from pathlib import Path
 
 from PIL import Image, ImageDraw
 
 
+RGB = tuple[int, int, int]
+
+
+@dataclass(frozen=True)
+class CardStyle:
+    top: RGB
+    bot: RGB
+    border_light: RGB
+    border_dark: RGB
+    inner_highlight: RGB | None = None
+
+
+STATES = ("normal", "selected", "disabled", "pressed")
+# The states main.c loads (CARD.TGA / CARDSEL.TGA).
+DEFAULT_STATES = ("normal", "selected")
+# File name at the base size, and the letter used for the other sizes.
+STATE_FILES = {"normal": "CARD", "selected": "CARDSEL", "disabled": "CARDDIS", "pressed": "CARDPRS"}
+STATE_LETTERS = {"normal": "N", "selected": "S", "disabled": "D", "pressed": "P"}
+
+# Pressed cards reverse the gradient and swap the bevel colours, so the card
+# looks pushed in.
+THEMES: dict[str, dict[str, CardStyle]] = {
+    "classic": {
+        # Normal card: dark, neutral.
+        "normal": CardStyle((44, 44, 52), (18, 18, 22), (160, 160, 175), (6, 6, 8), (96, 96, 112)),
+        # Selected card: warmer/brighter.
+        "selected": CardStyle((110, 86, 36), (62, 44, 18), (240, 220, 150), (18, 12, 6), (190, 160, 90)),
+        "disabled": CardStyle((34, 34, 38), (24, 24, 28), (84, 84, 92), (10, 10, 12), None),
+        "pressed": CardStyle((52, 38, 16), (96, 74, 30), (18, 12, 6), (200, 180, 120), None),
+    },
+    "blue": {
+        "normal": CardStyle((30, 40, 70), (12, 16, 34), (140, 160, 210), (4, 6, 12), (70, 90, 140)),
+        "selected": CardStyle((60, 110, 170), (24, 56, 100), (200, 230, 255), (6, 12, 24), (120, 170, 220)),
+        "disabled": CardStyle((30, 34, 44), (20, 22, 30), (80, 86, 100), (8, 8, 12), None),
+        "pressed": CardStyle((20, 46, 84), (50, 96, 150), (6, 12, 24), (160, 200, 240), None),
+    },
+}
+
+
 def lerp(a: int, b: int, t: float) -> int:
     return int(round(a + (b - a) * t))
 
 
-def lerp_rgb(c0: tuple[int, int, int], c1: tuple[int, int, int], t: float) -> tuple[int, int, int]:
+def lerp_rgb(c0: RGB, c1: RGB, t: float) -> RGB:
     return (lerp(c0[0], c1[0], t), lerp(c0[1], c1[1], t), lerp(c0[2], c1[2], t))
 
 
+def gradient(w: int, h: int, top: RGB, bot: RGB) -> Image.Image:
+    """Vertical gradient: one 1-pixel column, broadcast across the width."""
+    column = bytearray()
+    for y in range(h):
+        column += bytes(lerp_rgb(top, bot, 0.0 if h <= 1 else y / (h - 1)))
+    return Image.frombytes("RGB", (1, h), bytes(column)).resize((w, h), Image.Resampling.NEAREST)
+
+
 def make_card(
     w: int,
     h: int,
-    top: tuple[int, int, int],
-    bot: tuple[int, int, int],
-    border_light: tuple[int, int, int],
-    border_dark: tuple[int, int, int],
-    inner_highlight: tuple[int, int, int] | None = None,
+    top: RGB,
+    bot: RGB,
+    border_light: RGB,
+    border_dark: RGB,
+    inner_highlight: RGB | None = None,
 ) -> Image.Image:
-    img = Image.new("RGB", (w, h), bot)
-    px = img.load()
-
-    # Vertical gradient fill.
-    for y in range(h):
-        t = 0.0 if h <= 1 else y / (h - 1)
-        c = lerp_rgb(top, bot, t)
-        for x in range(w):
-            px[x, y] = c
-
+    img = gradient(w, h, top, bot)
     d = ImageDraw.Draw(img)
 
     # Beveled border (1px).
@@ -57,48 +105,87 @@ def make_card(
     return img
 
 
+def card_name(state: str, size: tuple[int, int], base: tuple[int, int]) -> str:
+    if size == base:
+        return STATE_FILES[state] + ".TGA"
+    stem = f"C{size[0]}X{size[1]}{STATE_LETTERS[state]}"
+    if len(stem) > 8:
+        raise SystemExit(f"Card size {size[0]}x{size[1]} does not fit an 8.3 file name ({stem})")
+    return stem + ".TGA"
+
+
+def parse_size(text: str) -> tuple[int, int]:
+    w, sep, h = text.lower().partition("x")
+    if not sep or not w.strip().isdigit() or not h.strip().isdigit() or int(w) < 2 or int(h) < 2:
+        raise SystemExit(f"Bad card size: {text!r} (expected WxH, e.g. 128x32)")
+    return int(w), int(h)
+
+
+def pack_sheet(cards: list[tuple[str, Image.Image]], columns: int, pad: int = 2) -> tuple[Image.Image, list[dict]]:
+    """Grid of `columns` cards per row (one row per size); returns sheet + rects."""
+    rows = [cards[i : i + columns] for i in range(0, len(cards), columns)]
+    width = max(sum(im.width for _, im in row) + pad * (len(row) + 1) for row in rows)
+    height = sum(max(im.height for _, im in row) for row in rows) + pad * (len(rows) + 1)
+    sheet = Image.new("RGB", (width, height), (0, 0, 0))
+    rects: list[dict] = []
+    y = pad
+    for row in rows:
+        x = pad
+        for name, im in row:
+            sheet.paste(im, (x, y))
+            rects.append({"name": name, "x": x, "y": y, "w": im.width, "h": im.height})
+            x += im.width + pad
+        y += max(im.height for _, im in row) + pad
+    return sheet, rects
+
+
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--out-dir", default="saturn_app/cd/UI", help="Output directory inside the CD tree.")
     ap.add_argument("--w", type=int, default=64, help="Base card width (pixels).")
     ap.add_argument("--h", type=int, default=16, help="Base card height (pixels).")
+    ap.add_argument("--theme", choices=sorted(THEMES), default="classic", help="Colour theme.")
+    ap.add_argument(
+        "--states",
+        default=",".join(DEFAULT_STATES),
+        help=f"Comma-separated card states to generate ({', '.join(STATES)}; default: %(default)s).",
+    )
+    ap.add_argument("--sizes", default="", help="Extra card sizes, e.g. 128x32,96x24.")
+    ap.add_argument("--sheet", default="", help="Also pack every card into this image (+ .json rect map).")
     args = ap.parse_args()
 
+    states = [s.strip() for s in args.states.split(",") if s.strip()]
+    for s in states:
+        if s not in STATES:
+            raise SystemExit(f"Unknown state: {s} (known: {', '.join(STATES)})")
+    base = (args.w, args.h)
+    sizes = [base] + [sz for sz in (parse_size(t) for t in args.sizes.split(",") if t.strip()) if sz != base]
+    theme = THEMES[args.theme]
+
     out_dir = Path(args.out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    # Normal card: dark, neutral.
-    card = make_card(
-        args.w,
-        args.h,
-        top=(44, 44, 52),
-        bot=(18, 18, 22),
-        border_light=(160, 160, 175),
-        border_dark=(6, 6, 8),
-        inner_highlight=(96, 96, 112),
-    )
-
-    # Selected card: warmer/brighter.
-    card_sel = make_card(
-        args.w,
-        args.h,
-        top=(110, 86, 36),
-        bot=(62, 44, 18),
-        border_light=(240, 220, 150),
-        border_dark=(18, 12, 6),
-        inner_highlight=(190, 160, 90),
-    )
-
-    out_card = out_dir / "CARD.TGA"
-    out_card_sel = out_dir / "CARDSEL.TGA"
-    card.save(out_card, format="TGA")
-    card_sel.save(out_card_sel, format="TGA")
-
-    print(f"Wrote: {out_card}")
-    print(f"Wrote: {out_card_sel}")
+    cards: list[tuple[str, Image.Image]] = []
+    for w, h in sizes:
+        for state in states:
+            st = theme[state]
+            img = make_card(w, h, st.top, st.bot, st.border_light, st.border_dark, st.inner_highlight)
+            name = card_name(state, (w, h), base)
+            img.save(out_dir / name, format="TGA")
+            cards.append((name, img))
+            print(f"Wrote: {out_dir / name}")
+
+    if args.sheet:
+        sheet, rects = pack_sheet(cards, len(states))
+        sheet_path = Path(args.sheet)
+        sheet_path.parent.mkdir(parents=True, exist_ok=True)
+        sheet.save(sheet_path)
+        map_path = sheet_path.with_suffix(".json")
+        map_path.write_text(json.dumps({"theme": args.theme, "cards": rects}, indent=1) + "\n", encoding="utf-8")
+        print(f"Wrote: {sheet_path} ({sheet.width}x{sheet.height}, {len(cards)} cards)")
+        print(f"Wrote: {map_path}")
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Load test for the HTTP/JSON service of dos_biblia_acf.py (--serve).
+
+Opens --concurrency keep-alive connections to localhost and has each one
+send requests from a fixed mix (references, ranges and the different search
+kinds) until --requests have been sent in total. Reports throughput, latency
+percentiles and status counts, as text on stderr and optionally as JSON.
+
+  python3 dos_biblia_acf.py --serve 8080 &
+  python3 tools/load_test_server.py --port 8080 --concurrency 16 --requests 5000
+
+  # or let the script start (and stop) the server itself:
+  python3 tools/load_test_server.py --spawn --concurrency 16 --requests 5000
+
+The first search request builds the index inside the server; use --warmup to
+send one request of each kind before timing starts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+import urllib.parse
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_MIX = (
+    "/ref?q=jo 3:16",
+    "/ref?q=sl 23",
+    "/ref?q=mt 5:3-12",
+    "/range?from=jo 3:16&to=jo 4:10",
+    "/search?q=senhor dos exercitos&limit=20",
+    "/search?q=\"filho do homem\"&limit=20",
+    "/search?q=?amor fe esperanca&limit=10",
+    "/search?q=~melquisedeque",
+    "/health",
+)
+
+
+def encode_path(path: str) -> str:
+    url = urllib.parse.urlsplit(path)
+    query = urllib.parse.urlencode(urllib.parse.parse_qsl(url.query))
+    return f"{url.path}?{query}" if query else url.path
+
+
+async def read_response(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+    body = await reader.readexactly(length) if length else b""
+    return status, body
+
+
+class Worker:
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.connects = 0
+
+    async def request(self, path: str) -> int:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            self.connects += 1
+        assert self.reader is not None
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\n\r\n".encode("ascii"))
+        await self.writer.drain()
+        status, _ = await read_response(self.reader)
+        return status
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.writer = None
+
+
+async def run(host: str, port: int, paths: List[str], concurrency: int, total: int, warmup: bool) -> Dict[str, Any]:
+    if warmup:
+        w = Worker(host, port)
+        for p in paths:
+            await w.request(p)
+        await w.close()
+
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors: Counter = Counter()
+    counter = iter(range(total))
+    workers = [Worker(host, port) for _ in range(concurrency)]
+
+    async def loop(wi: int, w: Worker) -> None:
+        for n in counter:
+            path = paths[(n + wi) % len(paths)]
+            t0 = time.perf_counter()
+            try:
+                status = await w.request(path)
+            except (OSError, asyncio.IncompleteReadError) as e:
+                errors[type(e).__name__] += 1
+                await w.close()
+                continue
+            latencies.append(time.perf_counter() - t0)
+            statuses[status] += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(loop(i, w) for i, w in enumerate(workers)))
+    wall = time.perf_counter() - t0
+    for w in workers:
+        await w.close()
+
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(p / 100.0 * len(latencies)))] * 1000.0
+
+    return {
+        "requests": len(latencies),
+        "errors": dict(errors),
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "connections": sum(w.connects for w in workers),
+        "concurrency": concurrency,
+        "wall_s": wall,
+        "rps": len(latencies) / wall if wall > 0 else 0.0,
+        "latency_ms": {
+            "p50": pct(50),
+            "p90": pct(90),
+            "p99": pct(99),
+            "max": latencies[-1] * 1000.0 if latencies else 0.0,
+            "mean": sum(latencies) / len(latencies) * 1000.0 if latencies else 0.0,
+        },
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(host: str, port: int, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if proc.poll() is not None:
+            raise SystemExit(f"server exited with code {proc.returncode}")
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit("server did not start in time")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--concurrency", type=int, default=8, help="Parallel keep-alive connections.")
+    ap.add_argument("--requests", type=int, default=2000, help="Total requests.")
+    ap.add_argument("--path", action="append", default=[], help="Request path (repeatable); default: built-in mix.")
+    ap.add_argument("--warmup", action="store_true", help="Send each path once before timing.")
+    ap.add_argument("--spawn", action="store_true", help="Start dos_biblia_acf.py --serve on a free port for the run.")
+    ap.add_argument("--server-args", default="", help="Extra arguments for the spawned server (e.g. '--store saturn_app/cd').")
+    ap.add_argument("--out", default="", help="Write the JSON report here.")
+    args = ap.parse_args()
+
+    paths = [encode_path(p) for p in (args.path or DEFAULT_MIX)]
+    proc: Optional[subprocess.Popen] = None
+    port = args.port
+    if args.spawn:
+        port = free_port()
+        script = Path(__file__).resolve().parent.parent / "dos_biblia_acf.py"
+        cmd = [sys.executable, str(script), "--serve", f"{args.host}:{port}"] + args.server_args.split()
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+        wait_ready(args.host, port, proc)
+
+    try:
+        report = asyncio.run(run(args.host, port, paths, max(1, args.concurrency), max(1, args.requests), args.warmup))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    lat = report["latency_ms"]
+    print(
+        f"{report['requests']} requests in {report['wall_s']:.2f} s  ({report['rps']:.0f} req/s, "
+        f"{report['connections']} connections)",
+        file=sys.stderr,
+    )
+    print(
+        f"latency ms  p50 {lat['p50']:.2f}  p90 {lat['p90']:.2f}  p99 {lat['p99']:.2f}  max {lat['max']:.2f}",
+        file=sys.stderr,
+    )
+    print(f"statuses {report['statuses']}  errors {report['errors']}", file=sys.stderr)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote: {args.out}", file=sys.stderr)
+    return 1 if report["errors"] or any(not k.startswith("2") for k in report["statuses"]) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
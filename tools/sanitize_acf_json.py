@@ -10,154 +10,176 @@ Motivacao:
 
 Este script faz substituicoes pontuais (baseado nas ocorrencias reais encontradas)
 e falha se restar qualquer caractere de controle no resultado.
+
+As regras ficam na tabela RULES e sao aplicadas numa unica passada por string:
+uma regex com todas as regras em alternancia (mais uma alternativa final para
+qualquer caractere de controle que sobrar). Os livros sao decodificados e
+gravados um por vez, sem manter a arvore inteira (entrada + saida) na memoria.
+Com --stats-out, a mesma passada tambem alimenta o relatorio de
+tools/corpus_stats.py (custa ~1 s a mais); por padrao ele nao e gerado.
+
+  python3 tools/sanitize_acf_json.py --in acf.json --out acf_clean.json
+  python3 tools/sanitize_acf_json.py --show 0      # lista todas as ocorrencias
+  python3 tools/sanitize_acf_json.py --stats-out acf_clean.stats.json
 """
 
 from __future__ import annotations
 
+import argparse
 import json
+import re
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List
-
-
-IN_PATH = Path("acf.json")
-OUT_PATH = Path("acf_clean.json")
-
-
-@dataclass
-class FixStats:
-    replaced_i_85: int = 0
-    replaced_96: int = 0
-    replaced_97: int = 0
-    replaced_e_9e_upper: int = 0
-    replaced_e_9e_lower: int = 0
-    replaced_newline: int = 0
-    strings_changed: int = 0
+from typing import Any, Dict, List, Tuple
 
+from corpus_stats import CorpusStats, iter_array, write_stats
 
-def _count_substring(s: str, sub: str) -> int:
-    if not sub:
-        return 0
-    return s.count(sub)
 
+@dataclass(frozen=True)
+class Rule:
+    pattern: str
+    replacement: str
+    label: str
 
-def sanitize_text(s: str, stats: FixStats) -> str:
-    original = s
 
+# Ordem = prioridade quando duas regras comecam na mesma posicao.
+RULES: Tuple[Rule, ...] = (
     # Normaliza newline dentro de versiculo (so ocorre 1x no dump atual).
-    n = _count_substring(s, "\n")
-    if n:
-        s = s.replace("\n", " ")
-        stats.replaced_newline += n
-
+    Rule("\n", " ", "\\n     -> ' '"),
     # 0x96: aparece em "ponham\x96se" -> "ponham-se".
-    n = _count_substring(s, "\x96")
-    if n:
-        s = s.replace("\x96", "-")
-        stats.replaced_96 += n
-
+    Rule("\x96", "-", "\\x96   -> -"),
     # 0x97: usado como dash "isto\x97ele subiu\x97que" -> "isto - ele subiu - que".
-    n = _count_substring(s, "\x97")
-    if n:
-        s = s.replace("\x97", " - ")
-        stats.replaced_97 += n
-
+    Rule("\x97", " - ", "\\x97   -> ' - '"),
     # 0x9E: aparece em nomes "E\x9Eutico" / "E\x9Eubulo" -> "Êutico" / "Êubulo".
-    n = _count_substring(s, "E\x9E")
-    if n:
-        s = s.replace("E\x9E", "Ê")
-        stats.replaced_e_9e_upper += n
-
-    n = _count_substring(s, "e\x9E")
-    if n:
-        s = s.replace("e\x9E", "ê")
-        stats.replaced_e_9e_lower += n
-
+    Rule("E\x9E", "Ê", "E\\x9E  -> Ê"),
+    Rule("e\x9E", "ê", "e\\x9E  -> ê"),
     # 0x85: ocorre 1x em "pri\x85ncipes" (na pratica vira "príncipes").
     # No dump atual, o byte aparece APOS o 'i', entao colapsamos "i\x85" -> "í".
-    n = _count_substring(s, "i\x85")
-    if n:
-        s = s.replace("i\x85", "í")
-        stats.replaced_i_85 += n
+    Rule("i\x85", "í", "i\\x85  -> í"),
+)
+
+_REPLACE = {r.pattern: r for r in RULES}
+# Regras na ordem de RULES (a alternancia do re tenta da esquerda para a
+# direita), depois qualquer controle restante.
+_MATCHER = re.compile("|".join(re.escape(r.pattern) for r in RULES) + "|[\x00-\x1f\x7f-\x9f]")
 
-    if s != original:
+
+@dataclass
+class FixStats:
+    hits: Dict[str, int] = field(default_factory=lambda: {r.pattern: 0 for r in RULES})
+    where: Dict[str, List[str]] = field(default_factory=lambda: {r.pattern: [] for r in RULES})
+    problems: List[str] = field(default_factory=list)
+    strings_changed: int = 0
+
+
+def sanitize_text(s: str, stats: FixStats, loc: str) -> str:
+    if _MATCHER.search(s) is None:
+        return s
+    changed = False
+
+    def sub(m: "re.Match[str]") -> str:
+        nonlocal changed
+        rule = _REPLACE.get(m.group(0))
+        if rule is None:
+            stats.problems.append(f"{loc}[{m.start()}]=U+{ord(m.group(0)):04X}")
+            return m.group(0)
+        stats.hits[rule.pattern] += 1
+        stats.where[rule.pattern].append(loc)
+        changed = True
+        return rule.replacement
+
+    s = _MATCHER.sub(sub, s)
+    if changed:
         stats.strings_changed += 1
     return s
 
 
-def sanitize_obj(obj: Any, stats: FixStats) -> Any:
-    if isinstance(obj, str):
-        return sanitize_text(obj, stats)
-    if isinstance(obj, list):
-        return [sanitize_obj(x, stats) for x in obj]
-    if isinstance(obj, dict):
-        return {k: sanitize_obj(v, stats) for k, v in obj.items()}
-    return obj
-
+def location(path: Tuple[Any, ...], book: Dict[str, Any]) -> str:
+    """'Genesis 1:1' para versiculos, caminho JSON ($[0].name) para o resto."""
+    if len(path) == 4 and path[1] == "chapters" and isinstance(book.get("name"), str):
+        return f"{book['name']} {path[2] + 1}:{path[3] + 1}"
+    out = f"$[{path[0]}]"
+    for p in path[1:]:
+        out += f"[{p}]" if isinstance(p, int) else f".{p}"
+    return out
 
-def find_control_chars(obj: Any, path: str = "$") -> List[str]:
-    problems: List[str] = []
 
+def sanitize_obj(obj: Any, stats: FixStats, path: Tuple[Any, ...], book: Dict[str, Any]) -> Any:
     if isinstance(obj, str):
-        for i, ch in enumerate(obj):
-            cp = ord(ch)
-            if cp < 0x20 or (0x7F <= cp <= 0x9F):
-                problems.append(f"{path}[{i}]=U+{cp:04X}")
-        return problems
-
+        return sanitize_text(obj, stats, location(path, book))
     if isinstance(obj, list):
-        for idx, item in enumerate(obj):
-            problems.extend(find_control_chars(item, f"{path}[{idx}]"))
-        return problems
-
+        return [sanitize_obj(x, stats, path + (i,), book) for i, x in enumerate(obj)]
     if isinstance(obj, dict):
-        for k, v in obj.items():
-            problems.extend(find_control_chars(v, f"{path}.{k}"))
-        return problems
-
-    return problems
+        return {k: sanitize_obj(v, stats, path + (k,), book) for k, v in obj.items()}
+    return obj
 
 
 def main() -> int:
-    if not IN_PATH.exists():
-        print(f"ERRO: arquivo nao encontrado: {IN_PATH}", file=sys.stderr)
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in", dest="in_path", default="acf.json", help="JSON original (UTF-8, com ou sem BOM).")
+    ap.add_argument("--out", dest="out_path", default="acf_clean.json", help="JSON sanitizado de saida.")
+    ap.add_argument("--show", type=int, default=5, help="Locais listados por regra (0 = todos).")
+    ap.add_argument("--stats-out", default="", help="Tambem grava o relatorio do corpus limpo neste arquivo.")
+    args = ap.parse_args()
+
+    in_path = Path(args.in_path)
+    out_path = Path(args.out_path)
+    if not in_path.exists():
+        print(f"ERRO: arquivo nao encontrado: {in_path}", file=sys.stderr)
         return 2
 
     # utf-8-sig remove BOM automaticamente se existir.
-    with IN_PATH.open("r", encoding="utf-8-sig") as f:
-        data = json.load(f)
+    text = in_path.read_text(encoding="utf-8-sig")
 
     stats = FixStats()
-    cleaned = sanitize_obj(data, stats)
+    corpus = CorpusStats() if args.stats_out else None
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    try:
+        # Mantem minificado (parecido com o original), preservando acentos.
+        with tmp_path.open("w", encoding="utf-8") as out:
+            out.write("[")
+            for i, book in enumerate(iter_array(text)):
+                if i:
+                    out.write(",")
+                cleaned = sanitize_obj(book, stats, (i,), book)
+                if corpus is not None:
+                    corpus.add_book(cleaned.get("name", ""), cleaned.get("chapters", []))
+                out.write(json.dumps(cleaned, ensure_ascii=False, separators=(",", ":")))
+            out.write("]")
+    except ValueError as e:
+        tmp_path.unlink(missing_ok=True)
+        print(f"ERRO: {in_path}: {e}", file=sys.stderr)
+        return 2
+    del text
 
-    problems = find_control_chars(cleaned)
-    if problems:
+    if stats.problems:
+        tmp_path.unlink(missing_ok=True)
         print("ERRO: ainda existem caracteres de controle no resultado:", file=sys.stderr)
-        for p in problems[:50]:
+        for p in stats.problems[:50]:
             print(" ", p, file=sys.stderr)
-        if len(problems) > 50:
-            print(f"  ... (+{len(problems) - 50} problemas)", file=sys.stderr)
+        if len(stats.problems) > 50:
+            print(f"  ... (+{len(stats.problems) - 50} problemas)", file=sys.stderr)
         return 3
+    tmp_path.replace(out_path)
 
-    # Mantem minificado (parecido com o original), preservando acentos.
-    OUT_PATH.write_text(
-        json.dumps(cleaned, ensure_ascii=False, separators=(",", ":")),
-        encoding="utf-8",
-    )
-
-    print("OK: gerado", OUT_PATH)
+    print("OK: gerado", out_path)
+    if corpus is not None:
+        stats_path = Path(args.stats_out)
+        write_stats(corpus.report(out_path), stats_path)
+        print("OK: gerado", stats_path)
     print("Substituicoes:")
-    print("  i\\x85  -> í  :", stats.replaced_i_85)
-    print("  \\x96   -> -  :", stats.replaced_96)
-    print("  \\x97   -> ' - ':", stats.replaced_97)
-    print("  E\\x9E  -> Ê  :", stats.replaced_e_9e_upper)
-    print("  e\\x9E  -> ê  :", stats.replaced_e_9e_lower)
-    print("  \\n     -> ' ':", stats.replaced_newline)
+    for rule in RULES:
+        print(f"  {rule.label:<15}: {stats.hits[rule.pattern]}")
+        where = stats.where[rule.pattern]
+        shown = where if args.show <= 0 else where[: args.show]
+        for loc in shown:
+            print(f"      {loc}")
+        if len(where) > len(shown):
+            print(f"      ... (+{len(where) - len(shown)})")
     print("Strings alteradas:", stats.strings_changed)
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Estimate Saturn CD I/O and RAM cost of the generated cd/ tree.
+
+Replays the file accesses saturn_app/main.c makes, against the real files:
+  boot          bible_load_index (BIBLE.IDX, whole file), FONT.TGA, UI/CARD*.TGA
+  main_menu     UI/MAIN.TGA
+  book_menu     BOOKMENU/A.TGA or B.TGA (apply_random_bookmenu_background)
+  chapter_menu  BOOKS/BnnA.TGA or BnnB.TGA (apply_book_background, per book)
+  reading       bible_load_current_chapter_lines (per chapter)
+
+For every access it counts CD sectors (2048 bytes; files start on a sector
+boundary), seeks and bytes, and estimates the load time at each --speeds
+multiple of 1x (75 sectors/s):
+
+  time = seeks * --seek-ms + sectors / (75 * speed)
+
+Model assumptions (tune with the options, they are not measured values):
+  - every file open costs one seek; the root directory is cached by the file
+    system, a subdirectory costs one more seek plus reading its directory
+    sectors on every open (BOOKS/, UI/, BOOKMENU/)
+  - a read touches whole sectors; consecutive reads of the same file do not
+    seek again, skipping forward past at least one sector does
+  - reading: BIB1 v1 as main.c does it (seek to the first verse, read verse
+    by verse up to the next chapter's first verse); for a v2 index (sector
+    layout) the chapter span from the index
+  - jo_tga_loader reads the whole file into a heap buffer, then allocates the
+    decoded image (16 bits/pixel); peak heap = file + image
+
+Chapters are wrapped with the main.c wrapping (gen_bible_assets.wrap_verse)
+to check READ_MAX_LINES. BIBLE.IDX is checked against BIBLE_IDX_MAX_SIZE and
+the other limits, read from main.c so they stay in sync. Exit code 1 if the
+index does not fit or a file main.c needs is missing.
+
+  python3 tools/sim_cd_io.py
+  python3 tools/sim_cd_io.py --idx BIBLEA.IDX --seek-ms 200 --json-out io.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from gen_bible_assets import wrap_verse
+
+
+SECTOR = 2048
+SECTORS_PER_SECOND_1X = 75
+ROOT_DIR_NAME = ""
+
+# Defaults if main.c cannot be read.
+MAIN_C_DEFAULTS = {
+    "BIBLE_IDX_MAX_SIZE": 160 * 1024,
+    "READ_MAX_LINES": 1024,
+    "READ_MAX_COLS": 40,
+    "BIBLE_EXPECTED_BOOK_COUNT": 66,
+    "BIBLE_EXPECTED_CHAPTER_COUNT": 1189,
+}
+VERSE_BUF = 8192  # static char verse_buf[8192] in bible_load_current_chapter_lines
+
+
+@dataclass
+class Cost:
+    seeks: int = 0
+    sectors: int = 0
+    bytes: int = 0
+    heap_peak: int = 0
+    files: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+
+    def add(self, other: "Cost") -> None:
+        self.seeks += other.seeks
+        self.sectors += other.sectors
+        self.bytes += other.bytes
+        self.heap_peak = max(self.heap_peak, other.heap_peak)
+        self.files += other.files
+        self.missing += other.missing
+
+    def ms(self, seek_ms: float, speed: float) -> float:
+        return self.seeks * seek_ms + 1000.0 * self.sectors / (SECTORS_PER_SECOND_1X * speed)
+
+
+def read_main_c_limits(path: Path) -> dict[str, int]:
+    limits = dict(MAIN_C_DEFAULTS)
+    if not path.is_file():
+        return limits
+    text = path.read_text(encoding="latin-1")
+    for name in limits:
+        # Values are plain numbers or products, e.g. (160 * 1024).
+        m = re.search(rf"#define\s+{name}\s+\(?\s*(\d+(?:\s*\*\s*\d+)*)\s*\)?", text)
+        if m:
+            value = 1
+            for term in m.group(1).split("*"):
+                value *= int(term)
+            limits[name] = value
+    return limits
+
+
+def sectors_touched(offset: int, size: int) -> int:
+    if size <= 0:
+        return 0
+    return (offset + size - 1) // SECTOR - offset // SECTOR + 1
+
+
+def dir_sectors(path: Path) -> int:
+    """Sectors of an ISO 9660 directory holding the entries of `path`."""
+    used = 34 + 34  # "." and ".."
+    sectors = 1
+    for child in sorted(path.iterdir()):
+        name = child.name.upper() + ("" if child.is_dir() else ";1")
+        rec = 33 + len(name)
+        rec += rec % 2
+        if used + rec > SECTOR:  # records never straddle a sector
+            sectors += 1
+            used = 0
+        used += rec
+    return sectors
+
+
+class CdTree:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._dir_sectors: dict[str, int] = {}
+
+    def open_cost(self, subdir: str) -> Cost:
+        cost = Cost(seeks=1)
+        if subdir != ROOT_DIR_NAME:
+            if subdir not in self._dir_sectors:
+                d = self.root / subdir
+                self._dir_sectors[subdir] = dir_sectors(d) if d.is_dir() else 1
+            cost.seeks += 1
+            cost.sectors += self._dir_sectors[subdir]
+        return cost
+
+    def read_whole(self, subdir: str, name: str) -> Cost:
+        path = self.root / subdir / name
+        cost = self.open_cost(subdir)
+        rel = f"{subdir}/{name}" if subdir else name
+        if not path.is_file():
+            cost.missing.append(rel)
+            return cost
+        size = path.stat().st_size
+        cost.sectors += sectors_touched(0, size)
+        cost.bytes += size
+        cost.files.append(rel)
+        return cost
+
+    def load_tga(self, subdir: str, name: str) -> Cost:
+        cost = self.read_whole(subdir, name)
+        path = self.root / subdir / name
+        if path.is_file():
+            with path.open("rb") as f:
+                hdr = f.read(18)
+            w, h = struct.unpack_from("<HH", hdr, 12) if len(hdr) == 18 else (0, 0)
+            cost.heap_peak = path.stat().st_size + w * h * 2
+        return cost
+
+
+@dataclass
+class BibleIndex:
+    version: int
+    book_first_chapter: list[int]
+    book_chapters: list[int]
+    chapter_first_verse: list[int]
+    chapter_verses: list[int]
+    chapter_spans: list[tuple[int, int]] | None
+    verse_offsets: list[int]
+    text_size: int
+    size: int
+
+    @classmethod
+    def read(cls, path: Path) -> "BibleIndex":
+        data = path.read_bytes()
+        magic, version, nbooks, nchap, nverse, text_size = struct.unpack_from("<4sHHIII", data, 0)
+        if magic != b"BIB1" or version not in (1, 2):
+            raise SystemExit(f"{path}: not a BIB1 index (magic {magic!r}, version {version})")
+        pos = 20
+        books = [struct.unpack_from("<IHH", data, pos + 8 * i) for i in range(nbooks)]
+        pos += 8 * nbooks
+        ent = 8 if version == 1 else 16
+        chapters = [struct.unpack_from("<IHHII" if version == 2 else "<IHH", data, pos + ent * i) for i in range(nchap)]
+        pos += ent * nchap
+        offsets = list(struct.unpack_from(f"<{nverse}I", data, pos))
+        return cls(
+            version=version,
+            book_first_chapter=[b[0] for b in books],
+            book_chapters=[b[1] for b in books],
+            chapter_first_verse=[c[0] for c in chapters],
+            chapter_verses=[c[1] for c in chapters],
+            chapter_spans=[(c[3], c[4]) for c in chapters] if version == 2 else None,
+            verse_offsets=offsets,
+            text_size=text_size,
+            size=len(data),
+        )
+
+
+def check_index(idx: BibleIndex, limits: dict[str, int]) -> list[str]:
+    """The checks bible_load_index() makes; returns the failures."""
+    problems: list[str] = []
+    # main.c: file.size >= sizeof(g_bible_idx) - 1 -> "BIBLE.IDX muito grande"
+    if idx.size >= limits["BIBLE_IDX_MAX_SIZE"] - 1:
+        problems.append(f"size {idx.size} >= BIBLE_IDX_MAX_SIZE - 1 ({limits['BIBLE_IDX_MAX_SIZE'] - 1})")
+    if idx.version != 1:
+        problems.append(f"version {idx.version}: main.c only accepts version 1")
+    if len(idx.book_chapters) != limits["BIBLE_EXPECTED_BOOK_COUNT"]:
+        problems.append(f"{len(idx.book_chapters)} books, main.c expects {limits['BIBLE_EXPECTED_BOOK_COUNT']}")
+    if len(idx.chapter_verses) != limits["BIBLE_EXPECTED_CHAPTER_COUNT"]:
+        problems.append(f"{len(idx.chapter_verses)} chapters, main.c expects {limits['BIBLE_EXPECTED_CHAPTER_COUNT']}")
+    return problems
+
+
+def chapter_cost(
+    tree: CdTree, bin_name: str, blob: bytes, idx: BibleIndex, c: int, cols: int
+) -> tuple[Cost, int, int]:
+    """(cost, wrapped lines, verses longer than verse_buf) of opening chapter c."""
+    cost = tree.open_cost(ROOT_DIR_NAME)
+    cost.files.append(bin_name)
+    first, count = idx.chapter_first_verse[c], idx.chapter_verses[c]
+    offs = idx.verse_offsets
+    if idx.chapter_spans is not None:
+        start, length = idx.chapter_spans[c]
+        end = start + length
+    else:
+        start = offs[first]
+        last = first + count - 1
+        end = offs[last + 1] if last + 1 < len(offs) else idx.text_size
+    cost.sectors += sectors_touched(start, end - start)
+    cost.bytes += end - start
+
+    lines = 0
+    too_long = 0
+    for v in range(count):
+        g = first + v
+        vend = offs[g + 1] if g + 1 < len(offs) else idx.text_size
+        if idx.chapter_spans is not None:
+            vend = min(vend, end)
+        raw = blob[offs[g] : vend]
+        if len(raw) >= VERSE_BUF - 1:
+            too_long += 1
+        text = raw.split(b"\0", 1)[0][: VERSE_BUF - 1]
+        lines += len(wrap_verse(v + 1, text, cols))
+    return cost, lines, too_long
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {"avg": 0.0, "p95": 0.0, "max": 0.0}
+    s = sorted(values)
+    return {"avg": sum(s) / len(s), "p95": s[min(len(s) - 1, int(0.95 * len(s)))], "max": s[-1]}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cd-dir", default="saturn_app/cd", help="Generated CD tree.")
+    ap.add_argument("--idx", default="BIBLE.IDX", help="Index file name in --cd-dir (BIB1 v1 or v2).")
+    ap.add_argument("--bin", default="", help="Text blob name (default: --idx with .BIN).")
+    ap.add_argument("--main-c", default="saturn_app/main.c", help="Source of the limits (BIBLE_IDX_MAX_SIZE, ...).")
+    ap.add_argument("--seek-ms", type=float, default=150.0, help="Assumed cost of one seek (ms).")
+    ap.add_argument("--speeds", default="1,2", help="Comma-separated CD speed multiples.")
+    ap.add_argument("--top", type=int, default=10, help="Slowest chapters to list.")
+    ap.add_argument("--json-out", default="", help="Write every chapter/screen cost as JSON.")
+    args = ap.parse_args()
+
+    root = Path(args.cd_dir)
+    try:
+        speeds = [float(s) for s in args.speeds.split(",") if s.strip()]
+    except ValueError:
+        ap.error(f"--speeds: not a number list: {args.speeds!r}")
+    if not speeds or any(not sp > 0 for sp in speeds):
+        ap.error(f"--speeds: speed multiples must be > 0 (got {args.speeds!r})")
+    limits = read_main_c_limits(Path(args.main_c))
+    cols = limits["READ_MAX_COLS"]
+    tree = CdTree(root)
+    bin_name = args.bin or str(Path(args.idx).with_suffix(".BIN"))
+
+    def fmt(cost: Cost) -> str:
+        times = "  ".join(f"{cost.ms(args.seek_ms, sp):8.1f} ms@{sp:g}x" for sp in speeds)
+        return f"{cost.seeks:3d} seeks {cost.sectors:5d} sectors {cost.bytes:8d} B  {times}"
+
+    idx_path = root / args.idx
+    if not idx_path.is_file():
+        raise SystemExit(f"Missing index: {idx_path}")
+    idx = BibleIndex.read(idx_path)
+    blob = (root / bin_name).read_bytes()
+    nbooks = len(idx.book_chapters)
+
+    # Screens.
+    boot = tree.read_whole(ROOT_DIR_NAME, args.idx)
+    for sub, name in ((ROOT_DIR_NAME, "FONT.TGA"), ("UI", "CARD.TGA"), ("UI", "CARDSEL.TGA")):
+        boot.add(tree.load_tga(sub, name))
+    screens: dict[str, Cost] = {"boot": boot, "main_menu": tree.load_tga("UI", "MAIN.TGA")}
+    book_menu = [tree.load_tga("BOOKMENU", n) for n in ("A.TGA", "B.TGA")]
+    screens["book_menu"] = max(book_menu, key=lambda c: c.sectors)
+    chapter_menu: list[Cost] = []
+    for b in range(nbooks):
+        first = tree.load_tga("BOOKS", f"B{b + 1:02d}A.TGA")
+        if first.missing:
+            # apply_book_background falls back to the other variant: the
+            # failed open still costs its seeks.
+            second = tree.load_tga("BOOKS", f"B{b + 1:02d}B.TGA")
+            if not second.missing:
+                first.missing = []
+            first.add(second)
+        chapter_menu.append(first)
+    screens["chapter_menu"] = max(chapter_menu, key=lambda c: c.ms(args.seek_ms, 1.0))
+
+    # Chapters.
+    rows: list[dict] = []
+    for b in range(nbooks):
+        for k in range(idx.book_chapters[b]):
+            c = idx.book_first_chapter[b] + k
+            cost, lines, too_long = chapter_cost(tree, bin_name, blob, idx, c, cols)
+            rows.append(
+                {
+                    "book": b + 1,
+                    "chapter": k + 1,
+                    "verses": idx.chapter_verses[c],
+                    "seeks": cost.seeks,
+                    "sectors": cost.sectors,
+                    "bytes": cost.bytes,
+                    "lines": lines,
+                    "truncated": lines > limits["READ_MAX_LINES"],
+                    "long_verses": too_long,
+                    "ms": {f"{sp:g}x": round(cost.ms(args.seek_ms, sp), 2) for sp in speeds},
+                }
+            )
+    slowest = max(rows, key=lambda r: r["sectors"]) if rows else None
+    screens["reading"] = Cost(seeks=slowest["seeks"], sectors=slowest["sectors"], bytes=slowest["bytes"]) if slowest else Cost()
+
+    # Report.
+    problems = check_index(idx, limits)
+    budget = limits["BIBLE_IDX_MAX_SIZE"] - 2  # largest size bible_load_index accepts
+    print(f"CD tree: {root}  index: {args.idx} (v{idx.version})  seek: {args.seek_ms:g} ms")
+    print(f"{args.idx}: {idx.size} bytes, budget {budget} (BIBLE_IDX_MAX_SIZE {limits['BIBLE_IDX_MAX_SIZE']}), headroom {budget - idx.size}")
+    for p in problems:
+        print(f"  FAIL: {p}")
+    print("")
+    print("Screens (worst case):")
+    for name, cost in screens.items():
+        heap = f"  heap peak {cost.heap_peak} B" if cost.heap_peak else ""
+        print(f"  {name:<13} {fmt(cost)}{heap}")
+    print("")
+    print(f"Chapter open ({len(rows)} chapters):")
+    for key in ("sectors", "bytes", "lines"):
+        s = summarize([r[key] for r in rows])
+        print(f"  {key:<8} avg {s['avg']:9.1f}  p95 {s['p95']:8.0f}  max {s['max']:8.0f}")
+    for sp in speeds:
+        s = summarize([r["ms"][f"{sp:g}x"] for r in rows])
+        print(f"  ms@{sp:g}x    avg {s['avg']:9.1f}  p95 {s['p95']:8.1f}  max {s['max']:8.1f}")
+    truncated = [r for r in rows if r["truncated"]]
+    long_verses = sum(r["long_verses"] for r in rows)
+    if truncated:
+        print(f"  WARNING: {len(truncated)} chapters over READ_MAX_LINES={limits['READ_MAX_LINES']}")
+    if long_verses:
+        print(f"  WARNING: {long_verses} verses longer than verse_buf ({VERSE_BUF} bytes)")
+    print("")
+    print("Slowest chapters (by sectors):")
+    for r in sorted(rows, key=lambda r: (-r["sectors"], r["book"], r["chapter"]))[: max(0, args.top)]:
+        ms = "  ".join(f"{v:7.1f} ms@{k}" for k, v in r["ms"].items())
+        print(f"  B{r['book']:02d} {r['chapter']:3d}  {r['sectors']:3d} sectors {r['bytes']:6d} B {r['lines']:4d} lines  {ms}")
+
+    missing = sorted({m for cost in [*screens.values(), *book_menu, *chapter_menu] for m in cost.missing})
+    if missing:
+        print("")
+        print("Missing files: " + ", ".join(missing))
+
+    if args.json_out:
+        report = {
+            "cd_dir": str(root),
+            "index": {"name": args.idx, "version": idx.version, "size": idx.size, "budget": budget, "problems": problems},
+            "model": {"sector": SECTOR, "seek_ms": args.seek_ms, "speeds": speeds},
+            "limits": limits,
+            "screens": {
+                n: {"seeks": c.seeks, "sectors": c.sectors, "bytes": c.bytes, "heap_peak": c.heap_peak,
+                    "ms": {f"{sp:g}x": round(c.ms(args.seek_ms, sp), 2) for sp in speeds}}
+                for n, c in screens.items()
+            },
+            "chapters": rows,
+            "missing": missing,
+        }
+        Path(args.json_out).write_text(json.dumps(report, indent=1) + "\n", encoding="utf-8")
+        print(f"Wrote: {args.json_out}")
+    return 1 if problems or missing else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())